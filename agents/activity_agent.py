@@ -1,16 +1,17 @@
 # agents/activity_agent.py
 
 from google.adk.agents import LlmAgent
-from google.adk.tools.function_tool import FunctionTool
-from tools.activity_tools import search_activities
+from tools.activity_tools import search_activities_async
+from agents.function_tools import async_tool
+from agents.llm import gemini_model
 from dotenv import load_dotenv
 
 load_dotenv()
-activity_search_tool = FunctionTool(func=search_activities)
+activity_search_tool = async_tool(search_activities_async, name="search_activities")
 
 activity_agent = LlmAgent(
     name="activity_agent",
-    model="gemini-2.5-flash",
+    model=gemini_model,
     description="Agent to find activities / POIs based on user trip preferences.",
     instruction="""
 You are the ACTIVITY / POI AGENT.
@@ -45,4 +46,5 @@ Your task:
 - Ensure uniform formatting for all activities, even if some data is unavailable.
 """,
     tools=[activity_search_tool],
+    output_key="activity_results",  # read by budget_agent (see trip_discovery_agent.py)
 )
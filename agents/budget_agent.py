@@ -1,17 +1,19 @@
 # agents/budget_agent.py
 
 from google.adk.agents import LlmAgent
-from google.adk.tools.function_tool import FunctionTool
-from tools.budget_tools import estimate_budget
+from tools.budget_tools import estimate_budget, estimate_budget_scenarios
+from agents.function_tools import threaded_tool
+from agents.llm import gemini_model
 from dotenv import load_dotenv
 
 load_dotenv()
 
-budget_estimate_tool = FunctionTool(func=estimate_budget)
+budget_estimate_tool = threaded_tool(estimate_budget)
+budget_scenarios_tool = threaded_tool(estimate_budget_scenarios)
 
 budget_agent = LlmAgent(
     name="budget_agent",
-    model="gemini-2.5-flash",
+    model=gemini_model,
     description="Agent to estimate total trip budget including hotel, food, transport, and activities.",
     instruction="""
 You are the BUDGET AGENT for WanderWise.
@@ -25,6 +27,11 @@ You receive a JSON request with the following keys:
 - "activity_names": comma-separated activity names e.g. 'Senso-ji Temple, Ueno Zoo' (string)
 - "activity_types": comma-separated activity type keywords e.g. 'museum,park,tourist_attraction' (string)
 
+Hotel and activity search results for this trip, if the discovery step has run:
+Hotels: {hotel_results?}
+Activities: {activity_results?}
+Use them to fill in hotel_price_level and activity_types when the request leaves them out.
+
 Your task:
 
 1) Call the budget_estimate_tool with all parameters above.
@@ -37,9 +44,14 @@ Your task:
    - Breakdown: hotel, food, transport, activities
    - Per-activity cost estimates
 
-3) Always end with the disclaimer that estimates are approximate.
+3) If the request asks to compare options (several budget tiers, trip lengths,
+   group sizes or hotel price levels), call estimate_budget_scenarios ONCE with
+   every value to compare as comma-separated lists, instead of calling
+   budget_estimate_tool repeatedly. Present its rows as a short comparison table.
+
+4) Always end with the disclaimer that estimates are approximate.
 
-4) If the tool returns an error, respond with:
+5) If the tool returns an error, respond with:
    "Unable to estimate budget for [city] at this time."
 
 Rules:
@@ -47,5 +59,5 @@ Rules:
 - Format all costs clearly in USD.
 - Return plain text only.
 """,
-    tools=[budget_estimate_tool],
+    tools=[budget_estimate_tool, budget_scenarios_tool],
 )
\ No newline at end of file
@@ -0,0 +1,43 @@
+# agents/function_tools.py
+
+# ---------------------------------------------------------------------------
+# FunctionTool builders for the agents.
+#
+# Every chat in a worker runs on one shared event loop (services/agent_loop),
+# and ADK calls a plain (sync) tool function inline on that loop, so a tool
+# blocked on the network would stall every other chat and stream. Blocking
+# tools are therefore registered through threaded_tool(), which runs each
+# call in a worker thread (asyncio.to_thread) under the function's own name,
+# docstring and signature, so the model sees the same tool.
+#
+# Coroutine tools are registered through async_tool(), which keeps the
+# public tool name ("search_hotels") rather than the function's
+# ("search_hotels_async"): the name is what the model is prompted with and
+# what traces, logs and metrics are keyed on.
+# ---------------------------------------------------------------------------
+
+import asyncio
+import functools
+
+from google.adk.tools.function_tool import FunctionTool
+
+
+def threaded_tool(func) -> FunctionTool:
+    """FunctionTool for a blocking function: each call runs in a worker thread, off the agent loop."""
+
+    @functools.wraps(func)
+    async def _call(*args, **kwargs):
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+    return FunctionTool(func=_call)
+
+
+def async_tool(func, name: str) -> FunctionTool:
+    """FunctionTool for a coroutine function, declared to the model as `name`."""
+
+    @functools.wraps(func)
+    async def _call(*args, **kwargs):
+        return await func(*args, **kwargs)
+
+    _call.__name__ = _call.__qualname__ = name
+    return FunctionTool(func=_call)
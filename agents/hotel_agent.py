@@ -1,16 +1,17 @@
 # agents/hotel_agent.py
 
 from google.adk.agents import LlmAgent
-from google.adk.tools.function_tool import FunctionTool
-from tools.hotel_tools import search_hotels
+from tools.hotel_tools import search_hotels_async
+from agents.function_tools import async_tool
+from agents.llm import gemini_model
 from dotenv import load_dotenv
 
 load_dotenv()
-hotel_search_tool = FunctionTool(func=search_hotels)
+hotel_search_tool = async_tool(search_hotels_async, name="search_hotels")
 
 hotel_agent = LlmAgent(
     name="hotel_agent",
-    model="gemini-2.5-flash",
+    model=gemini_model,
     description="Agent to find hotel accommodations based on user constraints.",
     instruction="""
 You are the HOTEL-FINDER AGENT.
@@ -46,4 +47,5 @@ Important rules:
 - Return only plain text.
 """,
     tools=[hotel_search_tool],
+    output_key="hotel_results",  # read by budget_agent (see trip_discovery_agent.py)
 )
@@ -0,0 +1,12 @@
+# agents/llm.py
+
+# One shared Gemini model instance for every agent. Passing the model name as
+# a string makes ADK build a new Gemini client (and HTTP connection pool) on
+# every LLM call; a shared instance keeps the client warm on the worker's
+# long-lived event loop.
+
+from google.adk.models import Gemini
+
+MODEL_NAME = "gemini-2.5-flash"
+
+gemini_model = Gemini(model=MODEL_NAME)
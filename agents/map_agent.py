@@ -1,17 +1,18 @@
 # agents/map_agent.py
 
 from google.adk.agents import LlmAgent
-from google.adk.tools.function_tool import FunctionTool
-from tools.map_tools import geocode_place
+from tools.map_tools import geocode_places_async
+from agents.function_tools import async_tool
+from agents.llm import gemini_model
 from dotenv import load_dotenv
 
 load_dotenv()
 
-geocode_tool = FunctionTool(func=geocode_place)
+geocode_tool = async_tool(geocode_places_async, name="geocode_places")
 
 map_agent = LlmAgent(
     name="map_agent",
-    model="gemini-2.5-flash",
+    model=gemini_model,
     description="Extracts hotels and activities from a travel itinerary and geocodes each one.",
     instruction="""
 You are the MAP AGENT for WanderWise.
@@ -29,9 +30,10 @@ You receive a travel itinerary as plain text. Your job is to extract every hotel
    - All hotels mentioned (these are accommodation recommendations)
    - All activities mentioned, with the day number they appear on
 
-3. For EVERY hotel and activity, call the geocode_place tool:
-   - Pass the exact place name as "place_name"
+3. Call the geocode_places tool ONCE for all of them:
+   - Pass every hotel and activity name, exactly as written, in "names"
    - Pass the destination city as "city"
+   It returns the coordinates in "places"; names in "failed" or "timed_out" could not be geocoded.
 
 4. After geocoding everything, return ONLY a single JSON object in this exact format:
 
@@ -50,7 +52,7 @@ You receive a travel itinerary as plain text. Your job is to extract every hotel
 ## RULES
 ----------------------------
 
-- Call geocode_place for EVERY place. Do not skip any.
+- Include EVERY place in the single geocode_places call. Do not skip any.
 - If geocoding fails for a place, omit it from the output entirely.
 - Hotels have no "day" field — they apply to the whole trip.
 - Activities MUST have the correct "day" number from the itinerary.
@@ -5,13 +5,15 @@ from google.adk.tools.agent_tool import AgentTool
 from agents.hotel_agent import hotel_agent
 from agents.activity_agent import activity_agent
 from agents.budget_agent import budget_agent
+from agents.trip_discovery_agent import trip_discovery_agent
+from agents.llm import gemini_model
 from dotenv import load_dotenv
 
 load_dotenv()
 
 root_agent = LlmAgent(
     name="root_travel_agent",
-    model="gemini-2.5-flash",
+    model=gemini_model,
     description="Root travel planner agent — coordinates hotel, activity, and budget sub-agents to produce a full itinerary.",
     instruction="""
 You are the ROOT TRAVEL AGENT for WanderWise, an AI travel planner.
@@ -22,7 +24,7 @@ Your job is to gather trip details from the user, then coordinate with sub-agent
 ## IMPORTANT RULES
 ----------------------------
 
-1. **You may call ONLY the provided tools: hotel_agent, activity_agent, and budget_agent.**
+1. **You may call ONLY the provided tools: trip_discovery, hotel_agent, activity_agent, and budget_agent.**
    Do NOT attempt to call any other tools, APIs, or external services.
 
 2. **Call tools ONLY when you have all the information needed to build a travel plan.**
@@ -100,17 +102,19 @@ Identify from ALL messages:
 - Budget tier
 - Interests
 
-### Step 2 — Call hotel_agent
-Pass destination, budget tier, and number of travelers.
-Request 1–3 hotel options. Note the price_level of the top result.
+### Step 2 — Call trip_discovery (hotels and activities together)
+Make ONE call with destination, number of travelers, budget tier, interests and any
+hotel preferences. It searches hotels and activities at the same time and returns
+both. Note the price_level of the top hotel and the activity types.
+Use hotel_agent or activity_agent on their own only when the user asks about just
+hotels or just activities.
 
-### Step 3 — Call activity_agent
-Pass destination, interests, and number of travelers.
-
-### Step 4 — Call budget_agent
+### Step 3 — Call budget_agent
 Pass city, num_days, num_people, budget_tier, hotel_price_level, activity names and types.
+If the user wants to compare budget tiers, trip lengths or group sizes, ask
+budget_agent for all of the options in a single call.
 
-### Step 5 — Compose and return the itinerary
+### Step 4 — Compose and return the itinerary
 - 1–2 hotel recommendations with rationale
 - Day-by-day itinerary (2–4 activities per day)
 - Full budget breakdown from budget_agent
@@ -120,6 +124,7 @@ Pass city, num_days, num_people, budget_tier, hotel_price_level, activity names
 End of instructions.
 """,
     tools=[
+        AgentTool(agent=trip_discovery_agent),
         AgentTool(agent=hotel_agent),
         AgentTool(agent=activity_agent),
         AgentTool(agent=budget_agent),
@@ -0,0 +1,44 @@
+# agents/trip_discovery_agent.py
+
+# Hotel and activity discovery for one trip, run concurrently.
+#
+# hotel_agent and activity_agent don't depend on each other; only the budget
+# step needs both. trip_discovery runs them side by side as an ADK
+# ParallelAgent (each on its own branch), and each writes its reply to session
+# state through its output_key. The after-agent callback then answers with both
+# replies combined, without another model call. The root agent calls it as one
+# tool, and the state keys are forwarded to the root session for budget_agent.
+
+from google.adk.agents import ParallelAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.genai import types as genai_types
+
+from agents.activity_agent import activity_agent
+from agents.hotel_agent import hotel_agent
+
+
+def _clear_results(callback_context: CallbackContext):
+    # Don't let a previous trip's results stand in for a failed search
+    callback_context.state[hotel_agent.output_key] = ""
+    callback_context.state[activity_agent.output_key] = ""
+
+
+def _combine_results(callback_context: CallbackContext) -> genai_types.Content:
+    hotels = callback_context.state.get(hotel_agent.output_key) or "No hotel results."
+    activities = callback_context.state.get(activity_agent.output_key) or "No activity results."
+    return genai_types.Content(
+        role="model",
+        parts=[genai_types.Part(text=f"## Hotels\n{hotels}\n\n## Activities\n{activities}")],
+    )
+
+
+trip_discovery_agent = ParallelAgent(
+    name="trip_discovery",
+    description=(
+        "Finds hotels AND activities for a trip at the same time. Pass one request with the "
+        "destination, number of guests, budget tier, interests and any hotel preferences."
+    ),
+    sub_agents=[hotel_agent, activity_agent],
+    before_agent_callback=_clear_results,
+    after_agent_callback=_combine_results,
+)
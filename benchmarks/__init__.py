@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+# Offline benchmarks — run with: python -m benchmarks.<module>
@@ -0,0 +1,102 @@
+# benchmarks/bench_agent_loop.py
+
+# ---------------------------------------------------------------------------
+# Per-request overhead of the chat path against a stubbed model:
+#   before — asyncio.run() + a fresh Runner on every message
+#   after  — one shared AgentLoop (background loop + reusable Runner)
+#
+# Usage: python -m benchmarks.bench_agent_loop [--requests 500]
+# ---------------------------------------------------------------------------
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from google.adk.agents import LlmAgent
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types as genai_types
+
+from benchmarks.fakes import FakeLlm
+from services.agent_loop import AgentLoop
+
+APP_NAME = "bench"
+
+
+def _make_agent():
+    return LlmAgent(name="bench_agent", model=FakeLlm(), instruction="Reply.")
+
+
+async def _chat(runner, session_service, session_id):
+    session = await session_service.get_session(
+        app_name=APP_NAME, user_id=session_id, session_id=session_id,
+    )
+    if session is None:
+        await session_service.create_session(
+            app_name=APP_NAME, user_id=session_id, session_id=session_id,
+        )
+    content = genai_types.Content(role="user", parts=[genai_types.Part(text="Plan Tokyo")])
+    reply = ""
+    async for event in runner.run_async(
+        user_id=session_id, session_id=session_id, new_message=content,
+    ):
+        if event.is_final_response() and event.content and event.content.parts:
+            reply = "".join(p.text for p in event.content.parts if p.text)
+    return reply
+
+
+def bench_per_request_loop(n):
+    agent = _make_agent()
+    session_service = InMemorySessionService()
+    timings = []
+    for i in range(n):
+        start = time.perf_counter()
+
+        async def _run():
+            runner = Runner(agent=agent, app_name=APP_NAME, session_service=session_service)
+            return await _chat(runner, session_service, f"s{i % 20}")
+
+        asyncio.run(_run())
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_agent_loop(n):
+    agent = _make_agent()
+    session_service = InMemorySessionService()
+    loop = AgentLoop(agent, APP_NAME, session_service)
+    timings = []
+    try:
+        for i in range(n):
+            start = time.perf_counter()
+            loop.run(_chat(loop.runner, session_service, f"s{i % 20}"))
+            timings.append(time.perf_counter() - start)
+    finally:
+        loop.close()
+    return timings
+
+
+def _report(label, timings):
+    ms = sorted(t * 1000 for t in timings)
+    p95 = ms[int(len(ms) * 0.95) - 1]
+    print(f"{label:<28} mean={statistics.mean(ms):7.3f} ms  p50={statistics.median(ms):7.3f} ms  p95={p95:7.3f} ms")
+    return statistics.mean(ms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    # Warm imports / first-call costs out of both measurements
+    bench_per_request_loop(5)
+    bench_agent_loop(5)
+
+    before = _report("asyncio.run + new Runner", bench_per_request_loop(args.requests))
+    after = _report("shared AgentLoop", bench_agent_loop(args.requests))
+    print(f"overhead saved per request: {before - after:.3f} ms ({(1 - after / before) * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# benchmarks/bench_async_tools.py
+
+# ---------------------------------------------------------------------------
+# Wall-clock time for N concurrent sessions on one event loop (as on the
+# agent loop), each running its hotel and activity searches side by side
+# the way trip_discovery does, with the sync tools (which block the loop
+# for every Google call) vs the async tools (which await them).
+#
+# Tools are invoked through ADK FunctionTools, as the runner calls them,
+# against a FakeGoogleServer with a fixed per-request latency. Every
+# session plans a different city and caches are cleared before each run,
+# so all geocode and Nearby Search calls go out.
+#
+# Usage: python -m benchmarks.bench_async_tools [--sessions 20]
+#            [--google-latency 0.05] [--rounds 3]
+# ---------------------------------------------------------------------------
+
+import argparse
+import asyncio
+import statistics
+import time
+from contextlib import ExitStack
+from unittest.mock import patch
+
+from google.adk.tools.function_tool import FunctionTool
+
+from benchmarks.fakes import FakeGoogleServer
+from tools import activity_tools, geocoding, hotel_tools, http_client, places, poi_snapshot
+
+SYNC_TOOLS = (FunctionTool(func=hotel_tools.search_hotels), FunctionTool(func=activity_tools.search_activities))
+ASYNC_TOOLS = (FunctionTool(func=hotel_tools.search_hotels_async),
+               FunctionTool(func=activity_tools.search_activities_async))
+
+
+async def _session(tools, city):
+    hotel_tool, activity_tool = tools
+    results = await asyncio.gather(
+        hotel_tool.run_async(args={"city": city, "limit": 10}, tool_context=None),
+        activity_tool.run_async(args={"city": city, "kinds": "cultural,food", "limit": 20}, tool_context=None),
+    )
+    for result in results:
+        assert result["status"] == "success", result
+
+
+def _run(tools, sessions) -> float:
+    geocoding.clear_cache()
+    places.clear_cache()
+    cities = [f"Bench City {i}" for i in range(sessions)]
+
+    async def _all():
+        try:
+            start = time.perf_counter()
+            await asyncio.gather(*(_session(tools, city) for city in cities))
+            return time.perf_counter() - start
+        finally:
+            await http_client.aclose()
+
+    return asyncio.run(_all())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--google-latency", type=float, default=0.05, help="seconds per fake Google API call")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    with FakeGoogleServer(latency=args.google_latency) as google, ExitStack() as stack:
+        for module in (geocoding, places, hotel_tools, activity_tools):
+            stack.enter_context(patch.object(module, "GOOGLE_PLACES_API_KEY", "bench-key"))
+        stack.enter_context(patch.object(geocoding, "GEOCODING_URL", google.geocoding_url))
+        stack.enter_context(patch.object(places, "PLACES_URL", google.places_url))
+        # No snapshots: every search goes to the (fake) API
+        stack.enter_context(patch.object(poi_snapshot, "POI_SNAPSHOT_MAX_AGE", 0))
+
+        print(f"sessions={args.sessions} google_latency={args.google_latency}s rounds={args.rounds}")
+        results = {}
+        for label, tools in (("sync", SYNC_TOOLS), ("async", ASYNC_TOOLS)):
+            requests_before = google.requests
+            times = [_run(tools, args.sessions) for _ in range(args.rounds)]
+            calls = (google.requests - requests_before) // args.rounds
+            results[label] = statistics.median(times)
+            print(f"  {label:<6} wall={results[label] * 1000:8.1f} ms  "
+                  f"per session={results[label] * 1000 / args.sessions:7.1f} ms  google calls={calls}")
+
+    print(f"  {results['sync'] / results['async']:.1f}x faster with async tools")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+# benchmarks/bench_e2e.py
+
+# ---------------------------------------------------------------------------
+# Offline end-to-end load test of server.app.
+#
+# The Flask app is served on a local threaded WSGI server. Nothing leaves
+# the machine:
+#   - Geocoding / Places calls go to a FakeGoogleServer with configurable
+#     latency and error rate.
+#   - Every ADK agent runs a ScriptedLlm that replays a full planning turn:
+#     root -> hotel_agent / activity_agent / budget_agent -> itinerary. The
+#     real tools, sessions and event plumbing run in between.
+#   - /api/suggestions talks to a FakeGenaiClient.
+#
+# Reports p50 / p95 / p99 latency and requests/second for /api/chat,
+# /api/export and /api/suggestions at the chosen concurrency. --save writes
+# the results as JSON; --compare fails (exit 1) if any endpoint's p95 or
+# throughput is worse than a saved baseline by more than --tolerance.
+#
+# Usage:
+#   python -m benchmarks.bench_e2e [--requests 100] [--concurrency 8]
+#       [--google-latency 0.02] [--error-rate 0] [--llm-latency 0.05]
+#       [--endpoints chat,export,suggestions] [--repeat-exports]
+#       [--save results.json] [--compare baseline.json --tolerance 0.2]
+# ---------------------------------------------------------------------------
+
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, redirect_stdout
+from unittest.mock import patch
+
+import requests
+
+CITIES = ["Tokyo", "Paris", "Rome", "Barcelona", "Lisbon", "Kyoto", "London", "Bangkok"]
+
+
+def _percentile(sorted_ms, q):
+    if not sorted_ms:
+        return 0.0
+    index = min(len(sorted_ms) - 1, max(0, int(round(q * len(sorted_ms))) - 1))
+    return sorted_ms[index]
+
+
+def _summarize(endpoint, timings, errors, elapsed):
+    ms = sorted(t * 1000 for t in timings)
+    return {
+        "endpoint": endpoint,
+        "requests": len(timings) + errors,
+        "errors": errors,
+        "p50_ms": round(_percentile(ms, 0.50), 2),
+        "p95_ms": round(_percentile(ms, 0.95), 2),
+        "p99_ms": round(_percentile(ms, 0.99), 2),
+        "rps": round(len(timings) / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+def _load(base_url, endpoint, make_request, n, concurrency):
+    """Fire `n` requests at `concurrency`; each worker thread keeps its own session."""
+    local = threading.local()
+
+    def _one(i):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        path, body, ok_status = make_request(i)
+        start = time.perf_counter()
+        resp = session.post(base_url + path, json=body, timeout=120)
+        resp.content  # read the whole body
+        return time.perf_counter() - start, resp.status_code in ok_status
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(_one, range(n)))
+    elapsed = time.perf_counter() - start
+    timings = [t for t, ok in results if ok]
+    return _summarize(endpoint, timings, len(results) - len(timings), elapsed)
+
+
+def _chat_request(i):
+    city = CITIES[i % len(CITIES)]
+    body = {"message": f"Plan a 5 day trip to {city} for 2, mid-range, museums and food",
+            "session_id": f"bench-{uuid.uuid4().hex}"}
+    return "/api/chat", body, (200,)
+
+
+def _export_request(repeat):
+    from benchmarks.fakes import itinerary_markdown
+
+    def _make(i):
+        days = (1, 7, 30)[i % 3]
+        city = CITIES[i % len(CITIES)]
+        title = f"{city} Itinerary" if repeat else f"{city} Itinerary {i}"
+        return "/api/export", {"content": itinerary_markdown(days, seed=i if not repeat else 0, city=city),
+                               "title": title}, (200,)
+    return _make
+
+
+def _suggestions_request(i):
+    city = CITIES[i % len(CITIES)]
+    body = {"reply": f"Here is your 5-day {city} itinerary ({i})", "user_message": f"Plan {city}"}
+    return "/api/suggestions", body, (200,)
+
+
+def _compare(results, baseline_path, tolerance):
+    with open(baseline_path) as f:
+        baseline = {r["endpoint"]: r for r in json.load(f)["results"]}
+    failures = []
+    for r in results:
+        base = baseline.get(r["endpoint"])
+        if not base:
+            continue
+        if r["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            failures.append(f"{r['endpoint']}: p95 {r['p95_ms']} ms vs baseline {base['p95_ms']} ms")
+        if r["rps"] < base["rps"] * (1 - tolerance):
+            failures.append(f"{r['endpoint']}: {r['rps']} req/s vs baseline {base['rps']} req/s")
+        if r["errors"] > base["errors"]:
+            failures.append(f"{r['endpoint']}: {r['errors']} errors vs baseline {base['errors']}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--google-latency", type=float, default=0.02, help="seconds per fake Google API call")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of fake Google calls that 500")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds per fake model call")
+    parser.add_argument("--endpoints", default="chat,export,suggestions")
+    parser.add_argument("--repeat-exports", action="store_true", help="export the same itineraries (cache hits)")
+    parser.add_argument("--save", help="write results JSON here")
+    parser.add_argument("--compare", help="baseline results JSON to check against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--verbose", action="store_true", help="show the server's own output")
+    args = parser.parse_args()
+
+    # Keep the benchmark's sessions and PDFs out of the working tree
+    workdir = tempfile.TemporaryDirectory(prefix="wanderwise-bench-")
+    os.environ.setdefault("SESSION_DB_PATH", os.path.join(workdir.name, "sessions.db"))
+    os.environ.setdefault("EXPORT_CACHE_DIR", os.path.join(workdir.name, "exports"))
+    os.environ.setdefault("METRICS_DIR", os.path.join(workdir.name, "metrics"))
+    # Server logs go through a queued handler on stdout; keep the table readable
+    os.environ.setdefault("LOG_LEVEL", "DEBUG" if args.verbose else "WARNING")
+
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    import server
+    from benchmarks.fakes import FakeGenaiClient, FakeGoogleServer, scripted_agents
+    from services import suggestions
+    from tools import activity_tools, geocoding, hotel_tools, map_tools, places
+
+    google = FakeGoogleServer(latency=args.google_latency, error_rate=args.error_rate).start()
+    genai_client = FakeGenaiClient(latency=args.llm_latency)
+
+    with ExitStack() as stack:
+        for module in (geocoding, places, hotel_tools, activity_tools, map_tools):
+            stack.enter_context(patch.object(module, "GOOGLE_PLACES_API_KEY", "bench-key"))
+        stack.enter_context(patch.object(geocoding, "GEOCODING_URL", google.geocoding_url))
+        stack.enter_context(patch.object(places, "PLACES_URL", google.places_url))
+        stack.enter_context(patch.object(suggestions, "_client", return_value=genai_client))
+        stack.enter_context(scripted_agents(server.root_agent, latency=args.llm_latency))
+
+        httpd = make_server("127.0.0.1", 0, server.app, threaded=True, request_handler=QuietHandler)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{httpd.server_port}"
+
+        plans = {
+            "chat": _chat_request,
+            "export": _export_request(args.repeat_exports),
+            "suggestions": _suggestions_request,
+        }
+        endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+
+        print(f"concurrency={args.concurrency} requests={args.requests} google_latency={args.google_latency}s "
+              f"error_rate={args.error_rate} llm_latency={args.llm_latency}s")
+        print(f"{'endpoint':<14}{'ok':>6}{'errors':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'req/s':>10}")
+        results = []
+        try:
+            for endpoint in endpoints:
+                with redirect_stdout(sys.stdout if args.verbose else io.StringIO()):
+                    _load(base_url, endpoint, plans[endpoint], min(args.concurrency, args.requests), args.concurrency)  # warm up
+                    r = _load(base_url, endpoint, plans[endpoint], args.requests, args.concurrency)
+                results.append(r)
+                print(f"/api/{endpoint:<9}{r['requests'] - r['errors']:>6}{r['errors']:>8}"
+                      f"{r['p50_ms']:>8.1f}ms{r['p95_ms']:>8.1f}ms{r['p99_ms']:>8.1f}ms{r['rps']:>10.1f}")
+        finally:
+            httpd.shutdown()
+            google.stop()
+            server.pdf_pool.close()
+
+    print(f"fake Google API calls: {google.requests}  fake suggestion calls: {genai_client.calls}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+    if args.compare:
+        failures = _compare(results, args.compare, args.tolerance)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if failures:
+            sys.exit(1)
+    workdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
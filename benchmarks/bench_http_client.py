@@ -0,0 +1,82 @@
+# benchmarks/bench_http_client.py
+
+# ---------------------------------------------------------------------------
+# TLS handshake savings of the pooled tools.http_client session versus bare
+# requests.get / requests.post, against a local HTTPS stand-in server.
+#
+# Usage: python -m benchmarks.bench_http_client [--requests 300] [--threads 4]
+# ---------------------------------------------------------------------------
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.fakes import FakeGoogleServer
+from tools import http_client
+
+PLACES_BODY = {
+    "includedTypes": ["hotel", "lodging"],
+    "maxResultCount": 10,
+    "locationRestriction": {"circle": {"center": {"latitude": 35.68, "longitude": 139.69}, "radius": 10000.0}},
+    "rankPreference": "POPULARITY",
+}
+
+
+def _call_bare(server, i):
+    if i % 2:
+        resp = requests.post(server.places_url, json=PLACES_BODY, timeout=10, verify=server.certfile)
+    else:
+        resp = requests.get(server.geocoding_url, params={"address": "Tokyo"}, timeout=10, verify=server.certfile)
+    resp.raise_for_status()
+
+
+def _call_pooled(server, i):
+    if i % 2:
+        resp = http_client.post(server.places_url, json=PLACES_BODY, verify=server.certfile)
+    else:
+        resp = http_client.get(server.geocoding_url, params={"address": "Tokyo"}, verify=server.certfile)
+    resp.raise_for_status()
+
+
+def _run(label, fn, server, n, threads):
+    def _timed(i):
+        start = time.perf_counter()
+        fn(server, i)
+        return time.perf_counter() - start
+
+    connections_before = server.connections
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        timings = list(pool.map(_timed, range(n)))
+    elapsed = time.perf_counter() - start
+
+    ms = sorted(t * 1000 for t in timings)
+    p95 = ms[int(len(ms) * 0.95) - 1]
+    print(f"{label:<22} mean={statistics.mean(ms):7.3f} ms  p95={p95:7.3f} ms  "
+          f"{n / elapsed:8.1f} req/s  TLS connections={server.connections - connections_before}")
+    return statistics.mean(ms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    with FakeGoogleServer(tls=True) as server:
+        http_client.reset()
+
+        before = _run("bare requests", _call_bare, server, args.requests, args.threads)
+        after = _run("pooled http_client", _call_pooled, server, args.requests, args.threads)
+        print(f"saved per call: {before - after:.3f} ms ({(1 - after / before) * 100:.1f}%)")
+
+        print("\nhttp_client latency histograms:")
+        for endpoint, hist in http_client.latency_stats().items():
+            print(f"  {endpoint}: count={hist['count']} mean={hist['mean'] * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
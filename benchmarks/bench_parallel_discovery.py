@@ -0,0 +1,92 @@
+# benchmarks/bench_parallel_discovery.py
+
+# ---------------------------------------------------------------------------
+# Wall-clock time of one full planning turn with hotel and activity
+# discovery run one after the other (root calls hotel_agent, then
+# activity_agent) vs concurrently (root calls trip_discovery once).
+#
+# Every agent runs a ScriptedLlm with a fixed per-call latency, and the
+# real search tools hit a FakeGoogleServer, so only the orchestration
+# differs between the two runs.
+#
+# Usage: python -m benchmarks.bench_parallel_discovery [--turns 10]
+#            [--llm-latency 0.2] [--google-latency 0.05]
+# ---------------------------------------------------------------------------
+
+import argparse
+import statistics
+import time
+import uuid
+from contextlib import ExitStack
+from unittest.mock import patch
+
+from google.adk.sessions import InMemorySessionService
+from google.genai import types as genai_types
+
+from agents.root_travel_agent import root_agent
+from benchmarks.fakes import SEQUENTIAL_TRAVEL_SCRIPTS, TRAVEL_SCRIPTS, FakeGoogleServer, scripted_agents
+from services.agent_loop import AgentLoop
+from tools import geocoding, hotel_tools, activity_tools, places
+
+CITIES = ["Tokyo", "Paris", "Rome", "Lisbon", "Kyoto", "London"]
+
+
+def _turn(loop, message):
+    session_id = f"bench-{uuid.uuid4().hex}"
+    content = genai_types.Content(role="user", parts=[genai_types.Part(text=message)])
+
+    async def _run():
+        await loop.session_service.create_session(app_name="bench", user_id=session_id, session_id=session_id)
+        reply = ""
+        async for event in loop.runner.run_async(user_id=session_id, session_id=session_id, new_message=content):
+            if event.is_final_response() and event.content and event.content.parts:
+                reply = "".join(p.text for p in event.content.parts if p.text)
+        return reply
+
+    start = time.perf_counter()
+    reply = loop.run(_run())
+    return time.perf_counter() - start, reply
+
+
+def _measure(label, scripts, args):
+    loop = AgentLoop(root_agent, "bench", InMemorySessionService())
+    timings = []
+    try:
+        with scripted_agents(root_agent, scripts, latency=args.llm_latency):
+            _turn(loop, "Plan 5 days in Oslo")  # warm up
+            for i in range(args.turns):
+                # Fresh cities each turn so the Places cache doesn't hide the search latency
+                geocoding.clear_cache()
+                places.clear_cache()
+                seconds, reply = _turn(loop, f"Plan a 5 day trip to {CITIES[i % len(CITIES)]} for 2, mid-range")
+                assert reply, "turn produced no reply"
+                timings.append(seconds)
+    finally:
+        loop.close()
+    ms = [t * 1000 for t in timings]
+    print(f"  {label:<11} mean={statistics.mean(ms):8.1f} ms  p50={statistics.median(ms):8.1f} ms  "
+          f"max={max(ms):8.1f} ms")
+    return statistics.mean(ms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="seconds per fake model call")
+    parser.add_argument("--google-latency", type=float, default=0.05, help="seconds per fake Google API call")
+    args = parser.parse_args()
+
+    with FakeGoogleServer(latency=args.google_latency) as google, ExitStack() as stack:
+        for module in (geocoding, places, hotel_tools, activity_tools):
+            stack.enter_context(patch.object(module, "GOOGLE_PLACES_API_KEY", "bench-key"))
+        stack.enter_context(patch.object(geocoding, "GEOCODING_URL", google.geocoding_url))
+        stack.enter_context(patch.object(places, "PLACES_URL", google.places_url))
+
+        print(f"turns={args.turns} llm_latency={args.llm_latency}s google_latency={args.google_latency}s")
+        sequential = _measure("sequential", SEQUENTIAL_TRAVEL_SCRIPTS, args)
+        parallel = _measure("parallel", TRAVEL_SCRIPTS, args)
+    print(f"  saved {sequential - parallel:.1f} ms per turn ({(1 - parallel / sequential) * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
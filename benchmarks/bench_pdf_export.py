@@ -0,0 +1,142 @@
+# benchmarks/bench_pdf_export.py
+
+# ---------------------------------------------------------------------------
+# /api/export rendering throughput (PDFs per second):
+#   before — per-request style sheet + ParagraphStyle construction, inline
+#   inline — module-level styles, rendered in the calling thread
+#   pool   — module-level styles, rendered in a PdfRenderPool from
+#            `--clients` concurrent request threads
+#
+# Alongside each run a probe thread sleeps 1 ms in a loop, standing in for
+# the other requests a gunicorn worker is serving; its p99 wake-up delay
+# shows how much rendering starves the rest of the process.
+#
+# Usage: python -m benchmarks.bench_pdf_export [--seconds 3] [--workers 2] [--clients 8]
+# ---------------------------------------------------------------------------
+
+import argparse
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.platypus import SimpleDocTemplate
+
+from benchmarks.fakes import itinerary_markdown
+from services import pdf_export
+from services.pdf_export import PdfRenderPool, RenderQueueFull, render_itinerary_pdf
+
+
+def render_legacy(raw_content, title):
+    """Old request path: rebuild the style sheet and every style, then render."""
+    styles = getSampleStyleSheet()
+    pdf_export.STYLES = {
+        name: ParagraphStyle(style.name, parent=styles['Normal'], **{
+            k: getattr(style, k) for k in ("fontName", "fontSize", "textColor", "spaceAfter",
+                                           "spaceBefore", "alignment", "leading", "leftIndent")
+        })
+        for name, style in _MODULE_STYLES.items()
+    }
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=20*mm, leftMargin=20*mm,
+                            topMargin=20*mm, bottomMargin=20*mm)
+    doc.build(pdf_export._build_story(raw_content, title, "January 01, 2026"))
+    return buffer.getvalue()
+
+
+_MODULE_STYLES = dict(pdf_export.STYLES)
+
+
+class _Probe:
+    """Measures wake-up delay of a thread that sleeps 1 ms at a time."""
+
+    def __enter__(self):
+        self.delays, self._stop = [], threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            time.sleep(0.001)
+            self.delays.append(time.perf_counter() - start - 0.001)
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    @property
+    def p99_ms(self):
+        delays = sorted(self.delays)
+        return delays[int(len(delays) * 0.99) - 1] * 1000 if delays else 0.0
+
+
+def _throughput(render, content, seconds):
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        render(content, "Tokyo")
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def _pool_throughput(pool, content, seconds, clients):
+    deadline = time.perf_counter() + seconds
+
+    def _client():
+        done = rejected = 0
+        while time.perf_counter() < deadline:
+            try:
+                pool.render(content, "Tokyo", "January 01, 2026")
+                done += 1
+            except RenderQueueFull:
+                rejected += 1
+                time.sleep(0.01)
+        return done, rejected
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(clients) as threads:
+        results = list(threads.map(lambda _: _client(), range(clients)))
+    elapsed = time.perf_counter() - start
+    return sum(r[0] for r in results) / elapsed, sum(r[1] for r in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--clients", type=int, default=8)
+    args = parser.parse_args()
+
+    pool = PdfRenderPool(workers=args.workers, max_queue=args.clients)
+    pool.warm()  # spawn the worker processes outside the timing
+
+    print(f"{'itinerary':<10}{'KB':>5}{'before':>18}{'inline':>18}{'pool x' + str(args.workers):>18}  rejected")
+    print(f"{'':<15}{'(PDFs/s, probe p99 ms)':>54}")
+    try:
+        for days in (1, 7, 30):
+            content = itinerary_markdown(days)
+            size = len(render_itinerary_pdf(content, "Tokyo")) / 1024
+            with _Probe() as p_before:
+                before = _throughput(render_legacy, content, args.seconds)
+            pdf_export.STYLES = _MODULE_STYLES
+            with _Probe() as p_inline:
+                inline = _throughput(render_itinerary_pdf, content, args.seconds)
+            with _Probe() as p_pool:
+                pooled, rejected = _pool_throughput(pool, content, args.seconds, args.clients)
+            print(
+                f"{days:>3}-day{'':<4}{size:>5.0f}"
+                f"{before:>9.1f}/s {p_before.p99_ms:>5.1f}ms"
+                f"{inline:>9.1f}/s {p_inline.p99_ms:>5.1f}ms"
+                f"{pooled:>9.1f}/s {p_pool.p99_ms:>5.1f}ms  {rejected}"
+            )
+    finally:
+        pdf_export.STYLES = _MODULE_STYLES
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
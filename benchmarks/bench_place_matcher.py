@@ -0,0 +1,118 @@
+# benchmarks/bench_place_matcher.py
+
+# ---------------------------------------------------------------------------
+# Itinerary-to-place filtering in the direct-tool fallback:
+#   before — per-name fuzzy_match: one substring / regex search of the whole
+#            itinerary for every candidate and every significant word
+#   after  — tools.text_match.PlaceMatcher: one Aho–Corasick pass
+#
+# Candidates are 10 hotels + 20 activities per city (what the fallback
+# fetches), for one city and for a three-city trip; itineraries are
+# synthetic 1-, 7- and 30-day plans mentioning a subset.
+#
+# Usage: python -m benchmarks.bench_place_matcher [--repeat 300]
+# ---------------------------------------------------------------------------
+
+import argparse
+import random
+import re
+import statistics
+import time
+
+from tools.text_match import PlaceMatcher
+
+HOTELS = [
+    "Park Hyatt Tokyo", "Hotel Gracery Shinjuku", "The Peninsula Tokyo", "Aman Tokyo",
+    "Shinjuku Granbell Hotel", "Mitsui Garden Hotel Ginza Premier", "Hotel Niwa Tokyo",
+    "The Tokyo Station Hotel", "Andaz Tokyo Toranomon Hills", "Hoshinoya Tokyo",
+]
+ACTIVITIES = [
+    "Senso-ji", "Meiji Jingu", "Tokyo Skytree", "Tokyo National Museum", "Ueno Zoo",
+    "Shinjuku Gyoen National Garden", "teamLab Planets TOKYO", "Tsukiji Outer Market",
+    "Imperial Palace East Gardens", "Mori Art Museum", "Tokyo Tower", "Yoyogi Park",
+    "Ghibli Museum", "Odaiba Seaside Park", "Hamarikyu Gardens", "Nezu Museum",
+    "Akihabara Electric Town", "Rikugien Garden", "Edo-Tokyo Museum", "Kabukiza Theatre",
+]
+FILLER = (
+    "Start the morning with coffee near the station, then head over by subway. "
+    "Spend a couple of hours exploring before lunch at a local ramen shop. "
+    "In the afternoon take it slow, browse the side streets and pick up snacks. "
+    "Evening: dinner at an izakaya and an early night to beat the jet lag. "
+)
+
+
+def legacy_fuzzy_match(name, text):
+    """The pre-matcher implementation from server._try_direct_tool_call."""
+    if not name: return False
+    if name.lower() in text: return True
+    words = [w for w in name.lower().split() if len(w) > 3]
+    if len(words) >= 2:
+        matches = sum(1 for w in words if w in text)
+        return matches >= 2
+    elif len(words) == 1:
+        return bool(re.search(r'\b' + re.escape(words[0]) + r'\b', text))
+    return False
+
+
+def make_itinerary(days, rng):
+    parts = [f"Here is your {days}-day Tokyo itinerary.\n\nStay at {rng.choice(HOTELS)}.\n"]
+    for day in range(1, days + 1):
+        visits = rng.sample(ACTIVITIES, 2)
+        parts.append(f"\nDay {day}:\n- Morning: {visits[0]}. {FILLER}\n- Afternoon: {visits[1]}. {FILLER}\n")
+    return "".join(parts)
+
+
+def bench_legacy(names, text, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        lower = text.lower()
+        [legacy_fuzzy_match(n, lower) for n in names]
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_matcher(names, text, repeat, rebuild):
+    matcher = PlaceMatcher(names)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if rebuild:
+            matcher = PlaceMatcher(names)
+        matcher.match(text)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _us(timings):
+    return statistics.median(timings) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=300)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    one_city = HOTELS + ACTIVITIES
+    three_cities = one_city + [n.replace("Tokyo", city) + f" {city}" for city in ("Osaka", "Kyoto") for n in one_city]
+
+    print(f"{'itinerary':<12}{'names':>6}{'chars':>8}{'legacy':>12}{'matcher':>12}{'+build':>12}  agree")
+    for names in (one_city, three_cities):
+        for days in (1, 7, 30):
+            text = make_itinerary(days, rng)
+            lower = text.lower()
+            legacy = [legacy_fuzzy_match(n, lower) for n in names]
+            ours = [r["matched"] for r in PlaceMatcher(names).match(text)]
+            agree = sum(a == b for a, b in zip(legacy, ours))
+            print(
+                f"{days:>3}-day{'':<5}{len(names):>6}{len(text):>8}"
+                f"{_us(bench_legacy(names, text, args.repeat)):>10.1f}us"
+                f"{_us(bench_matcher(names, text, args.repeat, False)):>10.1f}us"
+                f"{_us(bench_matcher(names, text, args.repeat, True)):>10.1f}us"
+                f"  {agree}/{len(names)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
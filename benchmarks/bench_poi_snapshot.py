@@ -0,0 +1,95 @@
+# benchmarks/bench_poi_snapshot.py
+
+# ---------------------------------------------------------------------------
+# search_hotels / search_activities latency answered from a local POI
+# snapshot vs the live path (geocode + Nearby Search, caches cleared),
+# against a FakeGoogleServer with a fixed per-request latency.
+#
+# Usage: python -m benchmarks.bench_poi_snapshot [--searches 200]
+#            [--google-latency 0.05] [--cities 5]
+# ---------------------------------------------------------------------------
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from contextlib import ExitStack
+from unittest.mock import patch
+
+from benchmarks.fakes import FakeGoogleServer
+from tools import activity_tools, geocoding, hotel_tools, places, poi_snapshot
+
+CITIES = ["Tokyo", "Paris", "Rome", "Lisbon", "Kyoto", "London", "Barcelona", "New York City"]
+KINDS = [None, "cultural,museums", "food", "nightlife", "outdoors"]
+
+
+def _search(i, cities):
+    city = cities[i % len(cities)]
+    if i % 2:
+        return hotel_tools.search_hotels(city, limit=10)
+    return activity_tools.search_activities(city, kinds=KINDS[(i // 2) % len(KINDS)], limit=20)
+
+
+def _measure(label, n, cities, clear_caches):
+    timings = []
+    for i in range(n):
+        if clear_caches:
+            geocoding.clear_cache()
+            places.clear_cache()
+        start = time.perf_counter()
+        result = _search(i, cities)
+        timings.append(time.perf_counter() - start)
+        assert result["status"] == "success", result
+    ms = sorted(t * 1000 for t in timings)
+    p95 = ms[int(len(ms) * 0.95) - 1]
+    print(f"  {label:<9} mean={statistics.mean(ms):8.3f} ms  p50={statistics.median(ms):8.3f} ms  "
+          f"p95={p95:8.3f} ms")
+    return statistics.mean(ms)
+
+
+def _fake_google(stack, google, directory):
+    for module in (geocoding, places, hotel_tools, activity_tools):
+        stack.enter_context(patch.object(module, "GOOGLE_PLACES_API_KEY", "bench-key"))
+    stack.enter_context(patch.object(geocoding, "GEOCODING_URL", google.geocoding_url))
+    stack.enter_context(patch.object(places, "PLACES_URL", google.places_url))
+    stack.enter_context(patch.object(poi_snapshot, "POI_SNAPSHOT_DIR", directory))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--searches", type=int, default=200)
+    parser.add_argument("--google-latency", type=float, default=0.05, help="seconds per fake Google API call")
+    parser.add_argument("--cities", type=int, default=5)
+    args = parser.parse_args()
+    cities = CITIES[:args.cities]
+
+    with FakeGoogleServer(latency=args.google_latency) as google, tempfile.TemporaryDirectory() as directory:
+        print(f"searches={args.searches} cities={len(cities)} google_latency={args.google_latency}s")
+
+        with ExitStack() as stack:
+            _fake_google(stack, google, directory)
+            stack.enter_context(patch.object(poi_snapshot, "POI_SNAPSHOT_MAX_AGE", 0))
+            live = _measure("live", args.searches, cities, clear_caches=True)
+
+        with ExitStack() as stack:
+            _fake_google(stack, google, directory)
+            start = time.perf_counter()
+            counts = [poi_snapshot.build(city) for city in cities]
+            size = sum(os.path.getsize(poi_snapshot.snapshot_path(city)) for city in cities)
+            print(f"  built {len(cities)} snapshots, {sum(counts)} places, {size / 1024:.0f} KiB "
+                  f"in {time.perf_counter() - start:.1f} s")
+
+            # No API key from here on: every answer must come from the snapshots
+            stack.enter_context(patch.object(hotel_tools, "GOOGLE_PLACES_API_KEY", None))
+            stack.enter_context(patch.object(activity_tools, "GOOGLE_PLACES_API_KEY", None))
+            poi_snapshot.clear()
+            snapshot = _measure("snapshot", args.searches, cities, clear_caches=True)
+            stats = poi_snapshot.stats()
+            print(f"  snapshot hits={stats['hits']} misses={stats['misses']}")
+
+    print(f"  {live / snapshot:.0f}x faster from the snapshot ({live - snapshot:.1f} ms saved per search)")
+
+
+if __name__ == "__main__":
+    main()
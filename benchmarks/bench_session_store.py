@@ -0,0 +1,87 @@
+# benchmarks/bench_session_store.py
+
+# ---------------------------------------------------------------------------
+# get / create / append latency of the session backends with a large
+# population of existing sessions.
+#
+# Usage: python -m benchmarks.bench_session_store [--sessions 10000] [--ops 1000]
+# ---------------------------------------------------------------------------
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from google.adk.events import Event
+from google.genai import types as genai_types
+
+from services.session_store import create_session_service
+
+APP_NAME = "bench"
+
+
+def _event(text):
+    return Event(
+        author="user",
+        invocation_id="bench",
+        content=genai_types.Content(role="user", parts=[genai_types.Part(text=text)]),
+    )
+
+
+def _report(label, timings):
+    ms = sorted(t * 1000 for t in timings)
+    p95 = ms[int(len(ms) * 0.95) - 1]
+    p99 = ms[int(len(ms) * 0.99) - 1]
+    print(f"  {label:<8} mean={statistics.mean(ms):7.3f} ms  p50={statistics.median(ms):7.3f} ms  "
+          f"p95={p95:7.3f} ms  p99={p99:7.3f} ms")
+
+
+async def _bench(service, sessions, ops, events_per_session):
+    start = time.perf_counter()
+    for i in range(sessions):
+        session = await service.create_session(app_name=APP_NAME, user_id=f"u{i}", session_id=f"s{i}")
+        for j in range(events_per_session):
+            await service.append_event(session, _event(f"message {j}"))
+    print(f"  populated {sessions} sessions x {events_per_session} events in {time.perf_counter() - start:.1f}s")
+
+    rng = random.Random(0)
+    get_t, create_t, append_t = [], [], []
+    for k in range(ops):
+        i = rng.randrange(sessions)
+
+        t = time.perf_counter()
+        session = await service.get_session(app_name=APP_NAME, user_id=f"u{i}", session_id=f"s{i}")
+        get_t.append(time.perf_counter() - t)
+
+        t = time.perf_counter()
+        await service.append_event(session, _event("follow-up"))
+        append_t.append(time.perf_counter() - t)
+
+        t = time.perf_counter()
+        await service.create_session(app_name=APP_NAME, user_id=f"new{k}", session_id=f"new{k}")
+        create_t.append(time.perf_counter() - t)
+
+    _report("get", get_t)
+    _report("create", create_t)
+    _report("append", append_t)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--ops", type=int, default=1000)
+    parser.add_argument("--events", type=int, default=4, help="events pre-loaded per session")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in ("memory", "sqlite"):
+            print(f"{backend}:")
+            service = create_session_service(backend, db_path=os.path.join(tmp, "sessions.db"))
+            asyncio.run(_bench(service, args.sessions, args.ops, args.events))
+
+
+if __name__ == "__main__":
+    main()
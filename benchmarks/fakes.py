@@ -0,0 +1,421 @@
+# benchmarks/fakes.py
+
+# ---------------------------------------------------------------------------
+# Local stand-ins used by the benchmarks so nothing needs live API keys.
+# ---------------------------------------------------------------------------
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import ssl
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlsplit
+
+from google.adk.models import BaseLlm, LlmResponse
+from google.genai import types as genai_types
+
+
+class FakeLlm(BaseLlm):
+    """
+    Deterministic model that answers every turn with a fixed text reply
+    after an optional simulated latency (seconds).
+    """
+
+    model: str = "fake-llm"
+    reply: str = "Here is your itinerary."
+    latency: float = 0.0
+
+    async def generate_content_async(self, llm_request, stream: bool = False):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        yield LlmResponse(
+            content=genai_types.Content(
+                role="model", parts=[genai_types.Part(text=self.reply)],
+            ),
+            turn_complete=True,
+        )
+
+
+# ---------------------------------------------------------------------------
+# Fake Google Geocoding + Places (New) HTTP server
+# ---------------------------------------------------------------------------
+
+def _coords_for(text: str) -> tuple:
+    """Stable pseudo-coordinates for a query string."""
+    digest = hashlib.sha1(text.strip().lower().encode()).digest()
+    lat = (int.from_bytes(digest[:4], "big") / 2**32) * 120 - 60
+    lon = (int.from_bytes(digest[4:8], "big") / 2**32) * 340 - 170
+    return round(lat, 5), round(lon, 5)
+
+
+def _fake_places(lat, lon, types, count):
+    rng = random.Random(f"{lat:.3f},{lon:.3f},{','.join(types)}")
+    places = []
+    for i in range(count):
+        kind = types[i % len(types)] if types else "tourist_attraction"
+        places.append({
+            "displayName": {"text": f"{kind.replace('_', ' ').title()} {i + 1}"},
+            "location": {
+                "latitude": lat + rng.uniform(-0.05, 0.05),
+                "longitude": lon + rng.uniform(-0.05, 0.05),
+            },
+            "types": [kind, "point_of_interest"],
+            "rating": round(rng.uniform(3.5, 5.0), 1),
+            "userRatingCount": rng.randint(50, 50000),
+            "formattedAddress": f"{i + 1} Fake Street",
+            "googleMapsUri": f"https://maps.google.com/?cid={rng.randint(1, 10**12)}",
+            "priceLevel": rng.choice(["PRICE_LEVEL_INEXPENSIVE", "PRICE_LEVEL_MODERATE", "PRICE_LEVEL_EXPENSIVE"]),
+        })
+    return places
+
+
+def _self_signed_cert(directory: str) -> tuple:
+    """Write a throwaway localhost certificate + key; returns (certfile, keyfile)."""
+    import datetime
+    import ipaddress
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name).issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([
+            x509.DNSName("localhost"), x509.IPAddress(ipaddress.ip_address("127.0.0.1")),
+        ]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    certfile = os.path.join(directory, "cert.pem")
+    keyfile = os.path.join(directory, "key.pem")
+    with open(certfile, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(keyfile, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.TraditionalOpenSSL,
+            serialization.NoEncryption(),
+        ))
+    return certfile, keyfile
+
+
+class FakeGoogleServer:
+    """
+    Local stand-in for maps.googleapis.com (Geocoding) and
+    places.googleapis.com (Nearby Search), optionally over TLS.
+
+    Args:
+        latency:    Seconds to sleep before answering each request.
+        error_rate: Fraction of requests answered with HTTP 500.
+        tls:        Serve HTTPS with a throwaway self-signed certificate.
+
+    Use as a context manager; `geocoding_url` / `places_url` point at it and
+    `certfile` is the CA bundle clients should verify against.
+    """
+
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, tls: bool = False, seed: int = 0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.tls = tls
+        self.requests = 0
+        self.connections = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tmpdir = None
+        self.certfile = None
+        self._server = None
+        self._thread = None
+
+    # -- lifecycle --
+
+    def start(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with fake._lock:
+                    fake.connections += 1
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _maybe_fail(self):
+                with fake._lock:
+                    fake.requests += 1
+                    fail = fake._rng.random() < fake.error_rate
+                if fake.latency:
+                    time.sleep(fake.latency)
+                if fail:
+                    self._reply(500, {"error": {"code": 500, "message": "injected failure"}})
+                return fail
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                if self._maybe_fail():
+                    return
+                if parts.path != "/maps/api/geocode/json":
+                    return self._reply(404, {"error": "not found"})
+                address = parse_qs(parts.query).get("address", [""])[0]
+                if not address.strip() or "nowhere" in address.lower():
+                    return self._reply(200, {"status": "ZERO_RESULTS", "results": []})
+                lat, lon = _coords_for(address)
+                self._reply(200, {"status": "OK", "results": [{
+                    "geometry": {"location": {"lat": lat, "lng": lon}},
+                    "formatted_address": address,
+                }]})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if self._maybe_fail():
+                    return
+                if urlsplit(self.path).path != "/v1/places:searchNearby":
+                    return self._reply(404, {"error": "not found"})
+                center = body["locationRestriction"]["circle"]["center"]
+                places = _fake_places(
+                    center["latitude"], center["longitude"],
+                    body.get("includedTypes", []), int(body.get("maxResultCount", 20)),
+                )
+                self._reply(200, {"places": places})
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        if self.tls:
+            self._tmpdir = tempfile.TemporaryDirectory()
+            self.certfile, keyfile = _self_signed_cert(self._tmpdir.name)
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(self.certfile, keyfile)
+            self._server.socket = context.wrap_socket(self._server.socket, server_side=True)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._tmpdir:
+            self._tmpdir.cleanup()
+            self._tmpdir = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # -- addresses --
+
+    @property
+    def base_url(self) -> str:
+        scheme = "https" if self.tls else "http"
+        return f"{scheme}://localhost:{self._server.server_address[1]}"
+
+    @property
+    def geocoding_url(self) -> str:
+        return f"{self.base_url}/maps/api/geocode/json"
+
+    @property
+    def places_url(self) -> str:
+        return f"{self.base_url}/v1/places:searchNearby"
+
+
+_ITINERARY_STOPS = [
+    "Senso-ji Temple", "Meiji Jingu", "Tokyo Skytree", "Tokyo National Museum", "Ueno Park",
+    "Shinjuku Gyoen", "teamLab Planets", "Tsukiji Outer Market", "Imperial Palace East Gardens",
+    "Mori Art Museum", "Tokyo Tower", "Yoyogi Park", "Ghibli Museum", "Odaiba Seaside Park",
+]
+
+
+def itinerary_markdown(days: int, seed: int = 0, city: str = "Tokyo") -> str:
+    """A model-style markdown itinerary of `days` days (for export / matcher benchmarks)."""
+    rng = random.Random(seed)
+    lines = [
+        f"**Your {days}-Day {city} Itinerary**", "",
+        "Where to stay:", f"* **Park Hyatt {city}** — quiet luxury in the centre", "",
+    ]
+    for day in range(1, days + 1):
+        morning, afternoon = rng.sample(_ITINERARY_STOPS, 2)
+        lines += [
+            f"**Day {day}: Exploring {city}**",
+            f"* **Morning:** Visit {morning}. Arrive early to beat the crowds and grab coffee nearby.",
+            f"* **Afternoon:** Head to {afternoon} by subway and spend a couple of hours exploring.",
+            "* **Evening:** Dinner at a local izakaya, then a stroll through the neon-lit side streets.",
+            "",
+        ]
+    lines += [
+        "Estimated budget:",
+        f"Roughly ${150 * days}–${300 * days} per person including hotel, food and transport.",
+    ]
+    return "\n".join(lines)
+
+
+# ---------------------------------------------------------------------------
+# Scripted agents: a fake model that replays tool calls, turn by turn
+# ---------------------------------------------------------------------------
+
+def _turn_position(llm_request) -> tuple:
+    """(text of the user message that opened this turn, tool results seen since)."""
+    responses = 0
+    for content in reversed(llm_request.contents or []):
+        parts = content.parts or []
+        responses += sum(1 for p in parts if p.function_response)
+        texts = [p.text for p in parts if p.text]
+        if content.role == "user" and texts:
+            return " ".join(texts), responses
+    return "", responses
+
+
+def _fill(value, city):
+    if isinstance(value, str):
+        return value.replace("{city}", city)
+    if isinstance(value, dict):
+        return {k: _fill(v, city) for k, v in value.items()}
+    return value
+
+
+class ScriptedLlm(BaseLlm):
+    """
+    Deterministic model that replays a script of steps within each turn:
+    {"call": tool_name, "args": {...}} emits a function call, {"text": str}
+    a reply (which ends the script). The step taken is the number of tool
+    results already in the turn, so the real ADK tool plumbing runs in
+    between. "{city}" in args / text is the first destination the gazetteer
+    finds in the turn's user message (default Tokyo); a "{itinerary}" text
+    step becomes a full markdown itinerary for that city.
+    """
+
+    model: str = "scripted-llm"
+    steps: list = []
+    latency: float = 0.0
+
+    async def generate_content_async(self, llm_request, stream: bool = False):
+        from tools.gazetteer import extract_destinations
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        message, position = _turn_position(llm_request)
+        places = extract_destinations(message)
+        city = places[0]["name"] if places else "Tokyo"
+        step = self.steps[min(position, len(self.steps) - 1)]
+
+        if "call" in step:
+            part = genai_types.Part(function_call=genai_types.FunctionCall(
+                name=step["call"], args=_fill(step.get("args", {}), city),
+            ))
+        elif step["text"] == "{itinerary}":
+            part = genai_types.Part(text=itinerary_markdown(5, seed=len(message), city=city))
+        else:
+            part = genai_types.Part(text=_fill(step["text"], city))
+        yield LlmResponse(content=genai_types.Content(role="model", parts=[part]), turn_complete=True)
+
+
+# One full planning turn: root -> trip_discovery (hotel_agent + activity_agent
+# in parallel), budget_agent -> itinerary
+TRAVEL_SCRIPTS = {
+    "root_travel_agent": [
+        {"call": "trip_discovery", "args": {
+            "request": "Find mid-range hotels for 2 guests and museums and food in {city}",
+        }},
+        {"call": "budget_agent", "args": {"request": "Budget for 5 days in {city}, 2 people, mid-range"}},
+        {"text": "{itinerary}"},
+    ],
+    "hotel_agent": [
+        {"call": "search_hotels", "args": {"city": "{city}", "limit": 10}},
+        {"text": "Top hotels in {city}: Lodging 1, Hotel 2, Lodging 3."},
+    ],
+    "activity_agent": [
+        {"call": "search_activities", "args": {"city": "{city}", "kinds": "museum,restaurant", "limit": 10}},
+        {"text": "Activities in {city}: Museum 1, Restaurant 2, Museum 3."},
+    ],
+    "budget_agent": [
+        {"call": "estimate_budget", "args": {
+            "city": "{city}", "num_days": 5, "num_people": 2, "budget_tier": "mid-range",
+            "hotel_price_level": "PRICE_LEVEL_MODERATE", "activity_types": "museum,restaurant",
+        }},
+        {"text": "Estimated total for {city}: $2,400–$3,900."},
+    ],
+}
+
+# The same turn with hotel_agent and activity_agent called one after the other
+SEQUENTIAL_TRAVEL_SCRIPTS = {
+    **TRAVEL_SCRIPTS,
+    "root_travel_agent": [
+        {"call": "hotel_agent", "args": {"request": "Find mid-range hotels in {city} for 2 guests"}},
+        {"call": "activity_agent", "args": {"request": "Find museums and food in {city}"}},
+        {"call": "budget_agent", "args": {"request": "Budget for 5 days in {city}, 2 people, mid-range"}},
+        {"text": "{itinerary}"},
+    ],
+}
+
+
+def _walk_agents(agent):
+    yield agent
+    for sub in getattr(agent, "sub_agents", None) or []:
+        yield from _walk_agents(sub)
+    for tool in getattr(agent, "tools", None) or []:
+        if getattr(tool, "agent", None) is not None:
+            yield from _walk_agents(tool.agent)
+
+
+@contextmanager
+def scripted_agents(root_agent, scripts: dict = TRAVEL_SCRIPTS, latency: float = 0.0):
+    """Swap every agent's model under `root_agent` for a ScriptedLlm; restored on exit."""
+    originals = {}
+    for agent in _walk_agents(root_agent):
+        if agent.name in scripts and agent.name not in originals:
+            originals[agent.name] = (agent, agent.model)
+            agent.model = ScriptedLlm(steps=scripts[agent.name], latency=latency)
+    try:
+        yield
+    finally:
+        for agent, model in originals.values():
+            agent.model = model
+
+
+class FakeGenaiClient:
+    """
+    Stand-in for a google-genai Client's `aio.models.generate_content`,
+    answering with four JSON follow-up suggestions after `latency` seconds.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+        self.aio = SimpleNamespace(models=SimpleNamespace(generate_content=self._generate_content))
+
+    async def _generate_content(self, model, contents, **kwargs):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return SimpleNamespace(text=json.dumps([
+            "Add a day trip", "Switch to luxury hotels", "Best local food?", "Add a rainy-day plan",
+        ]))
@@ -2,10 +2,13 @@
 # Flask backend for WanderWise — connects the web UI to the ADK agent
 
 import os
-import asyncio
 import io
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, g, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
 
@@ -16,15 +19,283 @@ CORS(app)  # Allow requests from the frontend
 
 # ── Import your WanderWise agent ──
 from agents.root_travel_agent import root_agent
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.genai import types as genai_types
-
-# Session service — keeps conversation history per user session
-session_service = InMemorySessionService()
+from services.agent_loop import AgentLoop
+from services.export_cache import PdfCache, export_key
+from services import metrics
+from services.pdf_export import TEMPLATE_VERSION, PdfRenderPool, RenderQueueFull
+from services import suggestions
+from services.session_store import create_session_service
+from services import trace_plugin
+from services.trace_plugin import TracingPlugin
+from tools import geocoding, http_client, log, places, poi_snapshot, tracing
+
+# Structured, queued logging (see tools/log.py)
+log.configure()
+logger = log.get_logger("server")
+
+# Session service — keeps conversation history per user session.
+# SQLite by default so every gunicorn worker sees the same conversations.
+session_service = create_session_service()
 
 APP_NAME = "wanderwise"
 
+# One background event loop + Runner per worker; handlers submit coroutines to it
+# (TracingPlugin records agent / model / tool spans for the request trace)
+agent_loop = AgentLoop(root_agent, APP_NAME, session_service, plugins=[TracingPlugin()])
+
+# Direct-tool fallback: searches fan out on this pool under one overall deadline
+FALLBACK_DEADLINE = float(os.getenv("FALLBACK_DEADLINE", "8"))
+_fallback_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="fallback")
+FALLBACK_MAX_CITIES = int(os.getenv("FALLBACK_MAX_CITIES", "3"))
+
+# Itinerary pins: places the final itinerary names but no tool result located
+# are geocoded in one batch, no model involved (see _locate_itinerary_places)
+ITINERARY_GEOCODE = os.getenv("ITINERARY_GEOCODE", "true").lower() == "true"
+# Seconds the pin stage may add to a reply; lookups still running then finish
+# in the background and are cached, so the next turn pins them for free
+ITINERARY_GEOCODE_DEADLINE = float(os.getenv("ITINERARY_GEOCODE_DEADLINE", "1.5"))
+
+# PDF exports render in a bounded process pool (see services/pdf_export.py)
+pdf_pool = PdfRenderPool()
+# Rendered PDFs, content-addressed and shared on disk by all workers
+export_cache = PdfCache()
+
+# Request tracing: every /api/ request records a span tree (see tools/tracing.py).
+# With TRACE_DEBUG=true a client sending "X-WanderWise-Debug: trace" gets it
+# back in the X-WanderWise-Trace header (and Server-Timing), or on the SSE
+# "done" event. Requests slower than TRACE_SLOW_SECONDS log their stages.
+TRACE_DEBUG = os.getenv("TRACE_DEBUG", "false").lower() == "true"
+TRACE_HEADER = "X-WanderWise-Trace"
+TRACE_HEADER_MAX_BYTES = int(os.getenv("TRACE_HEADER_MAX_BYTES", "8192"))
+TRACE_SLOW_SECONDS = float(os.getenv("TRACE_SLOW_SECONDS", "20"))
+
+
+def _trace_requested() -> bool:
+    return TRACE_DEBUG and request.headers.get("X-WanderWise-Debug", "").lower() == "trace"
+
+
+def _trace_header(trace) -> str:
+    """The span tree as compact JSON, or just the per-stage totals if the tree is too big."""
+    value = json.dumps(trace.to_dict(), separators=(",", ":"), default=str)
+    if len(value) > TRACE_HEADER_MAX_BYTES:
+        value = json.dumps({"truncated": True, "stages": trace.summary()}, separators=(",", ":"))
+    return value
+
+
+# Accepted from the client (or the proxy) when it looks like an ID; else generated
+REQUEST_ID_HEADER = "X-Request-ID"
+_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+# Per-worker request metrics; /api/metrics merges every worker's snapshot
+request_metrics = metrics.RequestMetrics()
+CHAT_ROUTES = ("chat", "chat_stream")
+
+
+@app.before_request
+def _start_request():
+    incoming = request.headers.get(REQUEST_ID_HEADER, "")
+    g.request_id = log.start_request(incoming if _REQUEST_ID_RE.match(incoming) else None)
+    g.route = request.endpoint or "unmatched"
+    g.started_at = time.perf_counter()
+    request_metrics.started(g.route)
+    metrics_exporter.ensure_started()
+    if request.path.startswith("/api/"):
+        g.trace = tracing.start_trace(request.endpoint or request.path, request_id=g.request_id)
+
+
+@app.after_request
+def _finish_response(response):
+    g.status = response.status_code
+    response.headers[REQUEST_ID_HEADER] = g.request_id
+    trace = g.get("trace")
+    if trace is not None and not response.is_streamed and _trace_requested():
+        trace.finish()
+        response.headers[TRACE_HEADER] = _trace_header(trace)
+        response.headers["Server-Timing"] = trace.server_timing()
+    return response
+
+
+@app.teardown_request
+def _end_request(exc):
+    # Streamed responses get here only once the stream has been consumed
+    if "started_at" in g:
+        status = 500 if exc is not None else g.get("status", 500)
+        request_metrics.finished(g.route, request.method, status, time.perf_counter() - g.started_at)
+    trace = g.pop("trace", None)
+    if trace is not None:
+        tracing.end_trace(trace)
+        if trace.duration >= TRACE_SLOW_SECONDS:
+            stages = sorted(trace.summary().items(), key=lambda kv: -kv[1])[:8]
+            logger.warning("slow request", extra={"route": trace.root.name,
+                                                  "duration_s": round(trace.duration, 2), "stages": stages})
+    log.end_request()
+
+
+def _collect_metrics() -> list:
+    """This worker's metric families (see services/metrics.py)."""
+    family, COUNTER, GAUGE, HISTOGRAM = metrics.family, metrics.COUNTER, metrics.GAUGE, metrics.HISTOGRAM
+
+    caches = {
+        "geocoding": geocoding.cache_stats(),
+        "places": places.cache_stats(),
+        "places_index": places.index_stats(),
+        "poi_snapshot": poi_snapshot.stats(),
+        "suggestions": suggestions.cache_stats(),
+    }
+    lookups = [({"cache": name, "result": result}, stats.get(key, 0))
+               for name, stats in caches.items()
+               for result, key in (("hit", "hits"), ("stale_hit", "stale_hits"), ("miss", "misses"))
+               if key in stats]
+    pdf_hits = export_cache.hits, export_cache.misses
+    lookups += [({"cache": "pdf_export", "result": "hit"}, pdf_hits[0]),
+                ({"cache": "pdf_export", "result": "miss"}, pdf_hits[1])]
+
+    pdf = pdf_pool.stats()
+    tokens = trace_plugin.token_stats()
+
+    return request_metrics.families() + [
+        family("wanderwise_chats_in_flight", GAUGE, "Chat turns being processed.",
+               [({}, sum(request_metrics.in_flight(route) for route in CHAT_ROUTES))]),
+        family("wanderwise_cache_lookups_total", COUNTER, "Cache lookups by cache and result.", lookups),
+        family("wanderwise_cache_entries", GAUGE, "Entries held in each in-memory cache.",
+               [({"cache": name}, stats["size"]) for name, stats in caches.items()]),
+        family("wanderwise_outbound_calls_total", COUNTER,
+               "Outbound API lookups by API: calls made, and callers coalesced onto an identical in-flight call.",
+               [({"api": api, "result": result}, stats[result])
+                for api, stats in (("geocoding", geocoding.flight_stats()), ("places", places.flight_stats()))
+                for result in ("calls", "coalesced")]),
+        family("wanderwise_outbound_request_duration_seconds", HISTOGRAM,
+               "Outbound Google API call latency by endpoint.",
+               [({"endpoint": endpoint}, snap) for endpoint, snap in http_client.latency_stats().items()]),
+        family("wanderwise_pdf_render_duration_seconds", HISTOGRAM, "PDF render time, including queueing.",
+               [({}, pdf["render_seconds"])]),
+        family("wanderwise_pdf_renders_total", COUNTER, "PDF renders by outcome.",
+               [({"result": "rendered"}, pdf["rendered"]), ({"result": "rejected"}, pdf["rejected"]),
+                ({"result": "timed_out"}, pdf["timed_out"])]),
+        family("wanderwise_pdf_renders_in_flight", GAUGE, "PDF renders running or queued.", [({}, pdf["in_flight"])]),
+        family("wanderwise_llm_calls_total", COUNTER, "Model calls by agent.",
+               [({"agent": agent}, counts["calls"]) for agent, counts in tokens.items()]),
+        family("wanderwise_llm_tokens_total", COUNTER, "Model tokens by agent and direction.",
+               [({"agent": agent, "type": kind}, counts[f"{kind}_tokens"])
+                for agent, counts in tokens.items() for kind in ("prompt", "output")]),
+        family("wanderwise_stage_duration_seconds", HISTOGRAM, "Traced stage latency (kind:name).",
+               [({"stage": stage}, snap) for stage, snap in tracing.stage_stats().items()]),
+    ]
+
+
+metrics_exporter = metrics.MetricsExporter(_collect_metrics)
+
+
+async def _agent_events(session_id: str, user_message: str, streaming: bool = False):
+    """
+    Drive one agent turn on the shared loop and yield UI events as they happen:
+      {"type": "text", "text": str, "partial": bool}
+      {"type": "tool_start", "name": str, "args": dict}
+      {"type": "tool_end", "name": str}
+      {"type": "locations", "hotels": [...], "activities": [...]}  (new items only)
+      {"type": "final", "reply": str, "locations": {...}}
+    With streaming=True the model streams partial text chunks as well.
+    """
+    session = await session_service.get_session(
+        app_name=APP_NAME, user_id=session_id, session_id=session_id,
+    )
+    if session is None:
+        session = await session_service.create_session(
+            app_name=APP_NAME, user_id=session_id, session_id=session_id,
+        )
+
+    runner = agent_loop.runner
+
+    content = genai_types.Content(
+        role="user", parts=[genai_types.Part(text=user_message)],
+    )
+    run_config = RunConfig(streaming_mode=StreamingMode.SSE if streaming else StreamingMode.NONE)
+
+    final_response = ""
+    locations = {"hotels": [], "activities": []}
+    last_event_at = time.perf_counter()
+
+    async for event in runner.run_async(
+        user_id=session_id, session_id=session_id, new_message=content, run_config=run_config,
+    ):
+        # One span per complete ADK event, covering the wait since the previous one
+        if not event.partial:
+            calls = [c.name for c in event.get_function_calls()]
+            tracing.record_span(
+                "event", event.author or "unknown", last_event_at,
+                final=event.is_final_response(), **({"calls": calls} if calls else {}),
+            )
+            last_event_at = time.perf_counter()
+
+        seen_hotels = len(locations["hotels"])
+        seen_activities = len(locations["activities"])
+
+        try:
+            if event.content and event.content.parts:
+                for part in event.content.parts:
+                    # Tool / sub-agent call starting
+                    if getattr(part, 'function_call', None) and not event.partial:
+                        yield {
+                            "type": "tool_start",
+                            "name": part.function_call.name,
+                            "args": dict(part.function_call.args or {}),
+                        }
+
+                    # Direct function_response on a part
+                    if hasattr(part, 'function_response') and part.function_response:
+                        yield {"type": "tool_end", "name": part.function_response.name}
+                        try:
+                            resp = part.function_response.response
+                            _extract_locations(resp, locations)
+                        except Exception:
+                            pass
+
+                    # Streamed text chunks
+                    if event.partial and getattr(part, 'text', None):
+                        yield {"type": "text", "text": part.text, "partial": True}
+
+            # Also check event-level tool responses (sub-agent results)
+            if hasattr(event, 'tool_response') and event.tool_response:
+                try:
+                    _extract_locations(event.tool_response, locations)
+                except Exception:
+                    pass
+
+            # Check actions for any function responses
+            if hasattr(event, 'actions') and event.actions:
+                for action in event.actions:
+                    if hasattr(action, 'function_response') and action.function_response:
+                        try:
+                            _extract_locations(action.function_response.response, locations)
+                        except Exception:
+                            pass
+
+        except Exception:
+            logger.debug("event parse error", exc_info=True, extra={"author": event.author})
+
+        if len(locations["hotels"]) > seen_hotels or len(locations["activities"]) > seen_activities:
+            yield {
+                "type": "locations",
+                "hotels": locations["hotels"][seen_hotels:],
+                "activities": locations["activities"][seen_activities:],
+            }
+
+        if event.is_final_response():
+            if event.content and event.content.parts:
+                final_response = "".join(
+                    p.text for p in event.content.parts if hasattr(p, "text") and p.text
+                )
+                if final_response:
+                    yield {"type": "text", "text": final_response, "partial": False}
+
+    # Start the follow-up suggestions now, while the reply is on its way to the UI
+    if final_response:
+        suggestions.prefetch(session_id, user_message, final_response)
+
+    yield {"type": "final", "reply": final_response, "locations": locations}
+
 
 def run_agent(session_id: str, user_message: str):
     """
@@ -32,79 +303,67 @@ def run_agent(session_id: str, user_message: str):
     Returns (reply_text, locations_dict) where locations has hotels and activities.
     """
     async def _run():
-        session = await session_service.get_session(
-            app_name=APP_NAME, user_id=session_id, session_id=session_id,
-        )
-        if session is None:
-            session = await session_service.create_session(
-                app_name=APP_NAME, user_id=session_id, session_id=session_id,
-            )
+        async for event in _agent_events(session_id, user_message):
+            if event["type"] == "final":
+                return event["reply"], event["locations"]
+        return "", {"hotels": [], "activities": []}
 
-        runner = Runner(
-            agent=root_agent, app_name=APP_NAME, session_service=session_service,
-        )
+    final_response, locations = agent_loop.run(_run())
 
-        content = genai_types.Content(
-            role="user", parts=[genai_types.Part(text=user_message)],
-        )
+    logger.debug("agent turn finished", extra={"hotels": len(locations["hotels"]),
+                                               "activities": len(locations["activities"])})
+
+    if final_response:
+        found = _locate_itinerary_places(user_message, final_response, locations)
+        locations["hotels"] += found["hotels"]
+        locations["activities"] += found["activities"]
+
+    # Fallback: if agent responded but no locations extracted,
+    # try calling the tools directly based on what city the user mentioned.
+    # Runs in the request thread so blocking HTTP never stalls the shared loop.
+    if not locations["hotels"] and not locations["activities"] and final_response:
+        locations = _try_direct_tool_call(user_message, final_response)
 
-        final_response = ""
-        locations = {"hotels": [], "activities": []}
-
-        async for event in runner.run_async(
-            user_id=session_id, session_id=session_id, new_message=content,
-        ):
-            # Debug: print every event type to terminal so we can see what's coming through
-            try:
-                if event.content and event.content.parts:
-                    for part in event.content.parts:
-                        # Direct function_response on a part
-                        if hasattr(part, 'function_response') and part.function_response:
-                            try:
-                                resp = part.function_response.response
-                                _extract_locations(resp, locations)
-                            except Exception:
-                                pass
-
-                        # Some ADK versions wrap it differently
-                        if hasattr(part, 'text') and part.text:
-                            pass  # text parts are handled below
-
-                # Also check event-level tool responses (sub-agent results)
-                if hasattr(event, 'tool_response') and event.tool_response:
-                    try:
-                        _extract_locations(event.tool_response, locations)
-                    except Exception:
-                        pass
-
-                # Check actions for any function responses
-                if hasattr(event, 'actions') and event.actions:
-                    for action in event.actions:
-                        if hasattr(action, 'function_response') and action.function_response:
-                            try:
-                                _extract_locations(action.function_response.response, locations)
-                            except Exception:
-                                pass
-
-            except Exception as e:
-                print(f"[DEBUG] Event parse error: {e}")
-
-            if event.is_final_response():
-                if event.content and event.content.parts:
-                    final_response = "".join(
-                        p.text for p in event.content.parts if hasattr(p, "text") and p.text
-                    )
-
-        print(f"[DEBUG] Final locations: hotels={len(locations['hotels'])}, activities={len(locations['activities'])}")
-
-        # Fallback: if agent responded but no locations extracted,
-        # try calling the tools directly based on what city the user mentioned
-        if not locations["hotels"] and not locations["activities"] and final_response:
-            locations = _try_direct_tool_call(user_message, final_response)
-
-        return final_response or "I wasn't able to generate a response. Please try again.", locations
-
-    return asyncio.run(_run())
+    return final_response or "I wasn't able to generate a response. Please try again.", locations
+
+
+def stream_agent(session_id: str, user_message: str):
+    """
+    Streaming variant of run_agent — a sync generator of UI events for the
+    SSE endpoint. Ends with {"type": "done", "reply": str, "locations": {...}}.
+    """
+    final_response = ""
+    locations = {"hotels": [], "activities": []}
+
+    for event in agent_loop.iterate(_agent_events(session_id, user_message, streaming=True)):
+        if event["type"] == "final":
+            final_response = event["reply"]
+            locations = event["locations"]
+            continue
+        yield event
+
+    if final_response:
+        found = _locate_itinerary_places(user_message, final_response, locations)
+        if found["hotels"] or found["activities"]:
+            locations["hotels"] += found["hotels"]
+            locations["activities"] += found["activities"]
+            yield {"type": "locations", **found}
+
+    if not locations["hotels"] and not locations["activities"] and final_response:
+        locations = _try_direct_tool_call(user_message, final_response)
+        if locations["hotels"] or locations["activities"]:
+            yield {"type": "locations", **locations}
+
+    yield {
+        "type": "done",
+        "reply": final_response or "I wasn't able to generate a response. Please try again.",
+        "locations": locations,
+    }
+
+
+def _sse(event: dict) -> str:
+    """Format one UI event as a Server-Sent Events frame."""
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
 
 
 def _extract_locations(resp, locations):
@@ -122,95 +381,168 @@ def _extract_locations(resp, locations):
                     locations["activities"].append(a)
 
 
-def _try_direct_tool_call(user_message: str, itinerary_text: str = "") -> dict:
+def _locate_itinerary_places(user_message: str, itinerary_text: str, locations: dict) -> dict:
     """
-    Fallback: if the agent didn't surface tool results through events,
-    call search_hotels and search_activities directly using the city
-    mentioned in the user message, then filter against the itinerary text.
+    Pins for the hotels and activities the itinerary names that no tool
+    result has located yet: names are pulled from the text and geocoded in
+    one batch (tools/map_tools.geocode_places) within ITINERARY_GEOCODE_DEADLINE. Returns
+    only the new {"hotels": [...], "activities": [...]}; activities carry
+    the day they first appear on.
+    """
+    from tools.gazetteer import extract_destinations
+    from tools.itinerary_places import extract_itinerary_places
+    from tools.map_tools import geocode_places
+
+    found = {"hotels": [], "activities": []}
+    if not ITINERARY_GEOCODE:
+        return found
+
+    mentioned = extract_itinerary_places(itinerary_text)
+    if not mentioned["hotels"] and not mentioned["activities"]:
+        return found
+
+    # The destination is in this message or, for follow-ups ("2 people, mid-range"), in the itinerary
+    destinations = extract_destinations(user_message) or extract_destinations(itinerary_text)
+    if not destinations:
+        return found
+    city = destinations[0]["name"]
+
+    # Skip names a tool result already pinned ("Senso-ji" covers "Senso-ji Temple")
+    known = [p.get("name", "").casefold() for p in locations["hotels"] + locations["activities"]]
+    known = [k for k in known if k]
+
+    def _located(name):
+        name = name.casefold()
+        return any(k in name or name in k for k in known)
+
+    hotels = [n for n in mentioned["hotels"] if not _located(n)]
+    activities = [a for a in mentioned["activities"] if not _located(a["name"])]
+    if not hotels and not activities:
+        return found
+
+    with tracing.span("step", "itinerary_geocode", places=len(hotels) + len(activities)):
+        result = geocode_places(hotels + [a["name"] for a in activities], city,
+                                deadline=ITINERARY_GEOCODE_DEADLINE)
+    if result.get("status") != "success":
+        logger.info("itinerary geocode failed", extra={"city": city, "error": result.get("error_message")})
+        return found
+
+    pins = {p["name"]: p for p in result["places"]}
+    for name in hotels:
+        if name in pins:
+            pin = pins[name]
+            found["hotels"].append({"name": name, "address": pin["formatted_address"],
+                                    "lat": pin["lat"], "lon": pin["lon"]})
+    for activity in activities:
+        if activity["name"] in pins:
+            pin = pins[activity["name"]]
+            found["activities"].append({"name": activity["name"], "address": pin["formatted_address"],
+                                        "lat": pin["lat"], "lon": pin["lon"], "day": activity["day"]})
+    return found
+
+
+def _fallback_search(cities, deadline: float = None):
+    """
+    Search hotels and activities for one or more cities concurrently, sharing
+    one geocode per city. Everything must finish within `deadline` seconds
+    (FALLBACK_DEADLINE by default); whatever has finished by then is
+    returned as (hotels, activities), in city order.
     """
     from tools.activity_tools import search_activities
     from tools.hotel_tools import search_hotels
-    import re
+    from tools.geocoding import geocode_city
+
+    if isinstance(cities, str):
+        cities = [cities]
+    deadline = FALLBACK_DEADLINE if deadline is None else deadline
+    start = time.monotonic()
+    results = {}
+
+    # (tracing.bind carries the request trace onto the pool threads)
+    # Geocode each city once up front; the searches then hit the geocoding cache
+    geocodes = {_fallback_pool.submit(tracing.bind(geocode_city), city): city for city in cities}
+    done, not_done = wait(geocodes, timeout=deadline)
+    for future in not_done:
+        future.cancel()
+        logger.warning("fallback geocode missed deadline", extra={"city": geocodes[future], "deadline_s": deadline})
+
+    futures = {}
+    for future in done:
+        city = geocodes[future]
+        try:
+            geo = future.result()
+        except Exception as e:
+            geo = {"status": "error", "error_message": str(e)}
+        if geo.get("status") != "success":
+            logger.info("fallback geocode failed", extra={"city": city, "error": geo.get("error_message")})
+            continue
+        futures[_fallback_pool.submit(tracing.bind(search_hotels), city, limit=10)] = (city, "hotels")
+        futures[_fallback_pool.submit(tracing.bind(search_activities), city, limit=20)] = (city, "activities")
+
+    remaining = max(0.0, deadline - (time.monotonic() - start))
+    done, not_done = wait(futures, timeout=remaining)
+
+    for future in not_done:
+        future.cancel()
+        city, kind = futures[future]
+        logger.warning("fallback search missed deadline", extra={"city": city, "kind": kind, "deadline_s": deadline})
+
+    for future in done:
+        city, kind = futures[future]
+        try:
+            result = future.result()
+        except Exception:
+            logger.warning("fallback search failed", exc_info=True, extra={"city": city, "kind": kind})
+            continue
+        if result.get("status") != "success":
+            continue
+        results[(city, kind)] = [p for p in result[kind] if p.get("lat") and p.get("lon")]
+
+    all_hotels = [h for city in cities for h in results.get((city, "hotels"), [])]
+    all_activities = [a for city in cities for a in results.get((city, "activities"), [])]
+    return all_hotels, all_activities
 
-    locations = {"hotels": [], "activities": []}
 
-    # Words that are never city names
-    NON_CITY_WORDS = {
-        'i', 'me', 'my', 'we', 'our', 'us', 'you', 'your', 'he', 'she', 'they',
-        'the', 'a', 'an', 'is', 'are', 'was', 'were', 'hi', 'hey', 'hello',
-        'just', 'please', 'can', 'could', 'would', 'plan', 'help', 'want',
-        'looking', 'need', 'going', 'travel', 'trip', 'family', 'friend', 'friends'
-    }
+def _try_direct_tool_call(user_message: str, itinerary_text: str = "") -> dict:
+    """
+    Fallback: if the agent didn't surface tool results through events,
+    call search_hotels and search_activities directly for the destinations
+    the gazetteer finds in the user message, then filter against the
+    itinerary text.
+    """
+    from tools.gazetteer import extract_destinations
+    from tools.text_match import get_matcher
 
-    city = None
+    locations = {"hotels": [], "activities": []}
 
-    # Pattern 1: explicit "to/in/visit" pattern
-    city_match = re.search(
-        r'\b(?:to|in|visit|trip to|going to|travel to|traveling to|travelling to)\s+([A-Z][a-zA-Z\s]+?)(?:\.|,|\?|!|$|\s+for|\s+next|\s+with|\s+and)',
-        user_message
-    )
-    if city_match:
-        candidate = city_match.group(1).strip()
-        if candidate.lower() not in NON_CITY_WORDS:
-            city = candidate
-
-    # Pattern 2: widget submission format "Tokyo. 3-4 people. 7 days..."
-    if not city:
-        widget_match = re.match(r'^([A-Z][a-zA-Z\s]{2,30}?)\.', user_message.strip())
-        if widget_match:
-            candidate = widget_match.group(1).strip()
-            if candidate.lower() not in NON_CITY_WORDS and len(candidate.split()) <= 3:
-                city = candidate
-
-    if not city:
+    cities = [place["name"] for place in extract_destinations(user_message)][:FALLBACK_MAX_CITIES]
+    if not cities:
         return locations
 
-    print(f"[DEBUG] Fallback direct tool call for city: {city}")
+    logger.info("fallback direct tool call", extra={"cities": cities})
 
-    all_hotels = []
-    all_activities = []
-
-    try:
-        hotel_result = search_hotels(city, limit=10)
-        if hotel_result.get("status") == "success":
-            all_hotels = [h for h in hotel_result["hotels"] if h.get("lat") and h.get("lon")]
-    except Exception as e:
-        print(f"[DEBUG] Fallback hotel search failed: {e}")
-
-    try:
-        activity_result = search_activities(city, limit=20)
-        if activity_result.get("status") == "success":
-            all_activities = [a for a in activity_result["activities"] if a.get("lat") and a.get("lon")]
-    except Exception as e:
-        print(f"[DEBUG] Fallback activity search failed: {e}")
+    with tracing.span("step", "fallback_search", cities=len(cities)):
+        all_hotels, all_activities = _fallback_search(cities)
 
     # Filter against itinerary text if available
     if itinerary_text:
-        reply_lower = itinerary_text.lower()
-
-        def fuzzy_match(name, text):
-            if not name: return False
-            # Full name match (best)
-            if name.lower() in text: return True
-            # Require at least 2 significant words to match
-            words = [w for w in name.lower().split() if len(w) > 3]
-            if len(words) >= 2:
-                matches = sum(1 for w in words if w in text)
-                return matches >= 2
-            elif len(words) == 1:
-                # Single significant word — require it to be a whole word in the text
-                import re
-                return bool(re.search(r'\b' + re.escape(words[0]) + r'\b', text))
-            return False
-
-        filtered_hotels = [h for h in all_hotels if fuzzy_match(h.get("name", ""), reply_lower)]
-        filtered_activities = [a for a in all_activities if fuzzy_match(a.get("name", ""), reply_lower)]
-
-        print(f"[DEBUG] Hotel names from API: {[h.get('name') for h in all_hotels]}")
-        print(f"[DEBUG] Filtered hotels: {[h.get('name') for h in filtered_hotels]}")
-        print(f"[DEBUG] Activity names from API: {[a.get('name') for a in all_activities]}")
-        print(f"[DEBUG] Filtered activities: {[a.get('name') for a in filtered_activities]}")
-        print(f"[DEBUG] Itinerary snippet: {itinerary_text[:300]}")
+        # One automaton over every candidate name, one pass over the itinerary
+        candidates = all_hotels + all_activities
+        matcher = get_matcher(tuple(c.get("name", "") for c in candidates))
+        mentioned = [r["matched"] for r in matcher.match(itinerary_text)]
+
+        filtered_hotels = [h for h, hit in zip(all_hotels, mentioned) if hit]
+        filtered_activities = [a for a, hit in zip(all_activities, mentioned[len(all_hotels):]) if hit]
+
+        # Verbose dump, only for sampled requests with DEBUG on; built only then
+        if log.sampled(logger):
+            logger.debug("fallback filter", extra={
+                "hotels": [h.get("name") for h in all_hotels],
+                "filtered_hotels": [h.get("name") for h in filtered_hotels],
+                "activities": [a.get("name") for a in all_activities],
+                "filtered_activities": [a.get("name") for a in filtered_activities],
+                "itinerary_snippet": itinerary_text[:300],
+            })
 
         # Only use filter results if we got matches, otherwise show top results
         locations["hotels"] = filtered_hotels if filtered_hotels else all_hotels[:2]
@@ -247,7 +579,11 @@ def chat():
     Main chat endpoint.
     Expects JSON: { "message": str, "session_id": str }
     Returns JSON: { "reply": str, "locations": { "hotels": [...], "activities": [...] } }
+    Sending "Accept: text/event-stream" switches to the streaming mode of /api/chat/stream.
     """
+    if "text/event-stream" in request.headers.get("Accept", ""):
+        return chat_stream()
+
     data = request.get_json()
 
     if not data or "message" not in data:
@@ -262,17 +598,112 @@ def chat():
     try:
         reply, locations = run_agent(session_id, user_message)
         return jsonify({"reply": reply, "locations": locations})
-    except Exception as e:
-        print(f"[ERROR] Agent failed: {e}")
+    except Exception:
+        logger.exception("agent failed")
         return jsonify({"error": "The agent encountered an error. Please try again."}), 500
 
 
+@app.route("/api/chat/stream", methods=["POST"])
+def chat_stream():
+    """
+    Streaming chat endpoint (Server-Sent Events).
+    Expects JSON: { "message": str, "session_id": str }
+    Emits events: text, tool_start, tool_end, locations, done (or error).
+    The final "done" event carries the same reply/locations as /api/chat.
+    """
+    data = request.get_json()
+
+    if not data or "message" not in data:
+        return jsonify({"error": "Missing 'message' in request body"}), 400
+
+    user_message = data.get("message", "").strip()
+    session_id = data.get("session_id", "default-session")
+
+    if not user_message:
+        return jsonify({"error": "Message cannot be empty"}), 400
+
+    send_trace = _trace_requested()
+
+    def _generate():
+        try:
+            for event in stream_agent(session_id, user_message):
+                if event["type"] == "done" and send_trace:
+                    trace = tracing.current_trace()
+                    trace.finish()
+                    event["trace"] = trace.to_dict()
+                yield _sse(event)
+        except Exception:
+            logger.exception("agent stream failed")
+            yield _sse({"type": "error", "error": "The agent encountered an error. Please try again."})
+
+    return Response(
+        stream_with_context(_generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.route("/api/health", methods=["GET"])
 def health():
     """Health check endpoint."""
     return jsonify({"status": "ok", "agent": "root_travel_agent"})
 
 
+@app.route("/api/metrics", methods=["GET"])
+def metrics_endpoint():
+    """Prometheus metrics for every worker on this host (text exposition format)."""
+    families = metrics_exporter.gather()
+
+    # Derived and shared-state metrics: computed once here, not summed per worker
+    lookups = next((f for f in families if f["name"] == "wanderwise_cache_lookups_total"), {"samples": []})
+    totals = {}
+    for labels, n in lookups["samples"]:
+        hits, total = totals.get(labels["cache"], (0, 0))
+        totals[labels["cache"]] = (hits + (n if labels["result"] != "miss" else 0), total + n)
+    families.append(metrics.family(
+        "wanderwise_cache_hit_ratio", metrics.GAUGE, "Cache hits (fresh or stale) over lookups, all workers.",
+        [({"cache": cache}, round(hits / total, 4) if total else 0.0) for cache, (hits, total) in totals.items()],
+    ))
+
+    try:
+        if hasattr(session_service, "count_sessions"):
+            sessions = agent_loop.run(session_service.count_sessions(APP_NAME), timeout=5)
+        else:  # in-memory store: this worker's sessions only
+            sessions = sum(len(users) for users in session_service.sessions.get(APP_NAME, {}).values())
+        families.append(metrics.family(
+            "wanderwise_sessions", metrics.GAUGE, "Conversations in the session store.", [({}, sessions)],
+        ))
+    except Exception:
+        logger.warning("session count failed", exc_info=True)
+
+    export = export_cache.stats()
+    families.append(metrics.family(
+        "wanderwise_pdf_export_cache_bytes", metrics.GAUGE, "Bytes of cached PDFs on disk.", [({}, export["bytes"])],
+    ))
+
+    return Response(metrics.render(families), content_type=metrics.CONTENT_TYPE)
+
+
+@app.route("/api/budget/scenarios", methods=["POST"])
+def budget_scenarios():
+    """
+    Compare budget scenarios without going through the agent.
+    Expects JSON: { "city": str, "budget_tiers": [str] | str, "num_days": [int] | str,
+                    "num_people": [int] | str, "hotel_price_levels": [str] | str (optional),
+                    "activity_types": [str] | str (optional), "activities_per_day": int (optional) }
+    Returns: the estimate_budget_scenarios table ({"columns", "rows", ...}), 400 on bad input.
+    """
+    from tools.budget_tools import estimate_budget_scenarios
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not data.get("city"):
+        return jsonify({"status": "error", "error_message": "Missing 'city' in request body"}), 400
+
+    fields = ("budget_tiers", "num_days", "num_people", "hotel_price_levels", "activity_types", "activities_per_day")
+    result = estimate_budget_scenarios(data["city"], **{k: data[k] for k in fields if k in data})
+    return jsonify(result), 200 if result["status"] == "success" else 400
+
+
 @app.route("/api/reset", methods=["POST"])
 def reset():
     """
@@ -290,7 +721,7 @@ def reset():
         )
 
     try:
-        asyncio.run(_reset())
+        agent_loop.run(_reset())
         return jsonify({"status": "session reset"})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -302,14 +733,9 @@ def export_pdf():
     """
     Generate a PDF of the latest itinerary.
     Expects JSON: { "content": str, "title": str }
-    Returns: PDF file download
+    Returns: PDF file download (ETag'd; 304 if If-None-Match matches)
     """
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import mm
-    from reportlab.lib import colors
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, HRFlowable
-    from reportlab.lib.enums import TA_LEFT, TA_CENTER
+    import re
 
     data = request.get_json()
     if not data or "content" not in data:
@@ -317,127 +743,41 @@ def export_pdf():
 
     raw_content = data.get("content", "")
     title = data.get("title", "My WanderWise Itinerary")
+    generated_on = datetime.now().strftime('%B %d, %Y')
+    etag = export_key(raw_content, title, TEMPLATE_VERSION, generated_on)
 
-    try:
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=A4,
-            rightMargin=20*mm, leftMargin=20*mm,
-            topMargin=20*mm, bottomMargin=20*mm
-        )
-
-        # ── Styles ──
-        styles = getSampleStyleSheet()
-
-        title_style = ParagraphStyle(
-            'WTitle', parent=styles['Normal'],
-            fontName='Helvetica-Bold', fontSize=22,
-            textColor=colors.HexColor('#1a1612'),
-            spaceAfter=4, alignment=TA_CENTER
-        )
-        subtitle_style = ParagraphStyle(
-            'WSubtitle', parent=styles['Normal'],
-            fontName='Helvetica', fontSize=10,
-            textColor=colors.HexColor('#7a7268'),
-            spaceAfter=16, alignment=TA_CENTER
-        )
-        section_style = ParagraphStyle(
-            'WSection', parent=styles['Normal'],
-            fontName='Helvetica-Bold', fontSize=12,
-            textColor=colors.HexColor('#c4633a'),
-            spaceBefore=14, spaceAfter=4,
-        )
-        day_style = ParagraphStyle(
-            'WDay', parent=styles['Normal'],
-            fontName='Helvetica-Bold', fontSize=10,
-            textColor=colors.HexColor('#c9a84c'),
-            spaceBefore=10, spaceAfter=3,
-            leftIndent=0,
-        )
-        body_style = ParagraphStyle(
-            'WBody', parent=styles['Normal'],
-            fontName='Helvetica', fontSize=10,
-            textColor=colors.HexColor('#1a1612'),
-            spaceAfter=4, leading=15,
-        )
-        bullet_style = ParagraphStyle(
-            'WBullet', parent=styles['Normal'],
-            fontName='Helvetica', fontSize=10,
-            textColor=colors.HexColor('#1a1612'),
-            spaceAfter=3, leading=14,
-            leftIndent=12, bulletIndent=0,
-        )
-        footer_style = ParagraphStyle(
-            'WFooter', parent=styles['Normal'],
-            fontName='Helvetica', fontSize=8,
-            textColor=colors.HexColor('#7a7268'),
-            alignment=TA_CENTER, spaceBefore=20,
-        )
-
-        story = []
-
-        # ── Header ──
-        story.append(Spacer(1, 6*mm))
-        story.append(Paragraph("✦ WanderWise", title_style))
-        story.append(Paragraph(title, subtitle_style))
-        story.append(HRFlowable(width="100%", thickness=1, color=colors.HexColor('#e0d8cc'), spaceAfter=12))
-
-        # ── Parse and render content ──
-        import re
-        lines = raw_content.split('\n')
-
-        for line in lines:
-            line = line.strip()
-            if not line:
-                story.append(Spacer(1, 3*mm))
-                continue
-
-            # Strip markdown bold
-            line_clean = re.sub(r'\*\*(.*?)\*\*', r'\1', line)
-            line_clean = re.sub(r'\*(.*?)\*', r'\1', line_clean)
-
-            # Day headers
-            if re.match(r'^Day\s+\d+', line_clean, re.IGNORECASE):
-                story.append(Paragraph(line_clean, day_style))
-                continue
-
-            # Section headers (ends with colon, short line)
-            if line_clean.endswith(':') and len(line_clean) < 60 and not line_clean.startswith('*'):
-                story.append(Paragraph(line_clean, section_style))
-                continue
-
-            # Bullet points
-            if line_clean.startswith('*') or line_clean.startswith('-'):
-                item = re.sub(r'^[\*\-]\s*', '', line_clean)
-                story.append(Paragraph(f"• {item}", bullet_style))
-                continue
-
-            # Normal text
-            story.append(Paragraph(line_clean, body_style))
-
-        # ── Footer ──
-        story.append(HRFlowable(width="100%", thickness=1, color=colors.HexColor('#e0d8cc'), spaceBefore=16))
-        story.append(Paragraph(
-            f"Generated by WanderWise AI · {datetime.now().strftime('%B %d, %Y')}",
-            footer_style
-        ))
+    # The client already holds exactly this PDF
+    if request.if_none_match.contains(etag):
+        export_cache.record_not_modified()
+        resp = Response(status=304)
+        resp.set_etag(etag)
+        return resp
 
-        doc.build(story)
-        buffer.seek(0)
+    try:
+        pdf = export_cache.get(etag)
+        if pdf is None:
+            with tracing.span("step", "pdf_render"):
+                pdf = pdf_pool.render(raw_content, title, generated_on)
+            export_cache.put(etag, pdf)
 
         safe_title = re.sub(r'[^a-zA-Z0-9\s]', '', title).strip().replace(' ', '_')[:40]
         filename = f"WanderWise_{safe_title}.pdf"
 
-        return send_file(
-            buffer,
+        resp = send_file(
+            io.BytesIO(pdf),
             mimetype='application/pdf',
             as_attachment=True,
-            download_name=filename
+            download_name=filename,
+            etag=etag,
         )
+        resp.headers["Cache-Control"] = "private, no-cache"
+        return resp
 
+    except RenderQueueFull as e:
+        logger.info("pdf export rejected", extra={"reason": str(e)})
+        return jsonify({"error": "Too many exports in progress. Please try again shortly."}), 503, {"Retry-After": "5"}
     except Exception as e:
-        print(f"[ERROR] PDF export failed: {e}")
+        logger.exception("pdf export failed")
         return jsonify({"error": str(e)}), 500
 
 
@@ -445,55 +785,26 @@ def export_pdf():
 def get_suggestions():
     """
     Generate 4 follow-up suggestions using Gemini based on the latest AI reply.
-    Expects JSON: { "reply": str, "user_message": str }
+    Usually already prefetched in the background by the chat turn.
+    Expects JSON: { "reply": str, "user_message": str, "session_id": str (optional) }
     Returns: { "suggestions": [str, str, str, str] }
     """
-    import google.generativeai as genai
-
     data = request.get_json()
     if not data or "reply" not in data:
         return jsonify({"suggestions": []}), 400
 
-    ai_reply = data.get("reply", "")[:600]
+    ai_reply = data.get("reply", "")
     user_message = data.get("user_message", "")
+    session_id = data.get("session_id")
 
     try:
-        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-        model = genai.GenerativeModel("gemini-2.0-flash")
-
-        prompt = f"""The user asked a travel question and got a travel plan back.
+        result = agent_loop.run(suggestions.suggestions_for(session_id, user_message, ai_reply))
+        return jsonify({"suggestions": result})
 
-User asked: "{user_message}"
-AI responded with: {ai_reply}
-
-Generate exactly 4 short follow-up suggestions the user might want to ask next.
-Rules:
-- Return ONLY a JSON array of 4 strings, nothing else, no markdown
-- Each string must be under 60 characters
-- Make them varied: mix modifications, additions, and questions
-- Make them specific to this exact trip
-- Examples: "Add a day trip to Kyoto", "Switch to luxury hotels", "What's the best time to visit?", "Add more food experiences"
-"""
-
-        response = model.generate_content(prompt)
-        raw = response.text.strip().replace("```json", "").replace("```", "").strip()
-
-        import json
-        suggestions = json.loads(raw)
-        if not isinstance(suggestions, list):
-            raise ValueError("Not a list")
-
-        return jsonify({"suggestions": suggestions[:4]})
-
-    except Exception as e:
-        print(f"[ERROR] Suggestions failed: {e}")
+    except Exception:
+        logger.exception("suggestions failed")
         # Fallback hardcoded suggestions
-        return jsonify({"suggestions": [
-            "Add more restaurant recommendations",
-            "Switch to a different budget tier",
-            "Extend the trip by 2 days",
-            "What's the best time of year to visit?"
-        ]})
+        return jsonify({"suggestions": suggestions.FALLBACK_SUGGESTIONS})
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
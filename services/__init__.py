@@ -0,0 +1,2 @@
+# services/__init__.py
+# Server-side infrastructure shared by the Flask app (agent runtime, stores, caches)
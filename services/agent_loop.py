@@ -0,0 +1,159 @@
+# services/agent_loop.py
+
+# ---------------------------------------------------------------------------
+# One long-lived asyncio event loop and one ADK Runner per worker process.
+#
+# Flask handlers are synchronous, so previously every /api/chat call did
+# asyncio.run() and built a fresh Runner — paying loop setup, runner
+# construction and cold model clients on every message. AgentLoop runs a
+# single loop on a daemon thread and handlers submit coroutines to it.
+# Submitted coroutines run in a copy of the submitting thread's context,
+# so per-request ContextVars (e.g. the request trace) follow them.
+# ---------------------------------------------------------------------------
+
+import asyncio
+import contextvars
+import os
+import queue
+import threading
+
+from google.adk.runners import Runner
+
+from tools import http_client
+
+
+class AgentLoop:
+    """
+    Owns a background event loop and a reusable Runner for one agent.
+
+    The loop thread is started lazily on first use and restarted after a
+    fork, so it is safe to create at import time even under gunicorn
+    with --preload.
+    """
+
+    def __init__(self, agent, app_name: str, session_service, plugins=None):
+        self.agent = agent
+        self.app_name = app_name
+        self.session_service = session_service
+        self.plugins = list(plugins or [])
+        self._loop = None
+        self._thread = None
+        self._runner = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._loop is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._loop is not None and self._pid == os.getpid():
+                return
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def _serve():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            thread = threading.Thread(target=_serve, name="agent-loop", daemon=True)
+            thread.start()
+            ready.wait()
+
+            self._loop = loop
+            self._thread = thread
+            self._runner = None
+            self._pid = os.getpid()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        self._ensure_started()
+        return self._loop
+
+    @property
+    def runner(self) -> Runner:
+        """The shared Runner, built once per process on first access."""
+        self._ensure_started()
+        if self._runner is None:
+            with self._lock:
+                if self._runner is None:
+                    self._runner = Runner(
+                        agent=self.agent,
+                        app_name=self.app_name,
+                        session_service=self.session_service,
+                        plugins=self.plugins,
+                    )
+        return self._runner
+
+    def submit(self, coro):
+        """
+        Schedule a coroutine on the loop and return a concurrent Future.
+        The coroutine runs in a copy of the caller's contextvars context.
+        """
+        context = contextvars.copy_context()
+
+        async def _in_context():
+            # Tasks copy the context current at creation; create it inside ours
+            task = context.run(asyncio.ensure_future, coro)
+            return await task
+
+        return asyncio.run_coroutine_threadsafe(_in_context(), self.loop)
+
+    def run(self, coro, timeout: float = None):
+        """Run a coroutine on the loop and block the calling thread for its result."""
+        future = self.submit(coro)
+        try:
+            return future.result(timeout=timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def iterate(self, agen, timeout: float = None):
+        """
+        Drive an async generator on the loop and yield its items in the
+        calling thread as they are produced. Closing the returned generator
+        early (e.g. a streaming client disconnects) cancels the producer.
+        """
+        items = queue.Queue()
+        done = object()
+
+        async def _pump():
+            try:
+                async for item in agen:
+                    items.put((True, item))
+            except Exception as e:
+                items.put((False, e))
+            finally:
+                items.put((True, done))
+
+        future = self.submit(_pump())
+        try:
+            while True:
+                ok, item = items.get(timeout=timeout)
+                if not ok:
+                    raise item
+                if item is done:
+                    return
+                yield item
+        finally:
+            future.cancel()
+
+    def close(self):
+        """Close the runner and stop the loop. Mainly for tests and benchmarks."""
+        if self._loop is None or self._pid != os.getpid():
+            return
+        if self._runner is not None:
+            try:
+                self.run(self._runner.close(), timeout=5)
+            except Exception:
+                pass
+        try:
+            self.run(http_client.aclose(), timeout=5)
+        except Exception:
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+        self._loop = None
+        self._thread = None
+        self._runner = None
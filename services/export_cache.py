@@ -0,0 +1,146 @@
+# services/export_cache.py
+
+# ---------------------------------------------------------------------------
+# Content-addressed cache of rendered itinerary PDFs for /api/export.
+#
+# Users hit "Export" repeatedly on the same itinerary. Each PDF is stored
+# on disk under the SHA-256 of everything that determines its bytes
+# (template version, title, content, footer date), so every gunicorn
+# worker on the host shares the cache and a repeat export is a file read.
+# The same digest is the response ETag, which lets the browser revalidate
+# with If-None-Match and get a 304 with no body.
+#
+#   EXPORT_CACHE_DIR       = cache directory (default .cache/exports)
+#   EXPORT_CACHE_MAX_BYTES = total size kept on disk (default 64 MB)
+# ---------------------------------------------------------------------------
+
+import hashlib
+import os
+import tempfile
+import threading
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "exports")
+
+EXPORT_CACHE_MAX_BYTES = int(os.getenv("EXPORT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+def export_key(content: str, title: str, template_version: str, generated_on: str = "") -> str:
+    """Hex SHA-256 over the inputs that determine a rendered PDF."""
+    digest = hashlib.sha256()
+    for part in (template_version, title, generated_on, content):
+        data = part.encode("utf-8")
+        digest.update(len(data).to_bytes(8, "big"))  # length-prefixed so fields can't run together
+        digest.update(data)
+    return digest.hexdigest()
+
+
+class PdfCache:
+    """
+    Size-bounded directory of `<key>.pdf` files, safe to share between
+    processes: writes go to a temp file and are renamed into place, reads
+    bump the file's mtime, and when the directory outgrows `max_bytes` the
+    least recently used files are deleted. Hit / miss counters are per
+    process.
+    """
+
+    def __init__(self, directory: str = None, max_bytes: int = EXPORT_CACHE_MAX_BYTES):
+        self.directory = directory or os.getenv("EXPORT_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.not_modified = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def get(self, key: str):
+        """Cached PDF bytes for `key`, or None."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                pdf = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return pdf
+
+    def record_not_modified(self):
+        """Count a request answered 304 from the client's own copy."""
+        with self._lock:
+            self.not_modified += 1
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def put(self, key: str, pdf: bytes):
+        if len(pdf) > self.max_bytes:
+            return
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(pdf)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        self._evict()
+
+    def _entries(self) -> list:
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".pdf"):
+                    try:
+                        st = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        return entries
+
+    def _evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                continue  # another worker evicted it first
+            total -= size
+            with self._lock:
+                self.evictions += 1
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        for _, _, path in self._entries():
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self.hits = self.misses = self.evictions = self.not_modified = 0
+
+    def stats(self) -> dict:
+        entries = self._entries()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "not_modified": self.not_modified,
+                "files": len(entries),
+                "bytes": sum(size for _, size, _ in entries),
+                "max_bytes": self.max_bytes,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,239 @@
+# services/metrics.py
+
+# ---------------------------------------------------------------------------
+# Prometheus text-format metrics for /api/metrics, aggregated across the
+# gunicorn workers.
+#
+# Each worker keeps its own counters and histograms in memory (request
+# counts, cache stats, outbound call latencies, ...). A background thread
+# writes the worker's snapshot to METRICS_DIR/<pid>.json every
+# METRICS_FLUSH_SECONDS, and whichever worker answers the scrape flushes
+# its own snapshot and merges every worker's file:
+#   - counters and histograms are summed over all files, including those
+#     of workers that have since exited, so totals never go backwards
+#     across worker restarts;
+#   - gauges are summed over live workers only.
+# This is the same model as prometheus_client's multiprocess mode, without
+# the dependency. Clear METRICS_DIR when redeploying to restart the totals.
+#
+#   METRICS_DIR           = snapshot directory (default .cache/metrics)
+#   METRICS_FLUSH_SECONDS = how often each worker writes its snapshot (default 5)
+# ---------------------------------------------------------------------------
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+from tools import log
+from tools.metrics import LatencyHistogram
+
+logger = log.get_logger("services.metrics")
+
+DEFAULT_METRICS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "metrics")
+
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+COUNTER, GAUGE, HISTOGRAM = "counter", "gauge", "histogram"
+
+
+def family(name: str, kind: str, help_text: str, samples) -> dict:
+    """
+    One metric family as plain JSON-able data. `samples` is a list of
+    (labels dict, value) — a number, or a LatencyHistogram snapshot for
+    histograms.
+    """
+    return {"name": name, "type": kind, "help": help_text, "samples": [[dict(l), v] for l, v in samples]}
+
+
+class RequestMetrics:
+    """Per-process request counts, latencies and in-flight requests by route."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}     # (route, method, status) -> requests
+        self._latency = {}    # route -> LatencyHistogram
+        self._in_flight = {}  # route -> requests running now
+
+    def started(self, route: str):
+        with self._lock:
+            self._in_flight[route] = self._in_flight.get(route, 0) + 1
+
+    def finished(self, route: str, method: str, status: int, seconds: float):
+        with self._lock:
+            self._in_flight[route] = self._in_flight.get(route, 1) - 1
+            key = (route, method, str(status))
+            self._counts[key] = self._counts.get(key, 0) + 1
+            hist = self._latency.get(route)
+            if hist is None:
+                hist = self._latency[route] = LatencyHistogram()
+        hist.observe(seconds)
+
+    def in_flight(self, route: str) -> int:
+        with self._lock:
+            return self._in_flight.get(route, 0)
+
+    def families(self) -> list:
+        with self._lock:
+            counts = list(self._counts.items())
+            latency = list(self._latency.items())
+            in_flight = list(self._in_flight.items())
+        return [
+            family("wanderwise_http_requests_total", COUNTER, "HTTP requests served, by route, method and status.",
+                   [({"route": r, "method": m, "status": s}, n) for (r, m, s), n in counts]),
+            family("wanderwise_http_request_duration_seconds", HISTOGRAM, "HTTP request latency by route.",
+                   [({"route": r}, h.snapshot()) for r, h in latency]),
+            family("wanderwise_http_requests_in_flight", GAUGE, "HTTP requests being served, by route.",
+                   [({"route": r}, n) for r, n in in_flight]),
+        ]
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _merge_histogram(into: dict, snap: dict):
+    into["count"] += snap["count"]
+    into["sum"] += snap["sum"]
+    for bound, n in snap["buckets"].items():
+        into["buckets"][bound] = into["buckets"].get(bound, 0) + n
+
+
+def merge(snapshots) -> list:
+    """
+    Combine worker snapshots ({"pid", "live", "families"}) into one list of
+    families: counters and histograms summed, gauges summed over live workers.
+    """
+    merged = {}  # name -> family with samples keyed by frozen labels
+    for snap in snapshots:
+        for fam in snap["families"]:
+            if fam["type"] == GAUGE and not snap["live"]:
+                continue
+            target = merged.setdefault(fam["name"], {**fam, "samples": {}})
+            for labels, value in fam["samples"]:
+                key = tuple(sorted(labels.items()))
+                if fam["type"] == HISTOGRAM:
+                    hist = target["samples"].setdefault(key, {"count": 0, "sum": 0.0, "buckets": {}})
+                    _merge_histogram(hist, value)
+                else:
+                    target["samples"][key] = target["samples"].get(key, 0) + value
+    return [
+        {**fam, "samples": [[dict(key), value] for key, value in sorted(fam["samples"].items())]}
+        for fam in merged.values()
+    ]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: dict, extra: dict = None) -> str:
+    items = list(labels.items()) + list((extra or {}).items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def _number(value) -> str:
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+def render(families) -> str:
+    """Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    for fam in families:
+        name = fam["name"]
+        lines.append(f"# HELP {name} {fam['help']}")
+        lines.append(f"# TYPE {name} {fam['type']}")
+        for labels, value in fam["samples"]:
+            if fam["type"] == HISTOGRAM:
+                for bound, n in value["buckets"].items():
+                    lines.append(f"{name}_bucket{_labels(labels, {'le': bound})} {n}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(float(value['sum']))}")
+                lines.append(f"{name}_count{_labels(labels)} {value['count']}")
+            else:
+                lines.append(f"{name}{_labels(labels)} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """
+    Writes this worker's snapshot (from `collect()`, a list of families) to
+    `directory` periodically, and merges every worker's snapshot on demand.
+    The flush thread starts on first use and again after a fork.
+    """
+
+    def __init__(self, collect, directory: str = None, interval: float = METRICS_FLUSH_SECONDS):
+        self.collect = collect
+        self.directory = directory or os.getenv("METRICS_DIR", DEFAULT_METRICS_DIR)
+        self.interval = interval
+        self._pid = None
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            if self.interval > 0:
+                threading.Thread(target=self._run, name="metrics-flush", daemon=True).start()
+
+    def _run(self):
+        pid = os.getpid()
+        while self._pid == pid:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.warning("metrics flush failed", exc_info=True)
+
+    def flush(self) -> list:
+        """Write (and return) this worker's current snapshot."""
+        families = self.collect()
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"pid": os.getpid(), "time": time.time(), "families": families}, f)
+            os.replace(tmp, os.path.join(self.directory, f"{os.getpid()}.json"))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        return families
+
+    def snapshots(self) -> list:
+        """Every worker's latest snapshot, this one fresh, each marked live or not."""
+        own = {"pid": os.getpid(), "live": True, "families": self.flush()}
+        snapshots = [own]
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(".json") or entry.name == f"{os.getpid()}.json":
+                    continue
+                try:
+                    with open(entry.path) as f:
+                        snap = json.load(f)
+                except (OSError, ValueError):
+                    continue  # being replaced, or half-written by a crashed worker
+                snap["live"] = _pid_alive(snap["pid"])
+                snapshots.append(snap)
+        return snapshots
+
+    def gather(self) -> list:
+        """Families merged across every worker."""
+        return merge(self.snapshots())
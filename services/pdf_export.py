@@ -0,0 +1,267 @@
+# services/pdf_export.py
+
+# ---------------------------------------------------------------------------
+# Itinerary PDF rendering for /api/export.
+#
+# Paragraph styles are built once at import instead of on every request,
+# and doc.build() — pure CPU — runs in a small process pool so a burst of
+# exports can't pin the gunicorn worker threads (or the GIL) that serve
+# chat. The pool is bounded: once PDF_RENDER_WORKERS renders are running
+# and PDF_RENDER_QUEUE more are waiting, new exports are rejected with
+# RenderQueueFull (the endpoint answers 503) instead of piling up.
+#
+#   PDF_RENDER_WORKERS = render processes per gunicorn worker (default 2;
+#                        0 renders in the request thread)
+#   PDF_RENDER_QUEUE   = extra renders allowed to wait (default 8)
+#   PDF_RENDER_TIMEOUT = seconds a request waits for its PDF (default 30)
+# ---------------------------------------------------------------------------
+
+import io
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import datetime
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.platypus import HRFlowable, Paragraph, SimpleDocTemplate, Spacer
+
+from tools.metrics import LatencyHistogram
+
+PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", "2"))
+PDF_RENDER_QUEUE = int(os.getenv("PDF_RENDER_QUEUE", "8"))
+PDF_RENDER_TIMEOUT = float(os.getenv("PDF_RENDER_TIMEOUT", "30"))
+
+# Render-time histogram buckets (seconds, including time queued for a worker)
+PDF_RENDER_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Bump when the layout or styles change (part of the export cache key)
+TEMPLATE_VERSION = "1"
+
+# ── Styles (built once per process) ──
+_base = getSampleStyleSheet()["Normal"]
+
+STYLES = {
+    "title": ParagraphStyle(
+        'WTitle', parent=_base,
+        fontName='Helvetica-Bold', fontSize=22,
+        textColor=colors.HexColor('#1a1612'),
+        spaceAfter=4, alignment=TA_CENTER
+    ),
+    "subtitle": ParagraphStyle(
+        'WSubtitle', parent=_base,
+        fontName='Helvetica', fontSize=10,
+        textColor=colors.HexColor('#7a7268'),
+        spaceAfter=16, alignment=TA_CENTER
+    ),
+    "section": ParagraphStyle(
+        'WSection', parent=_base,
+        fontName='Helvetica-Bold', fontSize=12,
+        textColor=colors.HexColor('#c4633a'),
+        spaceBefore=14, spaceAfter=4,
+    ),
+    "day": ParagraphStyle(
+        'WDay', parent=_base,
+        fontName='Helvetica-Bold', fontSize=10,
+        textColor=colors.HexColor('#c9a84c'),
+        spaceBefore=10, spaceAfter=3,
+        leftIndent=0,
+    ),
+    "body": ParagraphStyle(
+        'WBody', parent=_base,
+        fontName='Helvetica', fontSize=10,
+        textColor=colors.HexColor('#1a1612'),
+        spaceAfter=4, leading=15,
+    ),
+    "bullet": ParagraphStyle(
+        'WBullet', parent=_base,
+        fontName='Helvetica', fontSize=10,
+        textColor=colors.HexColor('#1a1612'),
+        spaceAfter=3, leading=14,
+        leftIndent=12, bulletIndent=0,
+    ),
+    "footer": ParagraphStyle(
+        'WFooter', parent=_base,
+        fontName='Helvetica', fontSize=8,
+        textColor=colors.HexColor('#7a7268'),
+        alignment=TA_CENTER, spaceBefore=20,
+    ),
+}
+
+RULE_COLOR = colors.HexColor('#e0d8cc')
+
+_BOLD_RE = re.compile(r'\*\*(.*?)\*\*')
+_ITALIC_RE = re.compile(r'\*(.*?)\*')
+_DAY_RE = re.compile(r'^Day\s+\d+', re.IGNORECASE)
+_BULLET_RE = re.compile(r'^[\*\-]\s*')
+
+
+def _build_story(raw_content: str, title: str, generated_on: str) -> list:
+    story = []
+
+    # ── Header ──
+    story.append(Spacer(1, 6*mm))
+    story.append(Paragraph("✦ WanderWise", STYLES["title"]))
+    story.append(Paragraph(title, STYLES["subtitle"]))
+    story.append(HRFlowable(width="100%", thickness=1, color=RULE_COLOR, spaceAfter=12))
+
+    # ── Parse and render content ──
+    for line in raw_content.split('\n'):
+        line = line.strip()
+        if not line:
+            story.append(Spacer(1, 3*mm))
+            continue
+
+        # Strip markdown bold
+        line_clean = _BOLD_RE.sub(r'\1', line)
+        line_clean = _ITALIC_RE.sub(r'\1', line_clean)
+
+        # Day headers
+        if _DAY_RE.match(line_clean):
+            story.append(Paragraph(line_clean, STYLES["day"]))
+            continue
+
+        # Section headers (ends with colon, short line)
+        if line_clean.endswith(':') and len(line_clean) < 60 and not line_clean.startswith('*'):
+            story.append(Paragraph(line_clean, STYLES["section"]))
+            continue
+
+        # Bullet points
+        if line_clean.startswith('*') or line_clean.startswith('-'):
+            item = _BULLET_RE.sub('', line_clean)
+            story.append(Paragraph(f"• {item}", STYLES["bullet"]))
+            continue
+
+        # Normal text
+        story.append(Paragraph(line_clean, STYLES["body"]))
+
+    # ── Footer ──
+    story.append(HRFlowable(width="100%", thickness=1, color=RULE_COLOR, spaceBefore=16))
+    story.append(Paragraph(f"Generated by WanderWise AI · {generated_on}", STYLES["footer"]))
+    return story
+
+
+def render_itinerary_pdf(raw_content: str, title: str, generated_on: str = None) -> bytes:
+    """Render an itinerary (light markdown) to PDF bytes."""
+    generated_on = generated_on or datetime.now().strftime('%B %d, %Y')
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        rightMargin=20*mm, leftMargin=20*mm,
+        topMargin=20*mm, bottomMargin=20*mm
+    )
+    doc.build(_build_story(raw_content, title, generated_on))
+    return buffer.getvalue()
+
+
+class RenderQueueFull(RuntimeError):
+    """Raised when the render pool already has its maximum of in-flight jobs."""
+
+
+class PdfRenderPool:
+    """
+    Bounded process pool for render_itinerary_pdf.
+
+    At most `workers` renders run at once and `max_queue` more may wait;
+    submissions beyond that raise RenderQueueFull. Worker processes are
+    spawned (not forked from the threaded server) on first use, and the
+    pool is rebuilt if the owning process forks.
+    """
+
+    def __init__(self, workers: int = PDF_RENDER_WORKERS, max_queue: int = PDF_RENDER_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = None
+        self._pid = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self.rendered = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.render_latency = LatencyHistogram(PDF_RENDER_BUCKETS)
+
+    @property
+    def capacity(self) -> int:
+        return max(1, self.workers) + self.max_queue
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None or self._pid != os.getpid():
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            self._pid = os.getpid()
+        return self._executor
+
+    def warm(self):
+        """Start every worker process now rather than on the first exports."""
+        if self.workers > 0:
+            with self._lock:
+                executor = self._get_executor()
+            for future in [executor.submit(os.getpid) for _ in range(self.workers)]:
+                future.result()
+
+    def render(self, raw_content: str, title: str, generated_on: str = None,
+               timeout: float = PDF_RENDER_TIMEOUT) -> bytes:
+        """Render in the pool and wait for the bytes (RenderQueueFull if saturated)."""
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self.rejected += 1
+                raise RenderQueueFull(f"{self._in_flight} PDF renders already in flight")
+            self._in_flight += 1
+            executor = self._get_executor() if self.workers > 0 else None
+        start = time.perf_counter()
+        if executor is None:
+            try:
+                pdf = render_itinerary_pdf(raw_content, title, generated_on)
+            finally:
+                self._release()
+        else:
+            try:
+                future = executor.submit(render_itinerary_pdf, raw_content, title, generated_on)
+            except BaseException:
+                self._release()
+                raise
+            # The slot frees when the worker is done with it, not when we stop waiting
+            future.add_done_callback(self._release)
+            try:
+                pdf = future.result(timeout=timeout)
+            except FutureTimeoutError:
+                future.cancel()  # only stops a render still queued
+                with self._lock:
+                    self.timed_out += 1
+                raise
+        with self._lock:
+            self.rendered += 1
+        self.render_latency.observe(time.perf_counter() - start)
+        return pdf
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._in_flight -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "rendered": self.rendered,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "render_seconds": self.render_latency.snapshot(),
+            }
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,125 @@
+# services/session_store.py
+
+# ---------------------------------------------------------------------------
+# Pluggable ADK session backends.
+#
+# The Procfile runs several gunicorn workers; with InMemorySessionService a
+# follow-up message that lands on a different worker loses the whole
+# conversation. The default backend is now a SQLite file shared by every
+# worker on the host (WAL mode, so readers never block the writer).
+#
+# SharedSqliteSessionService relies on two private details: ADK's
+# SqliteSessionService._get_db_connection (every method opens its
+# connection through it) and aiosqlite's Connection._thread. Both packages
+# are pinned in requirements.txt, and tests/test_session_store.py fails
+# if either detail changes.
+#
+#   SESSION_BACKEND = "sqlite" (default) | "memory"
+#   SESSION_DB_PATH = path of the SQLite file (default .sessions/wanderwise.db)
+# ---------------------------------------------------------------------------
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+import aiosqlite
+from google.adk.sessions import InMemorySessionService
+from google.adk.sessions.sqlite_session_service import (
+    CREATE_SCHEMA_SQL,
+    PRAGMA_FOREIGN_KEYS,
+    SqliteSessionService,
+)
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".sessions", "wanderwise.db")
+
+# Milliseconds a writer waits for another worker's transaction before failing
+SESSION_DB_BUSY_TIMEOUT_MS = int(os.getenv("SESSION_DB_BUSY_TIMEOUT_MS", "5000"))
+
+# Event history is read per session in timestamp order; the primary key
+# (app_name, user_id, session_id, id) can't serve that ordering on its own.
+EVENTS_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_events_session_time
+    ON events (app_name, user_id, session_id, timestamp);
+"""
+
+
+class SharedSqliteSessionService(SqliteSessionService):
+    """
+    ADK's SqliteSessionService tuned for several processes sharing one file.
+
+    ADK opens a new connection (and re-runs the schema script) for every
+    call. This keeps one WAL-mode connection per event loop, creates the
+    schema and indexes once, and serializes this process's statements on
+    it so multi-statement writes stay atomic. Events are append-only rows
+    looked up through the (app, user, session) index.
+
+    The lock covers reads too: they share the connection, and a read
+    interleaved with another call's open write transaction would see its
+    uncommitted rows. So every session call in the worker queues on it.
+    Waiting is an await and never blocks the loop, and each call is a
+    millisecond-scale indexed SQLite statement or two. Other workers are
+    not held up, because they use their own connections and WAL lets
+    readers run alongside a writer.
+    """
+
+    def __init__(self, db_path: str):
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        super().__init__(db_path)
+        self._db = None
+        self._db_loop = None
+        self._db_lock = None
+
+    async def _open(self) -> aiosqlite.Connection:
+        connection = aiosqlite.connect(self._db_path, timeout=SESSION_DB_BUSY_TIMEOUT_MS / 1000)
+        # aiosqlite's worker thread is non-daemon and would keep the worker
+        # process alive at shutdown; the database is WAL so an abrupt stop is safe.
+        connection._thread.daemon = True
+        db = await connection
+        db.row_factory = aiosqlite.Row
+        await db.execute("PRAGMA journal_mode = WAL")
+        await db.execute("PRAGMA synchronous = NORMAL")
+        await db.execute(f"PRAGMA busy_timeout = {SESSION_DB_BUSY_TIMEOUT_MS}")
+        await db.execute(PRAGMA_FOREIGN_KEYS)
+        await db.executescript(CREATE_SCHEMA_SQL + EVENTS_INDEX_SQL)
+        await db.commit()
+        return db
+
+    @asynccontextmanager
+    async def _get_db_connection(self):
+        loop = asyncio.get_running_loop()
+        if self._db_loop is not loop:
+            if self._db is not None:
+                self._db.stop()
+            self._db_loop, self._db, self._db_lock = loop, None, asyncio.Lock()
+
+        async with self._db_lock:
+            if self._db is None:
+                self._db = await self._open()
+            try:
+                yield self._db
+            except BaseException:
+                await self._db.rollback()
+                raise
+
+    async def count_sessions(self, app_name: str) -> int:
+        """Number of stored sessions for an app."""
+        async with self._get_db_connection() as db:
+            async with db.execute("SELECT COUNT(*) FROM sessions WHERE app_name=?", (app_name,)) as cursor:
+                row = await cursor.fetchone()
+                return row[0]
+
+    async def close(self):
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+
+def create_session_service(backend: str = None, db_path: str = None):
+    """Build the session service selected by SESSION_BACKEND / SESSION_DB_PATH."""
+    backend = (backend or os.getenv("SESSION_BACKEND", "sqlite")).lower()
+    if backend == "memory":
+        return InMemorySessionService()
+    if backend == "sqlite":
+        return SharedSqliteSessionService(db_path or os.getenv("SESSION_DB_PATH", DEFAULT_DB_PATH))
+    raise ValueError(f"Unknown SESSION_BACKEND: {backend!r} (expected 'sqlite' or 'memory')")
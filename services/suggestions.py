@@ -0,0 +1,174 @@
+# services/suggestions.py
+
+# ---------------------------------------------------------------------------
+# Follow-up suggestion chips for /api/suggestions.
+#
+# Suggestions used to go through the legacy google-generativeai SDK with a
+# new GenerativeModel per request. They now use the same google-genai
+# client (and async connection pool) as the agents, on the worker's agent
+# loop, and results are memoized per (user_message, reply[:600]) so page
+# reloads and retries never pay for a second model call. Concurrent calls
+# for the same reply share one in-flight request.
+#
+# The chat turn starts generation as soon as the agent's final reply
+# arrives (prefetch) and parks it in a short-lived per-session slot, so
+# the UI's follow-up /api/suggestions call usually finds it ready.
+# Clarifying turns (a ###WIDGET### question form) are skipped: the UI never
+# asks for suggestions on those.
+# ---------------------------------------------------------------------------
+
+import asyncio
+import hashlib
+import json
+import os
+
+from agents.llm import gemini_model
+from tools import log
+from tools.cache import TTLCache
+
+logger = log.get_logger("services.suggestions")
+
+SUGGESTIONS_MODEL = os.getenv("SUGGESTIONS_MODEL", "gemini-2.0-flash")
+SUGGESTIONS_CACHE_SIZE = int(os.getenv("SUGGESTIONS_CACHE_SIZE", "1024"))
+SUGGESTIONS_CACHE_TTL = float(os.getenv("SUGGESTIONS_CACHE_TTL", str(24 * 3600)))
+# How long a prefetched result waits for the UI to ask for it
+SUGGESTIONS_SLOT_TTL = float(os.getenv("SUGGESTIONS_SLOT_TTL", "120"))
+
+# Marks a reply that carries a question widget instead of an itinerary
+WIDGET_MARKER = "###WIDGET###"
+
+# Characters of the agent reply the prompt (and the memo key) looks at
+REPLY_CHARS = 600
+
+FALLBACK_SUGGESTIONS = [
+    "Add more restaurant recommendations",
+    "Switch to a different budget tier",
+    "Extend the trip by 2 days",
+    "What's the best time of year to visit?",
+]
+
+PROMPT = """The user asked a travel question and got a travel plan back.
+
+User asked: "{user_message}"
+AI responded with: {ai_reply}
+
+Generate exactly 4 short follow-up suggestions the user might want to ask next.
+Rules:
+- Return ONLY a JSON array of 4 strings, nothing else, no markdown
+- Each string must be under 60 characters
+- Make them varied: mix modifications, additions, and questions
+- Make them specific to this exact trip
+- Examples: "Add a day trip to Kyoto", "Switch to luxury hotels", "What's the best time to visit?", "Add more food experiences"
+"""
+
+_cache = TTLCache(maxsize=SUGGESTIONS_CACHE_SIZE, ttl=SUGGESTIONS_CACHE_TTL)
+_inflight = {}  # memo key -> asyncio.Task (only touched on the agent loop)
+_slots = TTLCache(maxsize=SUGGESTIONS_CACHE_SIZE, ttl=SUGGESTIONS_SLOT_TTL)  # session_id -> (key, task)
+_prefetches = 0
+
+
+def suggestion_key(user_message: str, reply: str) -> str:
+    """Memo key: SHA-256 of the user message and the reply prefix the prompt uses."""
+    payload = json.dumps([user_message, reply[:REPLY_CHARS]], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _parse(text: str) -> list:
+    raw = (text or "").strip().replace("```json", "").replace("```", "").strip()
+    suggestions = json.loads(raw)
+    if not isinstance(suggestions, list):
+        raise ValueError("Not a list")
+    return [str(s) for s in suggestions[:4]]
+
+
+def _client():
+    """The agents' google-genai Client (built once per process by ADK)."""
+    return gemini_model.api_client
+
+
+async def _generate(key: str, user_message: str, reply: str) -> list:
+    try:
+        response = await _client().aio.models.generate_content(
+            model=SUGGESTIONS_MODEL,
+            contents=PROMPT.format(user_message=user_message, ai_reply=reply[:REPLY_CHARS]),
+        )
+        suggestions = _parse(response.text)
+        _cache.set(key, suggestions)
+        return suggestions
+    finally:
+        _inflight.pop(key, None)
+
+
+async def generate_suggestions(user_message: str, reply: str) -> list:
+    """
+    Four follow-up suggestions for a reply, from the memo when possible.
+    Must run on the agent loop. Raises on model or parse errors (nothing is
+    cached then); callers fall back to FALLBACK_SUGGESTIONS.
+    """
+    key = suggestion_key(user_message, reply)
+    cached = _cache.get(key)
+    if cached is not None:
+        return list(cached)
+
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_generate(key, user_message, reply))
+        _inflight[key] = task
+    return list(await asyncio.shield(task))
+
+
+async def _quietly(user_message: str, reply: str):
+    try:
+        return await generate_suggestions(user_message, reply)
+    except Exception as e:
+        logger.debug("suggestion prefetch failed", extra={"error": str(e)})
+        return None
+
+
+def prefetch(session_id: str, user_message: str, reply: str):
+    """
+    Start generating suggestions for a finished turn in the background and
+    park the task in the session's slot (not for widget replies, which the
+    UI never asks suggestions for). Call from the agent loop.
+    """
+    global _prefetches
+    if WIDGET_MARKER in reply:
+        return
+    key = suggestion_key(user_message, reply)
+    task = asyncio.ensure_future(_quietly(user_message, reply))
+    _slots.set(session_id, (key, task))
+    _prefetches += 1
+
+
+async def suggestions_for(session_id: str, user_message: str, reply: str) -> list:
+    """
+    Suggestions for the /api/suggestions call: the session's prefetched
+    result when it belongs to this reply (awaiting it if still running),
+    otherwise generated inline.
+    """
+    key = suggestion_key(user_message, reply)
+    slot = _slots.get(session_id) if session_id else None
+    if slot is not None and slot[0] == key:
+        result = await asyncio.shield(slot[1])
+        if result is not None:
+            return list(result)
+    return await generate_suggestions(user_message, reply)
+
+
+def cache_stats() -> dict:
+    """Hit / miss / size counters for the suggestions memo and prefetch slots."""
+    slots = _slots.stats()
+    return {
+        **_cache.stats(),
+        "in_flight": len(_inflight),
+        "prefetches": _prefetches,
+        "slot_hits": slots["hits"],
+        "slot_misses": slots["misses"],
+    }
+
+
+def clear_cache():
+    global _prefetches
+    _cache.clear()
+    _slots.clear()
+    _prefetches = 0
@@ -0,0 +1,97 @@
+# services/trace_plugin.py
+
+# ---------------------------------------------------------------------------
+# ADK plugin that turns agent runs, model calls and tool calls (including
+# AgentTool sub-agent calls) into tools.tracing spans, and counts model
+# tokens per agent.
+#
+# Registered once on the AgentLoop's Runner; AgentTool passes the parent
+# runner's plugins down to its sub-agent runners, so hotel_agent,
+# activity_agent and budget_agent are traced too. Callbacks only observe —
+# they always return None, so the agents behave exactly as before.
+# ---------------------------------------------------------------------------
+
+import threading
+
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.tools.agent_tool import AgentTool
+
+from tools import tracing
+
+_tokens = {}  # agent name -> {"calls", "prompt_tokens", "output_tokens"}
+_tokens_lock = threading.Lock()
+
+
+def _close(kind: str, name: str, **attrs):
+    """End the innermost open span of this kind/name in the current context."""
+    span = tracing.current_span()
+    while span is not None and span.parent is not None:
+        if span.kind == kind and span.name == name:
+            tracing.end_span(span, **attrs)
+            return
+        span = span.parent
+
+
+def _count_tokens(agent_name: str, usage):
+    prompt = getattr(usage, "prompt_token_count", None) or 0
+    output = getattr(usage, "candidates_token_count", None) or 0
+    with _tokens_lock:
+        counts = _tokens.setdefault(agent_name, {"calls": 0, "prompt_tokens": 0, "output_tokens": 0})
+        counts["calls"] += 1
+        counts["prompt_tokens"] += prompt
+        counts["output_tokens"] += output
+    return prompt, output
+
+
+class TracingPlugin(BasePlugin):
+
+    def __init__(self, name: str = "wanderwise_tracing"):
+        super().__init__(name=name)
+
+    async def before_agent_callback(self, *, agent, callback_context):
+        tracing.start_span("agent", agent.name)
+
+    async def after_agent_callback(self, *, agent, callback_context):
+        _close("agent", agent.name)
+
+    async def before_model_callback(self, *, callback_context, llm_request):
+        tracing.start_span("llm", callback_context.agent_name, model=llm_request.model or "")
+
+    async def after_model_callback(self, *, callback_context, llm_response):
+        span = tracing.current_span()
+        if llm_response.partial:
+            # Streaming chunk: note time to first token, keep the span open
+            if span is not None and span.kind == "llm" and "first_chunk_ms" not in span.attrs:
+                span.attrs["first_chunk_ms"] = round(span.duration * 1000, 2)
+            return None
+        attrs = {}
+        if llm_response.usage_metadata is not None:
+            prompt, output = _count_tokens(callback_context.agent_name, llm_response.usage_metadata)
+            attrs = {"prompt_tokens": prompt, "output_tokens": output}
+        _close("llm", callback_context.agent_name, **attrs)
+        return None
+
+    async def on_model_error_callback(self, *, callback_context, llm_request, error):
+        _close("llm", callback_context.agent_name, error=type(error).__name__)
+
+    async def before_tool_callback(self, *, tool, tool_args, tool_context):
+        attrs = {"agent_tool": True} if isinstance(tool, AgentTool) else {}
+        tracing.start_span("tool", tool.name, **attrs)
+
+    async def after_tool_callback(self, *, tool, tool_args, tool_context, result):
+        status = result.get("status") if isinstance(result, dict) else None
+        _close("tool", tool.name, **({"status": status} if status else {}))
+
+    async def on_tool_error_callback(self, *, tool, tool_args, tool_context, error):
+        _close("tool", tool.name, error=type(error).__name__)
+
+
+def token_stats() -> dict:
+    """Model calls and token counts per agent since start (or reset_tokens)."""
+    with _tokens_lock:
+        return {agent: dict(counts) for agent, counts in _tokens.items()}
+
+
+def reset_tokens():
+    with _tokens_lock:
+        _tokens.clear()
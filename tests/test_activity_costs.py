@@ -0,0 +1,32 @@
+from tools import activity_costs
+from tools.activity_costs import ACTIVITY_COST_ESTIMATES, activity_cost, cost_band
+from tools.activity_tools import DEFAULT_TYPES, KINDS_TO_GOOGLE_TYPES
+
+
+def test_lookup_does_not_depend_on_table_order():
+    assert cost_band("park") == "park"
+    assert cost_band("amusement_park") == "amusement_park"
+    assert cost_band("barbecue_restaurant") == "restaurant"
+    assert cost_band("") == "default"
+
+
+def test_free_text_keywords_match_by_suffix_then_head_word():
+    assert cost_band("Amusement Park") == "amusement_park"
+    assert cost_band("japanese_buddhist_temple") == "place_of_worship"
+    assert cost_band("rooftop bar") == "bar"
+    assert cost_band("Louvre gallery") == "art_gallery"
+    assert cost_band("something unheard of") == "default"
+
+
+def test_every_type_the_activity_tool_requests_has_a_band():
+    requested = set(DEFAULT_TYPES).union(*KINDS_TO_GOOGLE_TYPES.values())
+    assert requested <= set(activity_costs.PLACE_TYPE_BANDS)
+    assert set(activity_costs.PLACE_TYPE_BANDS.values()) <= set(ACTIVITY_COST_ESTIMATES)
+
+
+def test_bulk_lookup_matches_single_lookups():
+    keywords = ["museum", "park", "wine_bar", "museum", "unknown"]
+    costs = activity_costs.activity_costs(keywords)
+    assert costs.shape == (5, 2)
+    assert [tuple(row) for row in costs.tolist()] == [activity_cost(k) for k in keywords]
+    assert activity_costs.activity_costs([]).shape == (0, 2)
@@ -0,0 +1,61 @@
+import asyncio
+from services.agent_loop import AgentLoop
+from google.adk.agents import LlmAgent
+from google.adk.sessions import InMemorySessionService
+
+
+def test_agent_loop_runs_coroutines_on_one_loop():
+    loop = AgentLoop(LlmAgent(name="TestAgent"), "test", InMemorySessionService())
+
+    async def _current_loop():
+        return asyncio.get_running_loop()
+
+    try:
+        first = loop.run(_current_loop())
+        second = loop.run(_current_loop())
+        assert first is second
+        assert loop.runner is loop.runner
+    finally:
+        loop.close()
+
+
+def test_blocking_tools_do_not_stall_concurrent_chats():
+    import time
+    import uuid
+    from google.genai import types as genai_types
+    from agents.function_tools import threaded_tool
+    from benchmarks.fakes import ScriptedLlm
+
+    def slow_lookup(city: str) -> dict:
+        """Look up a city (blocks like a slow HTTP call)."""
+        time.sleep(0.5)
+        return {"status": "success", "city": city}
+
+    steps = [{"call": "slow_lookup", "args": {"city": "{city}"}}, {"text": "Done with {city}"}]
+    agent = LlmAgent(name="TestAgent", model=ScriptedLlm(steps=steps), tools=[threaded_tool(slow_lookup)])
+    sessions = InMemorySessionService()
+    loop = AgentLoop(agent, "test", sessions)
+
+    async def _chat(message):
+        session_id = uuid.uuid4().hex
+        await sessions.create_session(app_name="test", user_id=session_id, session_id=session_id)
+        content = genai_types.Content(role="user", parts=[genai_types.Part(text=message)])
+        reply = ""
+        async for event in loop.runner.run_async(user_id=session_id, session_id=session_id, new_message=content):
+            if event.is_final_response() and event.content and event.content.parts:
+                reply = "".join(p.text or "" for p in event.content.parts)
+        return reply
+
+    async def _both():
+        return await asyncio.gather(_chat("Trip to Paris"), _chat("Trip to Rome"))
+
+    try:
+        start = time.perf_counter()
+        replies = loop.run(_both())
+        elapsed = time.perf_counter() - start
+    finally:
+        loop.close()
+
+    assert replies == ["Done with Paris", "Done with Rome"]
+    # Two 0.5 s tools side by side, not one after the other
+    assert elapsed < 0.9
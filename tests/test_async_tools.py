@@ -0,0 +1,136 @@
+import asyncio
+import inspect
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import tools.activity_tools as activity_tools
+import tools.geocoding as geocoding
+import tools.hotel_tools as hotel_tools
+import tools.map_tools as map_tools
+import tools.places as places
+
+LATENCY = 0.1
+
+
+def _geocode_response(address):
+    lat = 30.0 + len(address)
+    return MagicMock(json=lambda: {"status": "OK", "results": [
+        {"geometry": {"location": {"lat": lat, "lng": 139.0}}, "formatted_address": address}]})
+
+
+def _places_response():
+    return MagicMock(json=lambda: {"places": [{
+        "id": "hotel-1",
+        "displayName": {"text": "Test Hotel"},
+        "location": {"latitude": 35.1, "longitude": 139.1},
+        "rating": 4.5,
+        "userRatingCount": 100,
+    }]})
+
+
+async def _slow_get(url, params=None, **kwargs):
+    await asyncio.sleep(LATENCY)
+    return _geocode_response(params["address"])
+
+
+async def _slow_post(url, **kwargs):
+    await asyncio.sleep(LATENCY)
+    return _places_response()
+
+
+@pytest.fixture
+def google():
+    geocoding.clear_cache()
+    places.clear_cache()
+    with patch.object(geocoding, "GOOGLE_PLACES_API_KEY", "test-key"), \
+            patch.object(places, "GOOGLE_PLACES_API_KEY", "test-key"), \
+            patch.object(hotel_tools, "GOOGLE_PLACES_API_KEY", "test-key"), \
+            patch.object(map_tools, "GOOGLE_PLACES_API_KEY", "test-key"), \
+            patch.object(hotel_tools.poi_snapshot, "search", return_value=None), \
+            patch.object(geocoding.http_client, "async_get", side_effect=_slow_get) as mock_get, \
+            patch.object(places.http_client, "async_post", side_effect=_slow_post) as mock_post:
+        yield mock_get, mock_post
+    geocoding.clear_cache()
+    places.clear_cache()
+
+
+def test_async_searches_overlap_on_one_loop(google):
+    mock_get, mock_post = google
+
+    async def _main():
+        start = time.perf_counter()
+        results = await asyncio.gather(*(hotel_tools.search_hotels_async(city) for city in ("Tokyo", "Lisbon", "Rome")))
+        return results, time.perf_counter() - start
+
+    results, elapsed = asyncio.run(_main())
+    assert all(r["status"] == "success" and r["hotels"][0]["name"] == "Test Hotel" for r in results)
+    assert mock_get.call_count == 3 and mock_post.call_count == 3
+    # Three sessions x (geocode + search) in about the time of one
+    assert elapsed < 4 * LATENCY
+
+
+def test_async_and_sync_paths_share_the_cache(google):
+    mock_get, _ = google
+    with patch.object(geocoding.http_client, "get", return_value=_geocode_response("Lisbon")) as sync_get:
+        assert geocoding.geocode_city("Lisbon")["status"] == "success"
+
+    result = asyncio.run(geocoding.geocode_city_async("lisbon"))
+    assert result["status"] == "success"
+    assert sync_get.call_count == 1
+    assert mock_get.call_count == 0
+
+
+def test_concurrent_async_geocodes_of_one_city_make_one_request(google):
+    mock_get, _ = google
+
+    async def _main():
+        return await asyncio.gather(*(geocoding.geocode_async(q) for q in ("Kyoto", "kyoto", " KYOTO ")))
+
+    results = asyncio.run(_main())
+    assert mock_get.call_count == 1
+    assert len({r["lat"] for r in results}) == 1
+    assert geocoding.flight_stats()["coalesced"] == 2
+
+
+def test_geocode_places_async_keeps_order_and_deadline(google):
+    mock_get, _ = google
+
+    async def _get(url, params=None, **kwargs):
+        await asyncio.sleep(10 if "Slow" in params["address"] else 0.01)
+        return _geocode_response(params["address"])
+
+    mock_get.side_effect = _get
+    result = asyncio.run(map_tools.geocode_places_async(
+        ["Senso-ji", "Slow Place", "Tokyo Tower", "senso-ji"], "Tokyo", deadline=0.5))
+
+    assert result["status"] == "success"
+    assert [p["name"] for p in result["places"]] == ["Senso-ji", "Tokyo Tower"]
+    assert result["timed_out"] == ["Slow Place"]
+    assert result["failed"] == []
+
+
+def test_sync_and_async_searches_agree(google):
+    with patch.object(geocoding.http_client, "get", side_effect=lambda url, params=None, **kw: _geocode_response(params["address"])), \
+            patch.object(places.http_client, "post", return_value=_places_response()), \
+            patch.object(activity_tools, "GOOGLE_PLACES_API_KEY", "test-key"), \
+            patch.object(activity_tools.poi_snapshot, "search", return_value=None):
+        for sync, coro, kwargs in ((hotel_tools.search_hotels, hotel_tools.search_hotels_async, {}),
+                                   (activity_tools.search_activities, activity_tools.search_activities_async,
+                                    {"kinds": "museums"})):
+            places.clear_cache()
+            assert asyncio.run(coro("Osaka", **kwargs)) == sync("Osaka", **kwargs)
+
+
+def test_agents_register_async_tools():
+    from agents.activity_agent import activity_search_tool
+    from agents.hotel_agent import hotel_search_tool
+    from agents.map_agent import geocode_tool
+
+    for tool, name in ((hotel_search_tool, "search_hotels"), (activity_search_tool, "search_activities"),
+                       (geocode_tool, "geocode_places")):
+        assert inspect.iscoroutinefunction(tool.func)
+        # The public tool name, not the function's "_async" one
+        assert tool.name == tool._get_declaration().name == name
+        assert "city" in tool._get_declaration().parameters.properties
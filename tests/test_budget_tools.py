@@ -0,0 +1,53 @@
+from tools.budget_tools import MAX_DAYS, MAX_SCENARIOS, estimate_budget, estimate_budget_scenarios
+
+import server
+
+
+def _range(text):
+    low, high = text.split(" ")[0].split("–")
+    return int(low.strip("$").replace(",", "")), int(high.strip("$").replace(",", ""))
+
+
+def test_scenarios_match_single_estimates():
+    result = estimate_budget_scenarios(
+        "Tokyo", "budget,luxury", "3,7", "1,4",
+        hotel_price_levels="PRICE_LEVEL_MODERATE,PRICE_LEVEL_VERY_EXPENSIVE",
+        activity_types="museum,theme_park,park",
+    )
+    assert result["status"] == "success"
+    assert result["scenarios"] == 16
+    for tier, days, people, level, low, high, pp_low, pp_high in result["rows"]:
+        single = estimate_budget("Tokyo", days, people, tier, level, activity_types="museum,theme_park,park")
+        assert (low, high) == _range(single["summary"]["estimated_total"])
+        assert (pp_low, pp_high) == _range(single["summary"]["estimated_per_person"])
+
+
+def test_scenarios_default_hotel_level_follows_tier():
+    result = estimate_budget_scenarios("Paris", "budget,luxury", [5], [2])
+    levels = {row[0]: row[3] for row in result["rows"]}
+    assert levels == {"budget": "PRICE_LEVEL_INEXPENSIVE", "luxury": "PRICE_LEVEL_EXPENSIVE"}
+    assert result["cheapest"]["budget_tier"] == "budget"
+
+
+def test_scenarios_reject_bad_input():
+    assert estimate_budget_scenarios("Rome", "cheap", "5", "2")["status"] == "error"
+    assert estimate_budget_scenarios("Rome", "budget", "0", "2")["status"] == "error"
+    too_many = ",".join(str(d) for d in range(1, MAX_SCENARIOS + 2))
+    assert estimate_budget_scenarios("Rome", "budget", too_many, "1")["status"] == "error"
+    assert estimate_budget_scenarios("Rome", "budget", str(MAX_DAYS + 1), "1")["status"] == "error"
+    assert estimate_budget_scenarios("Rome", "budget", "1000000", "1")["status"] == "error"
+    assert estimate_budget_scenarios("Rome", "budget", "5", "51")["status"] == "error"
+    assert estimate_budget_scenarios("Rome", "budget", "5", "2", activities_per_day=11)["status"] == "error"
+    assert estimate_budget_scenarios("Rome", "budget", str(MAX_DAYS), "1")["status"] == "success"
+
+
+def test_budget_scenarios_endpoint():
+    client = server.app.test_client()
+    resp = client.post("/api/budget/scenarios", json={"city": "Rome", "num_days": [4, 6], "num_people": "2"})
+    assert resp.status_code == 200
+    assert resp.get_json()["scenarios"] == 6
+    assert client.post("/api/budget/scenarios", json={"city": "Rome"}).status_code == 400
+    assert client.post("/api/budget/scenarios", json={"city": "Rome", "num_days": "1000000",
+                                                      "num_people": "2"}).status_code == 400
+    assert client.post("/api/budget/scenarios", json=["Rome"]).status_code == 400
+    assert client.post("/api/budget/scenarios", json="Rome").status_code == 400
@@ -0,0 +1,54 @@
+import json
+from unittest.mock import patch
+
+from google.adk.agents import LlmAgent
+from google.adk.models import BaseLlm, LlmResponse
+from google.adk.sessions import InMemorySessionService
+from google.genai import types as genai_types
+
+import server
+from services.agent_loop import AgentLoop
+
+
+class _StreamingLlm(BaseLlm):
+    model: str = "test-llm"
+
+    async def generate_content_async(self, llm_request, stream: bool = False):
+        chunks = ["Day 1: ", "Senso-ji Temple"]
+        if stream:
+            for chunk in chunks:
+                yield LlmResponse(
+                    content=genai_types.Content(role="model", parts=[genai_types.Part(text=chunk)]),
+                    partial=True,
+                )
+        yield LlmResponse(
+            content=genai_types.Content(role="model", parts=[genai_types.Part(text="".join(chunks))]),
+        )
+
+
+def _parse_sse(body):
+    events = []
+    for frame in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_chat_stream_emits_partial_text_then_done():
+    session_service = InMemorySessionService()
+    loop = AgentLoop(LlmAgent(name="TestAgent", model=_StreamingLlm()), server.APP_NAME, session_service)
+    no_locations = {"hotels": [], "activities": []}
+
+    with patch.object(server, "agent_loop", loop), \
+         patch.object(server, "session_service", session_service), \
+         patch.object(server, "_try_direct_tool_call", return_value=no_locations):
+        client = server.app.test_client()
+        resp = client.post("/api/chat/stream", json={"message": "Tokyo", "session_id": "s1"})
+        events = _parse_sse(resp.get_data(as_text=True))
+    loop.close()
+
+    assert resp.mimetype == "text/event-stream"
+    partials = [data["text"] for name, data in events if name == "text" and data["partial"]]
+    assert partials == ["Day 1: ", "Senso-ji Temple"]
+    assert events[-1][0] == "done"
+    assert events[-1][1]["reply"] == "Day 1: Senso-ji Temple"
@@ -0,0 +1,49 @@
+import time
+from unittest.mock import patch
+
+import server
+
+TOKYO = {"status": "success", "lat": 35.68, "lon": 139.69}
+
+
+def _slow_hotels(city, limit=10):
+    time.sleep(0.5)
+    return {"status": "success", "hotels": [{"name": "Slow Hotel", "lat": 1, "lon": 1}]}
+
+
+def _fast_activities(city, limit=20):
+    return {"status": "success", "activities": [{"name": "Senso-ji", "lat": 1, "lon": 1}]}
+
+
+@patch("tools.geocoding.geocode_city", return_value=TOKYO)
+@patch("tools.activity_tools.search_activities", side_effect=_fast_activities)
+@patch("tools.hotel_tools.search_hotels", side_effect=_slow_hotels)
+def test_fallback_returns_finished_searches_at_deadline(mock_hotels, mock_activities, mock_geocode):
+    start = time.monotonic()
+    hotels, activities = server._fallback_search("Tokyo", deadline=0.2)
+    assert time.monotonic() - start < 0.45
+    assert hotels == []
+    assert [a["name"] for a in activities] == ["Senso-ji"]
+    mock_geocode.assert_called_once_with("Tokyo")
+
+
+@patch("tools.geocoding.geocode_city", return_value=TOKYO)
+@patch("tools.activity_tools.search_activities", side_effect=_fast_activities)
+@patch("tools.hotel_tools.search_hotels", side_effect=_slow_hotels)
+def test_fallback_runs_searches_concurrently(mock_hotels, mock_activities, mock_geocode):
+    hotels, activities = server._fallback_search("Tokyo", deadline=5)
+    assert [h["name"] for h in hotels] == ["Slow Hotel"]
+    assert [a["name"] for a in activities] == ["Senso-ji"]
+
+
+@patch.object(server, "_fallback_search", return_value=([], []))
+def test_direct_tool_call_extracts_every_destination(mock_search):
+    server._try_direct_tool_call("planning japan: 4 days in tokyo then kyoto, maybe nyc next week")
+    mock_search.assert_called_once_with(["Tokyo", "Kyoto", "New York City"])
+
+
+@patch.object(server, "_fallback_search")
+def test_direct_tool_call_skips_search_without_destination(mock_search):
+    locations = server._try_direct_tool_call("Hi! Can you help me plan something for next week?")
+    assert locations == {"hotels": [], "activities": []}
+    mock_search.assert_not_called()
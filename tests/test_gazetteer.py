@@ -0,0 +1,55 @@
+from tools import budget_tools
+from tools.gazetteer import canonical_key, extract_destinations, get_gazetteer, normalize_name
+
+
+def _names(text):
+    return [place["name"] for place in extract_destinations(text)]
+
+
+def test_normalize_name():
+    assert normalize_name("  São   Paulo ") == "sao paulo"
+    assert normalize_name("ZÜRICH") == "zurich"
+    assert normalize_name("Xi'an") == "xi an"
+
+
+def test_lookup_aliases_resolve_to_canonical_city():
+    gaz = get_gazetteer()
+    assert gaz.lookup("NYC")["name"] == "New York City"
+    assert gaz.lookup("bombay")["name"] == "Mumbai"
+    assert gaz.lookup("Bali")["country"] == "ID"
+    assert gaz.lookup("Atlantis") is None
+
+
+def test_extract_handles_lowercase_and_multi_city():
+    assert _names("3 days in tokyo then osaka and kyoto") == ["Tokyo", "Osaka", "Kyoto"]
+    assert _names("Paris. 2 people. 5 days. Mid-range.") == ["Paris"]
+
+
+def test_extract_widget_format_for_every_city():
+    # static/index.html sends "${destination}. ${parts}"
+    for city in ("Amsterdam", "Athens", "Boston", "Lisbon", "Glasgow", "Bologna", "Florence", "Nice", "Reading"):
+        assert _names(f"{city}. 2 people. 5 days. Mid-range") == [city], city
+    assert _names("nice, thanks for the plan") == []
+
+
+def test_extract_prefers_longest_match_and_skips_countries():
+    assert _names("Trip to Japan next week, staying in New York City after") == ["New York City"]
+    assert _names("flying from San Francisco to Rio de Janeiro") == ["San Francisco", "Rio de Janeiro"]
+
+
+def test_ambiguous_words_need_a_cue_or_capital():
+    assert _names("that would be nice, and reading the reviews helps") == []
+    assert _names("we love the food in Nice") == ["Nice"]
+    assert _names("fly to nice next spring") == ["Nice"]
+    assert _names("amsterdam and lisbon in one trip") == ["Amsterdam", "Lisbon"]
+
+
+def test_extract_deduplicates_aliases():
+    assert _names("NYC or new york, whichever is cheaper") == ["New York City"]
+
+
+def test_canonical_key_and_transport_lookup():
+    assert canonical_key("NYC") == canonical_key("New York") == "new york city"
+    assert canonical_key("Atlantis ") == "atlantis"
+    assert budget_tools._get_transport_estimate("NYC") == budget_tools.TRANSPORT_DAILY_BUDGET["new york"]
+    assert budget_tools._get_transport_estimate("Atlantis") == budget_tools.TRANSPORT_DAILY_BUDGET["default"]
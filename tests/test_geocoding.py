@@ -0,0 +1,62 @@
+import pytest
+from unittest.mock import patch, MagicMock
+import tools.geocoding as geocoding
+
+
+def _response(payload):
+    resp = MagicMock()
+    resp.json.return_value = payload
+    return resp
+
+
+OK_TOKYO = {
+    "status": "OK",
+    "results": [{"geometry": {"location": {"lat": 35.68, "lng": 139.69}}, "formatted_address": "Tokyo, Japan"}],
+}
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    geocoding.clear_cache()
+    with patch.object(geocoding, "GOOGLE_PLACES_API_KEY", "test-key"):
+        yield
+    geocoding.clear_cache()
+
+
+def test_normalize_query():
+    assert geocoding.normalize_query("  Tokyo ") == "tokyo"
+    assert geocoding.normalize_query("ＴＯＫＹＯ") == "tokyo"
+    assert geocoding.normalize_query("Senso-ji ,  Tokyo") == "senso-ji, tokyo"
+
+
+@patch.object(geocoding.http_client, "get")
+def test_geocode_city_is_cached_across_spellings(mock_get):
+    mock_get.return_value = _response(OK_TOKYO)
+    first = geocoding.geocode_city("Tokyo")
+    second = geocoding.geocode_city("  TOKYO")
+    assert first == second == {"status": "success", "lat": 35.68, "lon": 139.69}
+    assert mock_get.call_count == 1
+    assert geocoding.cache_stats()["hits"] == 1
+
+
+@patch.object(geocoding.http_client, "get")
+def test_zero_results_cached_but_transport_errors_are_not(mock_get):
+    mock_get.return_value = _response({"status": "ZERO_RESULTS", "results": []})
+    assert geocoding.geocode_city("Nowhereville")["status"] == "error"
+    assert geocoding.geocode_city("Nowhereville")["status"] == "error"
+    assert mock_get.call_count == 1
+
+    mock_get.side_effect = ConnectionError("boom")
+    assert geocoding.geocode_city("Paris")["status"] == "error"
+    assert geocoding.geocode_city("Paris")["status"] == "error"
+    assert mock_get.call_count == 3
+
+
+@patch.object(geocoding.http_client, "get")
+def test_geocode_reports_result_types_and_partial_match(mock_get):
+    top = {"geometry": {"location": {"lat": 35.68, "lng": 139.69}}, "formatted_address": "Tokyo, Japan",
+           "types": ["locality", "political"], "partial_match": True}
+    mock_get.return_value = _response({"status": "OK", "results": [top]})
+    result = geocoding.geocode("Evening stroll, Tokyo")
+    assert result["types"] == ["locality", "political"]
+    assert result["partial_match"] is True
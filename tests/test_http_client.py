@@ -0,0 +1,20 @@
+from unittest.mock import patch, MagicMock
+from tools import http_client
+
+
+def test_latency_histogram_is_cumulative():
+    hist = http_client.LatencyHistogram(buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.5, 5.0):
+        hist.observe(seconds)
+    snap = hist.snapshot()
+    assert snap["count"] == 3
+    assert snap["buckets"] == {"0.1": 1, "1.0": 2, "+Inf": 3}
+
+
+def test_request_uses_shared_session_with_default_timeout():
+    http_client.reset()
+    with patch.object(http_client, "session", MagicMock()) as session:
+        http_client.get("https://maps.googleapis.com/maps/api/geocode/json", params={"address": "Paris"})
+        _, kwargs = session.request.call_args
+        assert kwargs["timeout"] == (http_client.HTTP_CONNECT_TIMEOUT, http_client.HTTP_READ_TIMEOUT)
+    assert http_client.latency_stats()["maps.googleapis.com/maps/api/geocode/json"]["count"] == 1
@@ -0,0 +1,61 @@
+from unittest.mock import patch
+
+import server
+from tools.itinerary_places import extract_itinerary_places
+
+ITINERARY = """Here's your 3-day Tokyo plan!
+
+**Hotel Recommendations**
+1. **Park Hyatt Tokyo** — luxury hotel in Shinjuku with skyline views.
+2. Hotel Gracery Shinjuku: mid-range, next to the station.
+
+**Day 1: Historic Tokyo**
+- Morning: Visit **Senso-ji Temple** in Asakusa
+- Afternoon: Explore Tokyo National Museum (Ueno Park)
+- Take it easy tonight.
+
+Day 2 — Modern Tokyo
+* 9:00 am - teamLab Planets, about 2 hours
+* Lunch at Tsukiji Outer Market
+* Afternoon: Senso-ji Temple again, for the evening lights
+
+**Budget Breakdown**
+- Hotel: $250/night
+- Activities: $120
+"""
+
+
+def test_extract_itinerary_places():
+    places = extract_itinerary_places(ITINERARY)
+    assert places["hotels"] == ["Park Hyatt Tokyo", "Hotel Gracery Shinjuku"]
+    assert places["activities"] == [
+        {"name": "Senso-ji Temple", "day": 1},
+        {"name": "Tokyo National Museum", "day": 1},
+        {"name": "teamLab Planets", "day": 2},
+        {"name": "Tsukiji Outer Market", "day": 2},
+        {"name": "Senso-ji Temple again", "day": 2},
+    ]
+
+
+def test_extract_itinerary_places_ignores_non_itineraries():
+    assert extract_itinerary_places("Where would you like to go? Budget: flexible.") == {"hotels": [], "activities": []}
+
+
+def _geocode_places(names, city, deadline=None):
+    return {"status": "success", "city": city, "failed": [], "timed_out": [],
+            "places": [{"name": n, "lat": 35.0, "lon": 139.0, "formatted_address": f"{n}, {city}"} for n in names]}
+
+
+@patch("tools.map_tools.geocode_places", side_effect=_geocode_places)
+def test_locate_itinerary_places_geocodes_only_unlocated_names(mock_geocode):
+    located = {"hotels": [{"name": "Park Hyatt Tokyo", "lat": 1, "lon": 1}],
+               "activities": [{"name": "Senso-ji", "lat": 1, "lon": 1}]}
+    found = server._locate_itinerary_places("3 days in Tokyo please", ITINERARY, located)
+
+    names, city = mock_geocode.call_args.args
+    assert city == "Tokyo"
+    assert mock_geocode.call_args.kwargs["deadline"] == server.ITINERARY_GEOCODE_DEADLINE
+    assert names == ["Hotel Gracery Shinjuku", "Tokyo National Museum", "teamLab Planets", "Tsukiji Outer Market"]
+    assert [h["name"] for h in found["hotels"]] == ["Hotel Gracery Shinjuku"]
+    assert found["activities"][1] == {"name": "teamLab Planets", "address": "teamLab Planets, Tokyo",
+                                      "lat": 35.0, "lon": 139.0, "day": 2}
@@ -0,0 +1,57 @@
+import io
+import json
+import logging
+import threading
+
+from tools import log, tracing
+
+
+def _lines(handler, stream):
+    handler.flush()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_records_carry_request_id_and_fields_across_threads():
+    stream = io.StringIO()
+    handler = log.configure(level="INFO", fmt="json", stream=stream)
+    logger = log.get_logger("test")
+    try:
+        request_id = log.start_request("req-123")
+        logger.info("searching", extra={"city": "Paris"})
+        worker = threading.Thread(target=tracing.bind(lambda: logger.warning("from pool")))
+        worker.start()
+        worker.join()
+        logger.debug("below the level")
+    finally:
+        log.end_request()
+    lines = _lines(handler, stream)
+
+    assert [line["message"] for line in lines] == ["searching", "from pool"]
+    assert {line["request_id"] for line in lines} == {request_id}
+    assert lines[0]["city"] == "Paris"
+    assert lines[1]["level"] == "WARNING"
+
+
+def test_verbose_dumps_are_sampled_per_request():
+    log.configure(level="DEBUG", stream=io.StringIO())
+    logger = log.get_logger("test")
+    try:
+        log.start_request(sample_rate=0.0)
+        assert not log.sampled(logger)
+        log.start_request(sample_rate=1.0)
+        assert log.sampled(logger)
+        logger.setLevel(logging.INFO)
+        assert not log.sampled(logger)
+    finally:
+        logger.setLevel(logging.NOTSET)
+        log.end_request()
+
+
+def test_full_queue_drops_records_instead_of_blocking():
+    handler = log.QueuedHandler(logging.NullHandler(), maxsize=2)
+    handler._ensure_listener()
+    handler._listener.stop()  # nothing drains the queue now
+    record = logging.LogRecord("wanderwise.test", logging.INFO, __file__, 1, "msg", None, None)
+    for _ in range(5):
+        handler.enqueue(record)
+    assert handler.dropped == 3
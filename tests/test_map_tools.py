@@ -0,0 +1,81 @@
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+import tools.map_tools as map_tools
+
+
+@pytest.fixture(autouse=True)
+def _api_key():
+    with patch.object(map_tools, "GOOGLE_PLACES_API_KEY", "test-key"):
+        yield
+
+
+def _geocode(query):
+    if query.startswith("Nowhere"):
+        return {"status": "error", "api_status": "ZERO_RESULTS", "error_message": "ZERO_RESULTS"}
+    if query.startswith("Slow"):
+        time.sleep(0.5)
+    return {"status": "success", "lat": 35.0, "lon": 139.0, "formatted_address": query}
+
+
+def test_geocode_places_rejects_city_level_and_partial_matches():
+    def _fallback(query):
+        if query.startswith("Evening Stroll"):
+            # Google's answer for a fragment that isn't a place: the city itself
+            return {"status": "success", "lat": 35.68, "lon": 139.69, "formatted_address": "Tokyo, Japan",
+                    "types": ["locality", "political"], "partial_match": True}
+        if query.startswith("Senso"):
+            return {"status": "success", "lat": 35.71, "lon": 139.79, "formatted_address": query,
+                    "types": ["place_of_worship", "point_of_interest", "establishment"], "partial_match": True}
+        return {"status": "success", "lat": 35.0, "lon": 139.0, "formatted_address": query,
+                "types": ["tourist_attraction", "point_of_interest", "establishment"], "partial_match": False}
+
+    with patch.object(map_tools, "geocode", side_effect=_fallback):
+        result = map_tools.geocode_places(["Evening Stroll", "Senso-ji Templ", "Tokyo Tower"], "Tokyo")
+
+    assert [p["name"] for p in result["places"]] == ["Tokyo Tower"]
+    assert result["failed"] == ["Evening Stroll", "Senso-ji Templ"]
+
+
+@patch.object(map_tools, "geocode", side_effect=_geocode)
+def test_geocode_places_dedupes_and_keeps_input_order(mock_geocode):
+    result = map_tools.geocode_places(["Senso-ji", "Nowhere Inn", "senso-ji ", "Meiji Jingu"], "Tokyo")
+    assert [p["name"] for p in result["places"]] == ["Senso-ji", "Meiji Jingu"]
+    assert result["failed"] == ["Nowhere Inn"]
+    assert result["timed_out"] == []
+    assert mock_geocode.call_count == 3
+
+
+@patch.object(map_tools, "geocode", side_effect=_geocode)
+def test_geocode_places_returns_what_resolved_by_the_deadline(mock_geocode):
+    start = time.monotonic()
+    result = map_tools.geocode_places(["Slow Museum", "Senso-ji"], "Tokyo", deadline=0.2)
+    assert time.monotonic() - start < 0.45
+    assert [p["name"] for p in result["places"]] == ["Senso-ji"]
+    assert result["timed_out"] == ["Slow Museum"]
+
+
+def test_geocode_places_runs_lookups_concurrently():
+    active, peak = 0, 0
+    lock = threading.Lock()
+
+    def _tracked(query):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+        return _geocode(query)
+
+    names = [f"Place {i}" for i in range(20)]
+    with patch.object(map_tools, "geocode", side_effect=_tracked):
+        start = time.monotonic()
+        result = map_tools.geocode_places(names, "Tokyo")
+    assert len(result["places"]) == 20
+    assert 1 < peak <= map_tools.GEOCODE_BATCH_CONCURRENCY
+    assert time.monotonic() - start < 20 * 0.05
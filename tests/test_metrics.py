@@ -0,0 +1,57 @@
+import json
+import os
+from unittest.mock import patch
+
+from google.adk.sessions import InMemorySessionService
+
+import server
+from services import metrics
+
+
+def _sample(text, line_start):
+    return [line for line in text.splitlines() if line.startswith(line_start)]
+
+
+def test_merge_sums_counters_and_histograms_but_only_live_gauges():
+    hist = {"count": 2, "sum": 0.3, "buckets": {"0.1": 1, "+Inf": 2}}
+    worker = lambda pid, live, n: {"pid": pid, "live": live, "families": [
+        metrics.family("req_total", metrics.COUNTER, "h", [({"route": "chat"}, n)]),
+        metrics.family("latency", metrics.HISTOGRAM, "h", [({}, hist)]),
+        metrics.family("in_flight", metrics.GAUGE, "h", [({}, 1)]),
+    ]}
+    merged = {f["name"]: f["samples"] for f in metrics.merge([worker(1, True, 3), worker(2, False, 4)])}
+
+    assert merged["req_total"] == [[{"route": "chat"}, 7]]
+    assert merged["latency"][0][1]["buckets"] == {"0.1": 2, "+Inf": 4}
+    assert merged["in_flight"] == [[{}, 1]]
+
+
+def test_render_uses_prometheus_text_format():
+    text = metrics.render([
+        metrics.family("latency", metrics.HISTOGRAM, "Latency.",
+                       [({"route": 'a"b'}, {"count": 1, "sum": 0.05, "buckets": {"0.1": 1, "+Inf": 1}})]),
+    ])
+    assert "# TYPE latency histogram" in text
+    assert 'latency_bucket{route="a\\"b",le="0.1"} 1' in text
+    assert 'latency_count{route="a\\"b"} 1' in text
+
+
+def test_metrics_endpoint_aggregates_worker_snapshots(tmp_path):
+    exporter = metrics.MetricsExporter(server._collect_metrics, directory=str(tmp_path), interval=0)
+    # Another (exited) worker's snapshot: its counters still count
+    other = metrics.family("wanderwise_http_requests_total", metrics.COUNTER, "h",
+                           [({"route": "health", "method": "GET", "status": "200"}, 5)])
+    (tmp_path / "999999.json").write_text(json.dumps({"pid": 999999, "time": 0, "families": [other]}))
+
+    with patch.object(server, "metrics_exporter", exporter), \
+         patch.object(server, "session_service", InMemorySessionService()):
+        client = server.app.test_client()
+        client.get("/api/health")
+        text = client.get("/api/metrics").get_data(as_text=True)
+
+    health = _sample(text, 'wanderwise_http_requests_total{method="GET",route="health",status="200"}')
+    assert health and int(health[0].split()[-1]) >= 6
+    assert _sample(text, "wanderwise_chats_in_flight ")
+    assert _sample(text, "wanderwise_sessions 0")
+    assert _sample(text, 'wanderwise_cache_hit_ratio{cache="geocoding"}')
+    assert os.path.exists(tmp_path / f"{os.getpid()}.json")
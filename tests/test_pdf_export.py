@@ -0,0 +1,125 @@
+import os
+import threading
+from unittest.mock import patch
+
+import pytest
+
+import server
+from services.export_cache import PdfCache
+from services.pdf_export import PdfRenderPool, RenderQueueFull, render_itinerary_pdf
+
+ITINERARY = "**Day 1: Asakusa**\n* Senso-ji at sunrise\n\nTips:\nCarry cash."
+
+
+def test_render_itinerary_pdf_returns_pdf_bytes():
+    pdf = render_itinerary_pdf(ITINERARY, "Tokyo", "January 01, 2026")
+    assert pdf.startswith(b"%PDF")
+
+
+def test_pool_rejects_beyond_queue_depth():
+    pool = PdfRenderPool(workers=0, max_queue=1)
+    release = threading.Event()
+    started = threading.Barrier(3)
+
+    def _slow_render(*args):
+        started.wait()
+        release.wait(5)
+        return b"%PDF-slow"
+
+    with patch("services.pdf_export.render_itinerary_pdf", side_effect=_slow_render):
+        threads = [threading.Thread(target=pool.render, args=(ITINERARY, "Tokyo")) for _ in range(2)]
+        for t in threads:
+            t.start()
+        started.wait()
+        with pytest.raises(RenderQueueFull):
+            pool.render(ITINERARY, "Tokyo")
+        release.set()
+        for t in threads:
+            t.join()
+
+    assert pool.stats()["rendered"] == 2
+    assert pool.stats()["rejected"] == 1
+    assert pool.stats()["in_flight"] == 0
+
+
+def test_timed_out_render_keeps_its_slot_until_the_worker_finishes():
+    from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+    pool = PdfRenderPool(workers=1, max_queue=0)
+    executor = ThreadPoolExecutor(max_workers=1)
+    finished = threading.Event()
+
+    def _slow_render(*args):
+        finished.wait(5)
+        return b"%PDF-slow"
+
+    with patch.object(pool, "_get_executor", return_value=executor), \
+            patch("services.pdf_export.render_itinerary_pdf", side_effect=_slow_render):
+        with pytest.raises(TimeoutError):
+            pool.render(ITINERARY, "Tokyo", timeout=0.05)
+        # The render is still running in the pool: no room for another
+        with pytest.raises(RenderQueueFull):
+            pool.render(ITINERARY, "Tokyo")
+        finished.set()
+        executor.shutdown(wait=True)
+
+    stats = pool.stats()
+    assert stats["in_flight"] == 0
+    assert stats["timed_out"] == 1 and stats["rejected"] == 1 and stats["rendered"] == 0
+
+
+def test_process_pool_renders():
+    pool = PdfRenderPool(workers=1, max_queue=0)
+    try:
+        assert pool.render(ITINERARY, "Tokyo", "January 01, 2026").startswith(b"%PDF")
+    finally:
+        pool.close()
+
+
+def test_export_endpoint_returns_pdf_or_503(tmp_path):
+    client = server.app.test_client()
+    with patch.object(server, "pdf_pool", PdfRenderPool(workers=0)), \
+            patch.object(server, "export_cache", PdfCache(str(tmp_path))):
+        resp = client.post("/api/export", json={"content": ITINERARY, "title": "Tokyo Trip"})
+        assert resp.status_code == 200
+        assert resp.mimetype == "application/pdf"
+        assert "WanderWise_Tokyo_Trip.pdf" in resp.headers["Content-Disposition"]
+
+    with patch.object(server.pdf_pool, "render", side_effect=RenderQueueFull("busy")), \
+            patch.object(server, "export_cache", PdfCache(str(tmp_path))):
+        resp = client.post("/api/export", json={"content": ITINERARY})
+        assert resp.status_code == 503
+        assert resp.headers["Retry-After"] == "5"
+
+
+def test_export_is_cached_and_honors_if_none_match(tmp_path):
+    client = server.app.test_client()
+    cache = PdfCache(str(tmp_path))
+    pool = PdfRenderPool(workers=0)
+    body = {"content": ITINERARY, "title": "Tokyo Trip"}
+
+    with patch.object(server, "pdf_pool", pool), patch.object(server, "export_cache", cache):
+        first = client.post("/api/export", json=body)
+        second = client.post("/api/export", json=body)
+        etag = first.headers["ETag"].strip('"')
+        revalidated = client.post("/api/export", json=body, headers={"If-None-Match": f'"{etag}"'})
+        changed = client.post("/api/export", json={**body, "title": "Kyoto Trip"}, headers={"If-None-Match": f'"{etag}"'})
+
+    assert first.status_code == second.status_code == 200
+    assert first.data == second.data
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert revalidated.status_code == 304 and revalidated.data == b""
+    assert changed.status_code == 200 and changed.headers["ETag"] != first.headers["ETag"]
+    assert pool.stats()["rendered"] == 2
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["not_modified"] == 1
+
+
+def test_pdf_cache_evicts_least_recently_used(tmp_path):
+    cache = PdfCache(str(tmp_path), max_bytes=25)
+    cache.put("a", b"x" * 10)
+    cache.put("b", b"x" * 10)
+    os.utime(tmp_path / "a.pdf", (1, 1))  # make "a" the oldest
+    cache.put("c", b"x" * 10)
+    assert "a" not in cache and "b" in cache and "c" in cache
+    assert cache.stats()["evictions"] == 1
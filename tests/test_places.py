@@ -0,0 +1,40 @@
+import pytest
+from unittest.mock import patch, MagicMock
+import tools.places as places
+from tools.cache import SWRCache
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    places.clear_cache()
+    yield
+    places.clear_cache()
+
+
+@patch.object(places.http_client, "post")
+def test_identical_searches_share_one_api_call(mock_post):
+    mock_post.return_value = MagicMock(json=lambda: {"places": [{"displayName": {"text": "Hotel A"}}]})
+    first = places.search_nearby(35.68123, 139.69001, ["lodging", "hotel"], 10000, 10, "places.displayName")
+    second = places.search_nearby(35.68119, 139.68998, ["hotel", "lodging"], 10000.0, 10, "places.displayName")
+    assert first == second
+    assert mock_post.call_count == 1
+    assert places.cache_stats()["hits"] == 1
+
+
+def test_swr_cache_serves_stale_then_expires():
+    now = [0.0]
+    cache = SWRCache(max_bytes=100, ttl=10, stale_ttl=5, clock=lambda: now[0])
+    cache.set("k", "v", size=1)
+    assert cache.lookup("k") == ("v", SWRCache.FRESH)
+    now[0] = 12
+    assert cache.lookup("k") == ("v", SWRCache.STALE)
+    now[0] = 16
+    assert cache.lookup("k") == (None, None)
+
+
+def test_swr_cache_is_bounded_by_bytes():
+    cache = SWRCache(max_bytes=10, ttl=60)
+    cache.set("a", "x", size=6)
+    cache.set("b", "y", size=6)
+    assert cache.lookup("a") == (None, None)
+    assert cache.stats()["bytes"] == 6
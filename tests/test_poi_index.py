@@ -0,0 +1,89 @@
+import math
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import tools.places as places
+from tools.poi_index import PoiIndex, haversine_m, popularity_order
+
+CENTER = (35.68, 139.69)
+FIELDS = "places.displayName,places.location,places.types,places.rating,places.userRatingCount"
+
+
+def _place(i, km_east, types=("museum",)):
+    dlon = km_east / (111.32 * math.cos(math.radians(CENTER[0])))
+    return {"displayName": {"text": f"Place {i}"}, "types": list(types), "userRatingCount": 1000 - i,
+            "location": {"latitude": CENTER[0], "longitude": CENTER[1] + dlon}}
+
+
+# 20 museums / galleries ranked in order, alternating 2 km and 8 km from the center
+RANKED = [_place(i, 2 if i % 2 else 8, ("museum",) if i % 3 else ("art_gallery",)) for i in range(20)]
+
+
+def _names(result):
+    return [p["displayName"]["text"] for p in result]
+
+
+def test_haversine_m():
+    assert haversine_m(0.0, 0.0, [0.0, 1.0], [1.0, 0.0]) == pytest.approx([111195, 111195], rel=1e-3)
+
+
+def test_smaller_radius_is_answered_from_a_wider_search():
+    index = PoiIndex()
+    index.add(*CENTER, ["museum", "art_gallery"], 10000, 20, FIELDS, "POPULARITY", RANKED)
+
+    result = index.answer(*CENTER, ["art_gallery", "museum"], 5000, 5, FIELDS)
+    assert _names(result) == ["Place 1", "Place 3", "Place 5", "Place 7", "Place 9"]
+
+    # Only the wider search's top 20 are known: not enough 2 km museums to be sure of a top 10
+    assert index.answer(*CENTER, ["museum"], 5000, 10, FIELDS) is None
+    assert index.answer(*CENTER, ["museum"], 5000, 3, FIELDS) == [RANKED[1], RANKED[5], RANKED[7]]
+    assert index.stats()["hits"] == 2 and index.stats()["misses"] == 1
+
+
+def test_only_containing_searches_with_the_types_and_fields_answer():
+    index = PoiIndex()
+    index.add(*CENTER, ["museum", "art_gallery"], 10000, 20, FIELDS, "POPULARITY", RANKED)
+
+    assert index.answer(*CENTER, ["museum", "zoo"], 5000, 1, FIELDS) is None            # zoo not searched
+    assert index.answer(*CENTER, ["museum"], 5000, 1, FIELDS + ",places.priceLevel") is None
+    assert index.answer(CENTER[0] + 0.1, CENTER[1], ["museum"], 5000, 1, FIELDS) is None  # 11 km away
+    assert index.answer(*CENTER, ["museum"], 20000, 1, FIELDS) is None                    # wider
+    assert index.answer(*CENTER, ["museum"], 5000, 1, FIELDS, "DISTANCE") is None
+
+
+def test_a_search_that_returned_every_match_answers_any_count():
+    index = PoiIndex()
+    index.add(*CENTER, ["zoo"], 10000, 20, FIELDS, "POPULARITY", [_place(1, 3, ("zoo",)), _place(2, 9, ("zoo",))])
+    assert _names(index.answer(*CENTER, ["zoo"], 5000, 20, FIELDS)) == ["Place 1"]
+
+
+def test_a_mask_without_types_answers_the_same_types():
+    index = PoiIndex()
+    no_types = "places.displayName,places.location"
+    zoos = [{k: v for k, v in _place(i, 3 if i < 2 else 9, ("zoo",)).items() if k != "types"} for i in range(3)]
+    index.add(*CENTER, ["zoo"], 10000, 20, no_types, "POPULARITY", zoos)
+
+    assert _names(index.answer(*CENTER, ["zoo"], 5000, 20, no_types)) == ["Place 0", "Place 1"]
+    # Without places.types the record can't say which of its places are aquariums
+    assert index.answer(*CENTER, ["aquarium"], 5000, 20, no_types) is None
+
+
+def test_popularity_order_keeps_every_ranked_pair():
+    places_by_key = {k: {"userRatingCount": n} for k, n in {"a": 10, "b": 500, "c": 50, "d": 1000}.items()}
+    # b above c and a above c were observed; d was never compared with them
+    assert popularity_order([["b", "c"], ["a", "c"], ["d"]], places_by_key) == ["d", "b", "a", "c"]
+    # a conflicting pair still yields every key once
+    assert sorted(popularity_order([["a", "b"], ["b", "a"]], places_by_key)) == ["a", "b"]
+
+
+@patch.object(places.http_client, "post")
+def test_search_nearby_filters_an_indexed_wider_search(mock_post):
+    places.clear_cache()
+    mock_post.return_value = MagicMock(json=lambda: {"places": RANKED})
+    places.search_nearby(*CENTER, ["museum", "art_gallery"], 10000, 20, FIELDS)
+    narrow = places.search_nearby(*CENTER, ["museum", "art_gallery"], 5000, 5, FIELDS)
+    assert _names(narrow) == ["Place 1", "Place 3", "Place 5", "Place 7", "Place 9"]
+    assert mock_post.call_count == 1
+    assert places.index_stats()["hits"] == 1
+    places.clear_cache()
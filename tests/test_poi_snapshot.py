@@ -0,0 +1,96 @@
+import time
+from unittest.mock import patch
+
+import pytest
+
+import tools.activity_tools as activity_tools
+import tools.hotel_tools as hotel_tools
+from tools import poi_snapshot
+
+PLACES = [
+    {"displayName": {"text": "Park Hyatt Tokyo"}, "location": {"latitude": 35.6856, "longitude": 139.6907},
+     "types": ["hotel", "lodging"], "rating": 4.6, "userRatingCount": 5000,
+     "formattedAddress": "3-7-1-2 Nishishinjuku", "googleMapsUri": "https://maps.google.com/?cid=1",
+     "priceLevel": "PRICE_LEVEL_VERY_EXPENSIVE"},
+    {"displayName": {"text": "Tokyo National Museum"}, "location": {"latitude": 35.7188, "longitude": 139.7765},
+     "types": ["museum", "tourist_attraction"], "rating": 4.5, "userRatingCount": 3000,
+     "formattedAddress": "13-9 Uenokoen", "googleMapsUri": "https://maps.google.com/?cid=2"},
+    {"displayName": {"text": "Takao Ryokan"}, "location": {"latitude": 35.6251, "longitude": 139.2437},
+     "types": ["lodging"], "userRatingCount": 10, "formattedAddress": "Hachioji"},
+]
+COVERED = hotel_tools.HOTEL_TYPES + activity_tools.DEFAULT_TYPES
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path):
+    poi_snapshot.clear()
+    with patch.object(poi_snapshot, "POI_SNAPSHOT_DIR", str(tmp_path)):
+        yield tmp_path
+    poi_snapshot.clear()
+
+
+def _write(city="Tokyo", places=PLACES, built_at=None):
+    path = poi_snapshot.snapshot_path(city)
+    poi_snapshot.write_snapshot(path, city, 35.6895, 139.6917, places, COVERED, built_at=built_at)
+    return path
+
+
+def test_snapshot_round_trip(snapshot_dir):
+    _write()
+    snapshot = poi_snapshot.load("tokyo")
+    assert len(snapshot) == 3
+    assert snapshot.place(0) == PLACES[0]
+    assert snapshot.place(2) == {**PLACES[2], "googleMapsUri": ""}
+
+
+def test_snapshot_query_filters_by_type_and_radius(snapshot_dir):
+    _write()
+    snapshot = poi_snapshot.load("Tokyo")
+    names = lambda places: [p["displayName"]["text"] for p in places]
+    assert names(snapshot.query(["lodging"], 15000, 20)) == ["Park Hyatt Tokyo"]  # the ryokan is ~40 km out
+    assert names(snapshot.query(["museum", "zoo"], 15000, 20)) == ["Tokyo National Museum"]
+    assert names(snapshot.query(["hotel", "museum"], 15000, 1)) == ["Park Hyatt Tokyo"]
+
+
+@patch.object(hotel_tools, "GOOGLE_PLACES_API_KEY", None)
+def test_search_hotels_answers_from_a_fresh_snapshot(snapshot_dir):
+    _write()
+    result = hotel_tools.search_hotels("tokyo", radius_m=10000)
+    assert result["status"] == "success"
+    assert [h["name"] for h in result["hotels"]] == ["Park Hyatt Tokyo"]
+    assert result["hotels"][0]["price_level"] == "Luxury ($$$$)"
+    assert result["city_coords"] == {"lat": 35.6895, "lon": 139.6917}
+    assert poi_snapshot.stats()["hits"] == 1
+
+
+@patch.object(activity_tools, "GOOGLE_PLACES_API_KEY", None)
+def test_search_goes_live_for_stale_or_uncovered_requests(snapshot_dir):
+    _write(built_at=time.time() - poi_snapshot.POI_SNAPSHOT_MAX_AGE - 60)
+    assert activity_tools.search_activities("Tokyo")["error_message"] == "Missing Google Places API key"
+
+    _write()
+    assert activity_tools.search_activities("Tokyo", kinds="food")["status"] == "error"  # types not in snapshot
+    assert activity_tools.search_activities("Tokyo", radius_m=50000)["status"] == "error"  # wider than snapshot
+    assert activity_tools.search_activities("Tokyo")["status"] == "success"
+    assert poi_snapshot.stats() == {"hits": 1, "misses": 3, "size": 1}
+
+
+def test_build_merges_searches_most_popular_first(snapshot_dir):
+    def _nearby(lat, lon, included_types, **kwargs):
+        return [p for p in PLACES if set(p["types"]) & set(included_types)]
+
+    with patch("tools.geocoding.geocode_city", return_value={"status": "success", "lat": 35.6895, "lon": 139.6917}), \
+         patch("tools.places.search_nearby", side_effect=_nearby) as mock_nearby:
+        assert poi_snapshot.main(["build", "Tokyo"]) is None
+
+    assert mock_nearby.call_count == 7 * len(poi_snapshot._search_groups())
+    snapshot = poi_snapshot.load("Tokyo")
+    assert [snapshot.place(i)["displayName"]["text"] for i in range(len(snapshot))] == \
+        ["Park Hyatt Tokyo", "Tokyo National Museum", "Takao Ryokan"]
+    assert set(activity_tools.KINDS_TO_GOOGLE_TYPES["food"]) <= snapshot.covered_types
+
+
+def test_build_top_takes_the_busiest_destinations_first(snapshot_dir):
+    with patch.object(poi_snapshot, "build", return_value=1) as mock_build:
+        poi_snapshot.main(["--dir", str(snapshot_dir), "build", "Kyoto", "--top", "3"])
+    assert [c.args[0] for c in mock_build.call_args_list] == ["Kyoto", "Bangkok", "Paris", "London"]
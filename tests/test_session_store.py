@@ -0,0 +1,72 @@
+import asyncio
+import os
+
+import pytest
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService
+from google.genai import types as genai_types
+
+from services.session_store import SharedSqliteSessionService, create_session_service
+
+
+def _event(text):
+    return Event(
+        author="user", invocation_id="inv",
+        content=genai_types.Content(role="user", parts=[genai_types.Part(text=text)]),
+    )
+
+
+def test_backend_selection(tmp_path):
+    assert isinstance(create_session_service("memory"), InMemorySessionService)
+    assert isinstance(create_session_service("sqlite", db_path=str(tmp_path / "s.db")), SharedSqliteSessionService)
+    with pytest.raises(ValueError):
+        create_session_service("redis")
+
+
+def test_sessions_are_shared_between_service_instances(tmp_path):
+    db_path = str(tmp_path / "sessions" / "s.db")
+    worker_a = SharedSqliteSessionService(db_path)
+    worker_b = SharedSqliteSessionService(db_path)
+
+    async def _run():
+        session = await worker_a.create_session(app_name="app", user_id="u1", session_id="s1")
+        await worker_a.append_event(session, _event("Plan Tokyo"))
+        await worker_a.append_event(session, _event("Make it 5 days"))
+
+        loaded = await worker_b.get_session(app_name="app", user_id="u1", session_id="s1")
+        count = await worker_b.count_sessions("app")
+        await worker_a.close()
+        await worker_b.close()
+        return loaded, count
+
+    loaded, count = asyncio.run(_run())
+    assert [e.content.parts[0].text for e in loaded.events] == ["Plan Tokyo", "Make it 5 days"]
+    assert count == 1
+    assert os.path.exists(db_path)
+
+
+def test_private_contracts_the_shared_service_relies_on(tmp_path):
+    # SharedSqliteSessionService overrides ADK's _get_db_connection and marks
+    # aiosqlite's worker thread as daemon; fail loudly if an upgrade moves either
+    import inspect
+    import threading
+
+    import aiosqlite
+    from google.adk.sessions.sqlite_session_service import SqliteSessionService
+
+    for name in ("create_session", "get_session", "list_sessions", "delete_session", "append_event"):
+        assert "self._get_db_connection()" in inspect.getsource(getattr(SqliteSessionService, name)), name
+    assert SqliteSessionService(str(tmp_path / "adk.db"))._db_path == str(tmp_path / "adk.db")
+
+    connection = aiosqlite.connect(str(tmp_path / "probe.db"))
+    assert isinstance(connection._thread, threading.Thread) and not connection._thread.is_alive()
+
+    service = SharedSqliteSessionService(str(tmp_path / "s.db"))
+
+    async def _run():
+        await service.create_session(app_name="app", user_id="u1", session_id="s1")
+        daemon = service._db._thread.daemon
+        await service.close()
+        return daemon
+
+    assert asyncio.run(_run()) is True
@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import tools.geocoding as geocoding
+from tools.singleflight import SingleFlight
+
+
+def test_concurrent_threads_share_one_call():
+    flight = SingleFlight("test")
+    calls = []
+
+    def _slow(x):
+        calls.append(x)
+        time.sleep(0.1)
+        return {"value": x}
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: flight.do("k", _slow, 1), range(8)))
+
+    assert calls == [1]
+    assert all(r is results[0] for r in results)
+    assert flight.stats() == {"calls": 1, "coalesced": 7, "in_flight": 0}
+
+
+def test_different_keys_and_later_calls_are_not_coalesced():
+    flight = SingleFlight("test")
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("a", lambda: 2) == 2
+    assert flight.do("b", lambda: 3) == 3
+    assert flight.stats()["calls"] == 3
+
+
+def test_errors_are_shared_then_forgotten():
+    flight = SingleFlight("test")
+    started = threading.Event()
+
+    def _fail():
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("quota")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flight.do, "k", _fail)
+        started.wait()
+        follower = pool.submit(flight.do, "k", _fail)
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError, match="quota"):
+                future.result()
+    assert flight.stats()["coalesced"] == 1
+    assert flight.do("k", lambda: "ok") == "ok"
+
+
+def test_asyncio_tasks_and_threads_coalesce():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def _slow():
+        calls.append("async")
+        await asyncio.sleep(0.1)
+        return "paris"
+
+    async def _main():
+        tasks = [asyncio.create_task(flight.do_async("k", _slow)) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        from_thread = await asyncio.to_thread(flight.do, "k", lambda: calls.append("sync"))
+        return await asyncio.gather(*tasks), from_thread
+
+    results, from_thread = asyncio.run(_main())
+    assert results == ["paris"] * 5 and from_thread == "paris"
+    assert calls == ["async"]
+    assert flight.stats()["coalesced"] == 5
+
+
+@patch.object(geocoding, "GOOGLE_PLACES_API_KEY", "test-key")
+@patch.object(geocoding.http_client, "get")
+def test_concurrent_geocodes_of_one_city_make_one_request(mock_get):
+    geocoding.clear_cache()
+
+    def _slow_get(*args, **kwargs):
+        time.sleep(0.1)
+        return MagicMock(json=lambda: {"status": "OK", "results": [
+            {"geometry": {"location": {"lat": 48.85, "lng": 2.35}}, "formatted_address": "Paris, France"}]})
+
+    mock_get.side_effect = _slow_get
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        results = list(pool.map(geocoding.geocode, ["Paris", "paris", " PARIS ", "Paris", "paris", "Paris"]))
+
+    assert mock_get.call_count == 1
+    assert {r["lat"] for r in results} == {48.85}
+    assert geocoding.flight_stats()["coalesced"] == 5
+    geocoding.clear_cache()
+
+
+def test_cancelling_the_leader_does_not_fail_its_followers():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def _slow():
+        calls.append("async")
+        await asyncio.sleep(0.1)
+        return "paris"
+
+    async def _main():
+        leader = asyncio.create_task(flight.do_async("k", _slow))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(flight.do_async("k", _slow))
+        from_thread = asyncio.create_task(asyncio.to_thread(flight.do, "k", lambda: calls.append("sync")))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower, await from_thread
+
+    assert asyncio.run(_main()) == ("paris", "paris")
+    assert calls == ["async"]
+
+
+def test_followers_retry_when_the_flight_task_is_cancelled():
+    flight = SingleFlight("test")
+    attempts = []
+
+    async def _fetch():
+        attempts.append(1)
+        await asyncio.sleep(0.05 if len(attempts) > 1 else 10)
+        return "rome"
+
+    async def _main():
+        leader = asyncio.create_task(flight.do_async("k", _fetch))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(flight.do_async("k", _fetch))
+        await asyncio.sleep(0.01)
+        for task in list(flight._tasks):
+            task.cancel()
+        return await asyncio.gather(leader, follower)
+
+    assert asyncio.run(_main()) == ["rome", "rome"]
+    assert len(attempts) == 2
+    assert flight.in_flight() == 0
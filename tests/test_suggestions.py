@@ -0,0 +1,122 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+import server
+from services import suggestions
+from services.agent_loop import AgentLoop
+
+CHIPS = '["Add a day trip to Nikko", "Switch to luxury hotels", "Best ramen?", "Add a rainy-day plan"]'
+
+
+class _FakeClient:
+    def __init__(self, text=CHIPS, delay=0.0):
+        self.calls = 0
+        self.text = text
+        self.delay = delay
+        self.aio = SimpleNamespace(models=SimpleNamespace(generate_content=self._generate))
+
+    async def _generate(self, model, contents):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(text=self.text)
+
+
+@pytest.fixture
+def loop():
+    suggestions.clear_cache()
+    agent_loop = AgentLoop(None, "test", None)
+    with patch.object(server, "agent_loop", agent_loop):
+        yield agent_loop
+    agent_loop.close()
+    suggestions.clear_cache()
+
+
+def test_suggestions_are_memoized_per_reply(loop):
+    client = server.app.test_client()
+    fake = _FakeClient()
+    with patch.object(suggestions, "_client", return_value=fake):
+        first = client.post("/api/suggestions", json={"reply": "Day 1: Tokyo", "user_message": "Plan Tokyo"})
+        again = client.post("/api/suggestions", json={"reply": "Day 1: Tokyo", "user_message": "Plan Tokyo"})
+        other = client.post("/api/suggestions", json={"reply": "Day 1: Osaka", "user_message": "Plan Osaka"})
+
+    assert first.get_json()["suggestions"][0] == "Add a day trip to Nikko"
+    assert again.get_json() == first.get_json()
+    assert other.status_code == 200
+    assert fake.calls == 2
+
+
+def test_concurrent_requests_share_one_model_call(loop):
+    fake = _FakeClient(delay=0.1)
+
+    async def _both():
+        return await asyncio.gather(
+            suggestions.generate_suggestions("Plan Tokyo", "Day 1"),
+            suggestions.generate_suggestions("Plan Tokyo", "Day 1"),
+        )
+
+    with patch.object(suggestions, "_client", return_value=fake):
+        a, b = loop.run(_both())
+    assert a == b and fake.calls == 1
+
+
+def test_bad_model_output_falls_back_and_is_not_cached(loop):
+    client = server.app.test_client()
+    fake = _FakeClient(text="Sure! Here are some ideas")
+    with patch.object(suggestions, "_client", return_value=fake):
+        for _ in range(2):
+            resp = client.post("/api/suggestions", json={"reply": "Day 1", "user_message": "Plan"})
+            assert resp.get_json()["suggestions"] == suggestions.FALLBACK_SUGGESTIONS
+    assert fake.calls == 2
+
+
+def test_chat_turn_prefetches_suggestions_for_the_session(loop):
+    from google.adk.agents import LlmAgent
+    from google.adk.sessions import InMemorySessionService
+    from benchmarks.fakes import FakeLlm
+
+    session_service = InMemorySessionService()
+    agent_loop = AgentLoop(LlmAgent(name="TestAgent", model=FakeLlm(reply="Day 1: Tokyo")), server.APP_NAME, session_service)
+    fake = _FakeClient(delay=0.05)
+    no_locations = {"hotels": [], "activities": []}
+
+    with patch.object(server, "agent_loop", agent_loop), \
+         patch.object(server, "session_service", session_service), \
+         patch.object(server, "_try_direct_tool_call", return_value=no_locations), \
+         patch.object(suggestions, "_client", return_value=fake):
+        client = server.app.test_client()
+        chat = client.post("/api/chat", json={"message": "Plan Tokyo", "session_id": "s1"})
+        resp = client.post("/api/suggestions", json={
+            "reply": chat.get_json()["reply"], "user_message": "Plan Tokyo", "session_id": "s1",
+        })
+    agent_loop.close()
+
+    assert resp.get_json()["suggestions"][0] == "Add a day trip to Nikko"
+    assert fake.calls == 1
+    stats = suggestions.cache_stats()
+    assert stats["prefetches"] == 1 and stats["slot_hits"] == 1
+
+
+def test_widget_turns_are_not_prefetched(loop):
+    from google.adk.agents import LlmAgent
+    from google.adk.sessions import InMemorySessionService
+    from benchmarks.fakes import FakeLlm
+
+    widget = 'Where would you like to go?\n###WIDGET###\n{"type": "trip_form"}\n###WIDGET###'
+    session_service = InMemorySessionService()
+    agent_loop = AgentLoop(LlmAgent(name="TestAgent", model=FakeLlm(reply=widget)), server.APP_NAME, session_service)
+    fake = _FakeClient()
+    prefetches = suggestions.cache_stats()["prefetches"]
+
+    with patch.object(server, "agent_loop", agent_loop), \
+         patch.object(server, "session_service", session_service), \
+         patch.object(server, "_try_direct_tool_call", return_value={"hotels": [], "activities": []}), \
+         patch.object(suggestions, "_client", return_value=fake):
+        chat = server.app.test_client().post("/api/chat", json={"message": "Plan a trip", "session_id": "s2"})
+    agent_loop.close()
+
+    assert "###WIDGET###" in chat.get_json()["reply"]
+    assert fake.calls == 0
+    assert suggestions.cache_stats()["prefetches"] == prefetches
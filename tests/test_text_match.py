@@ -0,0 +1,51 @@
+from tools.text_match import PlaceMatcher, get_matcher
+
+ITINERARY = """Day 1: Check in at the Park Hyatt, then walk to Meiji Jingu.
+Day 2: Morning at Senso-ji; afternoon in the zoo at Ueno, dinner near Tokyo Station."""
+
+
+def _matched(names, text=ITINERARY):
+    return {r["name"]: r["matched"] for r in PlaceMatcher(names).match(text)}
+
+
+def test_full_name_match_reports_word_positions():
+    result = PlaceMatcher(["Meiji Jingu"]).match(ITINERARY)[0]
+    assert result["matched"] and result["score"] == 1.0
+    assert (11, 13) in result["spans"]  # "meiji jingu" = words 11-12
+
+
+def test_multi_word_names_need_two_significant_words():
+    matched = _matched(["Park Hyatt Tokyo", "Tokyo Skytree", "Ueno Zoo"])
+    assert matched == {"Park Hyatt Tokyo": True, "Tokyo Skytree": False, "Ueno Zoo": True}
+
+
+def test_single_word_names_match_whole_words_only():
+    assert _matched(["Senso-ji", "Meiji", "Shinjuku", "Station"]) == {
+        "Senso-ji": True, "Meiji": True, "Shinjuku": False, "Station": True,
+    }
+    assert _matched(["Park"], "Parking is limited") == {"Park": False}
+
+
+def test_every_check_is_whole_word_unlike_the_old_substring_filter():
+    # The old fuzzy_match kept all three: it substring-matched full names
+    # and the words of multi-word names
+    text = "Toured the national museums and a modern artmuseum, then slept at the Grand Hotels."
+    assert _matched(["National Museum of Art", "Modern Museum Annex", "Grand Hotel"], text) == {
+        "National Museum of Art": False, "Modern Museum Annex": False, "Grand Hotel": False,
+    }
+    assert _matched(["Modern Museum Annex"], "The modern museum is closed") == {"Modern Museum Annex": True}
+
+
+def test_overlapping_names_all_match():
+    results = PlaceMatcher(["Tokyo Station", "Station Hotel", "Tokyo Station Hotel"]).match("Tokyo Station Hotel")
+    assert [r["score"] for r in results] == [1.0, 1.0, 1.0]
+
+
+def test_partial_score_and_empty_names():
+    results = PlaceMatcher(["Hotel Gracery Shinjuku", ""]).match("We stayed at Gracery, the hotel was great")
+    assert results[0]["matched"] and results[0]["score"] == 0.667
+    assert results[1] == {"name": "", "matched": False, "score": 0.0, "spans": []}
+
+
+def test_get_matcher_is_cached():
+    assert get_matcher(("Ueno Zoo",)) is get_matcher(("Ueno Zoo",))
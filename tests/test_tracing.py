@@ -0,0 +1,128 @@
+import json
+import threading
+from unittest.mock import MagicMock, patch
+
+from google.adk.agents import LlmAgent
+from google.adk.models import BaseLlm, LlmResponse
+from google.adk.sessions import InMemorySessionService
+from google.adk.tools.agent_tool import AgentTool
+from google.genai import types as genai_types
+
+import server
+from services.agent_loop import AgentLoop
+from services.trace_plugin import TracingPlugin, reset_tokens, token_stats
+from tools import http_client, tracing
+
+
+def _names(node):
+    return [f"{c['kind']}:{c['name']}" for c in node.get("children", [])]
+
+
+def _find(node, stage):
+    if f"{node['kind']}:{node['name']}" == stage:
+        return node
+    for child in node.get("children", []):
+        found = _find(child, stage)
+        if found:
+            return found
+    return None
+
+
+def test_span_is_a_no_op_outside_a_trace():
+    with tracing.span("http", "example.com/") as s:
+        assert s is None
+    assert tracing.current_trace() is None
+
+
+def test_spans_nest_and_feed_stage_histograms():
+    tracing.reset_stats()
+    with tracing.trace("chat") as t:
+        with tracing.span("agent", "root"):
+            with tracing.span("tool", "search_hotels", city="Paris"):
+                pass
+        # Work on another thread joins the trace only through bind()
+        worker = threading.Thread(target=tracing.bind(lambda: tracing.record_span("http", "api", 0.0)))
+        worker.start()
+        worker.join()
+    tree = t.to_dict()
+
+    assert _names(tree) == ["agent:root", "http:api"]
+    assert _find(tree, "tool:search_hotels")["attrs"] == {"city": "Paris"}
+    stats = tracing.stage_stats()
+    assert stats["tool:search_hotels"]["count"] == 1
+    assert stats["request:chat"]["count"] == 1
+
+
+def test_agent_loop_runs_coroutines_in_the_callers_context():
+    loop = AgentLoop(LlmAgent(name="TestAgent"), "test", InMemorySessionService())
+
+    async def _trace_name():
+        return tracing.current_trace().root.name
+
+    try:
+        with tracing.trace("outer"):
+            assert loop.run(_trace_name()) == "outer"
+    finally:
+        loop.close()
+
+
+class _CallOnceLlm(BaseLlm):
+    """Calls one tool, then answers once the tool's response is in the request."""
+    model: str = "test-llm"
+    tool: str
+    args: dict
+
+    async def generate_content_async(self, llm_request, stream: bool = False):
+        last = llm_request.contents[-1].parts[0]
+        if last.function_response:
+            part = genai_types.Part(text="done")
+        else:
+            part = genai_types.Part(function_call=genai_types.FunctionCall(name=self.tool, args=self.args))
+        yield LlmResponse(
+            content=genai_types.Content(role="model", parts=[part]),
+            usage_metadata=genai_types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=10, candidates_token_count=2,
+            ),
+        )
+
+
+def lookup(city: str) -> dict:
+    """Look up a city."""
+    http_client.get("https://places.googleapis.com/v1/places:searchNearby")
+    return {"status": "success"}
+
+
+def test_chat_trace_covers_agents_tools_and_http_calls():
+    child = LlmAgent(name="child_agent", model=_CallOnceLlm(tool="lookup", args={"city": "Paris"}), tools=[lookup])
+    root = LlmAgent(
+        name="root_agent",
+        model=_CallOnceLlm(tool="child_agent", args={"request": "Paris"}),
+        tools=[AgentTool(agent=child)],
+    )
+    session_service = InMemorySessionService()
+    loop = AgentLoop(root, server.APP_NAME, session_service, plugins=[TracingPlugin()])
+    no_locations = {"hotels": [], "activities": []}
+    reset_tokens()
+
+    with patch.object(server, "agent_loop", loop), \
+         patch.object(server, "session_service", session_service), \
+         patch.object(server, "_try_direct_tool_call", return_value=no_locations), \
+         patch.object(server, "TRACE_DEBUG", True), \
+         patch.object(http_client, "session", MagicMock()):
+        client = server.app.test_client()
+        resp = client.post("/api/chat", json={"message": "Paris", "session_id": "t1"},
+                           headers={"X-WanderWise-Debug": "trace"})
+        plain = client.post("/api/chat", json={"message": "Paris", "session_id": "t2"})
+    loop.close()
+
+    assert resp.status_code == 200
+    tree = json.loads(resp.headers[server.TRACE_HEADER])
+    assert tree["name"] == "chat"
+    tool = _find(tree, "tool:child_agent")
+    assert tool["attrs"]["agent_tool"] is True
+    child_agent = _find(tool, "agent:child_agent")
+    assert "llm:child_agent" in _names(child_agent)
+    assert _names(_find(child_agent, "tool:lookup")) == ["http:places.googleapis.com/v1/places:searchNearby"]
+    assert "request:chat" in resp.headers["Server-Timing"].replace("-", ":")
+    assert server.TRACE_HEADER not in plain.headers
+    assert token_stats()["child_agent"]["prompt_tokens"] == 40
@@ -0,0 +1,47 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+from google.adk.models import BaseLlm, LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types as genai_types
+
+from agents.activity_agent import activity_agent
+from agents.hotel_agent import hotel_agent
+from agents.trip_discovery_agent import trip_discovery_agent
+
+
+class _SlowLlm(BaseLlm):
+    model: str = "test-llm"
+    reply: str
+
+    async def generate_content_async(self, llm_request, stream: bool = False):
+        await asyncio.sleep(0.2)
+        yield LlmResponse(content=genai_types.Content(role="model", parts=[genai_types.Part(text=self.reply)]))
+
+
+def test_trip_discovery_runs_both_agents_concurrently_and_fills_state():
+    session_service = InMemorySessionService()
+    runner = Runner(app_name="test", agent=trip_discovery_agent, session_service=session_service)
+    message = genai_types.Content(role="user", parts=[genai_types.Part(text="Paris, 2 guests, museums")])
+
+    async def _run():
+        await session_service.create_session(app_name="test", user_id="u", session_id="s")
+        texts = []
+        async for event in runner.run_async(user_id="u", session_id="s", new_message=message):
+            if event.content and event.content.parts and event.author == "trip_discovery":
+                texts.append(event.content.parts[0].text)
+        session = await session_service.get_session(app_name="test", user_id="u", session_id="s")
+        return texts, session.state
+
+    with patch.object(hotel_agent, "model", _SlowLlm(reply="Hotel Lutetia")), \
+         patch.object(activity_agent, "model", _SlowLlm(reply="Louvre Museum")):
+        start = time.perf_counter()
+        texts, state = asyncio.run(_run())
+        elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.38  # two 0.2 s model calls, overlapped
+    assert texts == ["## Hotels\nHotel Lutetia\n\n## Activities\nLouvre Museum"]
+    assert state["hotel_results"] == "Hotel Lutetia"
+    assert state["activity_results"] == "Louvre Museum"
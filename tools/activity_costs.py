@@ -0,0 +1,158 @@
+# tools/activity_costs.py
+
+# ---------------------------------------------------------------------------
+# Activity cost bands (USD per person) and the index that maps Google Places
+# types and free-text activity keywords onto them.
+#
+# The old lookup scanned ACTIVITY_COST_ESTIMATES with `key in keyword or
+# keyword in key`, so the answer depended on dict order ("park" hit
+# "amusement_park", "barbecue_restaurant" hit "bar", "" hit "museum") and
+# every lookup was linear. Everything is now resolved at import into:
+#   - an exact hash over every band name and every Places type the activity
+#     tool can request or get back ("water_park", "buddhist_temple", ...);
+#   - a token index for anything else, matched head-word first, since
+#     place types are head-final ("sushi_restaurant" -> restaurant,
+#     "rooftop bar" -> bar, "Art Museum" -> museum).
+# activity_costs() resolves a whole list at once into an (n, 2) array.
+# ---------------------------------------------------------------------------
+
+import re
+from functools import lru_cache
+
+import numpy as np
+
+# Activity cost estimates (USD per person) by category
+ACTIVITY_COST_ESTIMATES = {
+    "museum": (10, 25),
+    "art_gallery": (10, 20),
+    "historical_place": (5, 20),
+    "amusement_park": (30, 80),
+    "zoo": (15, 35),
+    "aquarium": (15, 30),
+    "theme_park": (50, 120),
+    "national_park": (5, 35),
+    "park": (0, 5),
+    "tourist_attraction": (10, 30),
+    "landmark": (0, 15),
+    "night_club": (20, 60),
+    "bar": (15, 40),
+    "restaurant": (20, 60),
+    "cafe": (5, 20),
+    "place_of_worship": (0, 10),
+    "garden": (5, 15),
+    "beach": (0, 10),
+    "market": (10, 40),
+    "shopping": (20, 100),
+    "performance": (30, 100),
+    "spa": (40, 120),
+    "default": (10, 25),
+}
+
+# Google Places (New) types -> cost band. Covers every type in
+# activity_tools.KINDS_TO_GOOGLE_TYPES / DEFAULT_TYPES plus the related
+# types Nearby Search returns alongside them.
+PLACE_TYPE_BANDS = {
+    # culture
+    "museum": "museum", "art_museum": "museum", "history_museum": "museum", "science_museum": "museum",
+    "art_gallery": "art_gallery", "art_studio": "art_gallery", "cultural_center": "museum",
+    "cultural_landmark": "landmark", "historical_place": "historical_place",
+    "historical_landmark": "historical_place", "monument": "landmark", "ruins": "historical_place",
+    "castle": "historical_place", "palace": "historical_place", "sculpture": "landmark",
+    "landmark": "landmark", "tourist_attraction": "tourist_attraction", "observation_deck": "tourist_attraction",
+    "visitor_center": "landmark", "plaza": "landmark", "bridge": "landmark",
+    # nature
+    "national_park": "national_park", "state_park": "national_park", "park": "park", "city_park": "park",
+    "dog_park": "park", "hiking_area": "park", "botanical_garden": "garden", "garden": "garden",
+    "beach": "beach", "marina": "park", "wildlife_park": "zoo", "wildlife_refuge": "national_park",
+    # worship
+    "church": "place_of_worship", "hindu_temple": "place_of_worship", "mosque": "place_of_worship",
+    "synagogue": "place_of_worship", "buddhist_temple": "place_of_worship",
+    "place_of_worship": "place_of_worship", "shinto_shrine": "place_of_worship",
+    # amusements
+    "amusement_park": "amusement_park", "theme_park": "theme_park", "water_park": "amusement_park",
+    "amusement_center": "amusement_park", "roller_coaster": "amusement_park", "ferris_wheel": "tourist_attraction",
+    "zoo": "zoo", "aquarium": "aquarium", "casino": "night_club", "bowling_alley": "amusement_park",
+    # food & drink
+    "restaurant": "restaurant", "food": "restaurant", "fine_dining_restaurant": "restaurant",
+    "bakery": "cafe", "cafe": "cafe", "coffee_shop": "cafe", "tea_house": "cafe", "dessert_shop": "cafe",
+    "ice_cream_shop": "cafe", "food_court": "cafe", "bar": "bar", "wine_bar": "bar", "pub": "bar",
+    "bar_and_grill": "bar", "night_club": "night_club", "winery": "bar",
+    # shopping
+    "shopping_mall": "shopping", "market": "market", "store": "shopping", "department_store": "shopping",
+    "gift_shop": "shopping", "book_store": "shopping", "clothing_store": "shopping",
+    # shows & wellness
+    "performing_arts_theater": "performance", "concert_hall": "performance", "opera_house": "performance",
+    "movie_theater": "performance", "amphitheatre": "performance", "event_venue": "performance",
+    "spa": "spa", "sauna": "spa", "public_bath": "spa",
+    # generic types every result carries
+    "point_of_interest": "default", "establishment": "default",
+}
+
+# Single words that name a band on their own in free text ("Louvre gallery",
+# "rooftop pub"); single-word keys of the two tables above are added at build time
+TOKEN_BANDS = {
+    "gallery": "art_gallery", "temple": "place_of_worship", "shrine": "place_of_worship",
+    "cathedral": "place_of_worship", "basilica": "place_of_worship", "chapel": "place_of_worship",
+    "castle": "historical_place", "palace": "historical_place", "fort": "historical_place",
+    "tower": "landmark", "monument": "landmark", "memorial": "landmark",
+    "garden": "garden", "gardens": "garden", "beach": "beach", "mall": "shopping", "shop": "shopping",
+    "theater": "performance", "theatre": "performance", "show": "performance", "concert": "performance",
+    "club": "night_club", "pub": "bar", "brewery": "bar", "coffee": "cafe", "bakery": "cafe",
+    "hike": "park", "hiking": "park", "trail": "park",
+}
+
+_SEPARATOR_RE = re.compile(r"[^a-z0-9]+")
+
+
+def _tokens(keyword: str) -> list:
+    return _SEPARATOR_RE.sub(" ", (keyword or "").lower()).split()
+
+
+def _build():
+    exact = {band: band for band in ACTIVITY_COST_ESTIMATES}
+    exact.update(PLACE_TYPE_BANDS)
+    tokens = {key: band for key, band in exact.items() if "_" not in key}
+    for word, band in TOKEN_BANDS.items():
+        tokens.setdefault(word, band)
+    return exact, tokens
+
+
+_EXACT, _TOKEN_INDEX = _build()
+
+
+def cost_band(keyword: str) -> str:
+    """
+    Band name for a Places type or activity keyword:
+      1. exact match of the normalized keyword ("Amusement Park" -> amusement_park);
+      2. the longest exact-matching suffix ("japanese_buddhist_temple" -> buddhist_temple);
+      3. the right-most word with a band ("sushi_restaurant" -> restaurant);
+      4. "default".
+    """
+    words = _tokens(keyword)
+    for start in range(len(words)):
+        band = _EXACT.get("_".join(words[start:]))
+        if band is not None:
+            return band
+    for word in reversed(words):
+        band = _TOKEN_INDEX.get(word)
+        if band is not None:
+            return band
+    return "default"
+
+
+@lru_cache(maxsize=4096)
+def activity_cost(keyword: str) -> tuple:
+    """(low, high) USD per person for one Places type or activity keyword."""
+    return ACTIVITY_COST_ESTIMATES[cost_band(keyword)]
+
+
+def activity_costs(keywords) -> np.ndarray:
+    """
+    (low, high) per keyword as an int64 array of shape (len(keywords), 2).
+    Each distinct keyword is resolved once.
+    """
+    keywords = list(keywords)
+    if not keywords:
+        return np.zeros((0, 2), dtype=np.int64)
+    distinct = {k: activity_cost(k) for k in dict.fromkeys(keywords)}
+    return np.asarray([distinct[k] for k in keywords], dtype=np.int64)
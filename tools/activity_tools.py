@@ -1,14 +1,17 @@
 # tools/activity_tools.py
 
+import asyncio
 import os
-import requests
 from dotenv import load_dotenv
 
+from tools import poi_snapshot
+from tools.geocoding import geocode_city, geocode_city_async
+from tools.places import search_nearby, search_nearby_async
+
 load_dotenv()
 GOOGLE_PLACES_API_KEY = os.getenv("GOOGLE_PLACES_API_KEY")
 
-GEOCODING_URL = "https://maps.googleapis.com/maps/api/geocode/json"
-PLACES_URL = "https://places.googleapis.com/v1/places:searchNearby"
+ACTIVITY_FIELD_MASK = "places.displayName,places.location,places.types,places.rating,places.userRatingCount,places.formattedAddress,places.googleMapsUri"
 
 # Mapping of interest keywords to Google Places (New) includedTypes
 KINDS_TO_GOOGLE_TYPES = {
@@ -39,38 +42,6 @@ DEFAULT_TYPES = [
 ]
 
 
-def geocode_city(city: str) -> dict:
-    """
-    Use Google Geocoding API to convert a city name to lat/lon.
-    Returns: {"status": "success", "lat": ..., "lon": ...}
-          or {"status": "error", "error_message": ...}
-    """
-    if not GOOGLE_PLACES_API_KEY:
-        return {"status": "error", "error_message": "Missing Google Places API key"}
-
-    params = {"address": city, "key": GOOGLE_PLACES_API_KEY}
-
-    try:
-        resp = requests.get(GEOCODING_URL, params=params, timeout=10)
-        resp.raise_for_status()
-        data = resp.json()
-
-        if data.get("status") != "OK" or not data.get("results"):
-            return {
-                "status": "error",
-                "error_message": f"Could not geocode city: {city} — {data.get('status')}",
-            }
-
-        location = data["results"][0]["geometry"]["location"]
-        return {
-            "status": "success",
-            "lat": location["lat"],
-            "lon": location["lng"],
-        }
-    except Exception as e:
-        return {"status": "error", "error_message": str(e)}
-
-
 def parse_kinds_to_google_types(kinds: str) -> list:
     """
     Convert a comma-separated kinds string (e.g. 'cultural,museums,food')
@@ -121,78 +92,109 @@ def search_activities(
     Each activity dict contains:
         name, lat, lon, types, rating, user_rating_count, address, google_maps_url
     """
-    if not GOOGLE_PLACES_API_KEY:
-        return {"status": "error", "error_message": "Missing Google Places API key"}
+    query = _nearby_query(kinds, radius_m, limit)
+
+    # Step 0 — a fresh local snapshot answers without any API call
+    answer = _local_answer(city, query)
+    if answer is not None:
+        return answer
 
     # Step 1 — geocode city
     geo = geocode_city(city)
     if geo.get("status") != "success":
-        return {
-            "status": "error",
-            "error_message": "Failed to geocode city: " + geo.get("error_message", ""),
-        }
+        return _geocode_error(geo)
+
+    # Step 2 — call Google Places (New) Nearby Search (cached)
+    try:
+        places = search_nearby(geo["lat"], geo["lon"], **query)
+        return _activity_results(city, places, geo["lat"], geo["lon"])
+    except Exception as e:
+        return {"status": "error", "error_message": str(e)}
+
 
-    lat = geo["lat"]
-    lon = geo["lon"]
+async def search_activities_async(
+    city: str,
+    kinds: str = None,
+    radius_m: int = 10000,
+    limit: int = 20,
+) -> dict:
+    # search_activities for the agents: the same steps, awaiting the API
+    # calls. The snapshot check runs in a worker thread (see search_hotels_async).
+    query = _nearby_query(kinds, radius_m, limit)
 
-    # Step 2 — map kinds to Google Place types
-    included_types = parse_kinds_to_google_types(kinds)
+    answer = await asyncio.to_thread(_local_answer, city, query)
+    if answer is not None:
+        return answer
+
+    geo = await geocode_city_async(city)
+    if geo.get("status") != "success":
+        return _geocode_error(geo)
+
+    try:
+        places = await search_nearby_async(geo["lat"], geo["lon"], **query)
+        return _activity_results(city, places, geo["lat"], geo["lon"])
+    except Exception as e:
+        return {"status": "error", "error_message": str(e)}
 
-    # Step 3 — call Google Places (New) Nearby Search
-    headers = {
-        "Content-Type": "application/json",
-        "X-Goog-Api-Key": GOOGLE_PLACES_API_KEY,
-        "X-Goog-FieldMask": "places.displayName,places.location,places.types,places.rating,places.userRatingCount,places.formattedAddress,places.googleMapsUri",
+
+# ADK takes the tool description from the docstring
+search_activities_async.__doc__ = search_activities.__doc__
+
+
+def _nearby_query(kinds: str, radius_m: int, limit: int) -> dict:
+    return {
+        "included_types": parse_kinds_to_google_types(kinds)[:50],  # Google allows max 50 types
+        "radius_m": float(radius_m),
+        "max_results": min(limit, 20),                             # Google max is 20
+        "field_mask": ACTIVITY_FIELD_MASK,
     }
 
-    body = {
-        "includedTypes": included_types[:50],  # Google allows max 50 types
-        "maxResultCount": min(limit, 20),       # Google max is 20
-        "locationRestriction": {
-            "circle": {
-                "center": {"latitude": lat, "longitude": lon},
-                "radius": float(radius_m),
-            }
-        },
-        "rankPreference": "POPULARITY",
+
+def _local_answer(city: str, query: dict):
+    """The result when no API call is needed (snapshot hit, or no API key), else None."""
+    snapshot = poi_snapshot.search(city, query["included_types"], query["radius_m"], query["max_results"])
+    if snapshot is not None:
+        return _activity_results(city, snapshot["places"], snapshot["lat"], snapshot["lon"])
+    if not GOOGLE_PLACES_API_KEY:
+        return {"status": "error", "error_message": "Missing Google Places API key"}
+    return None
+
+
+def _geocode_error(geo: dict) -> dict:
+    return {
+        "status": "error",
+        "error_message": "Failed to geocode city: " + geo.get("error_message", ""),
     }
 
-    try:
-        resp = requests.post(PLACES_URL, headers=headers, json=body, timeout=10)
-        resp.raise_for_status()
-        data = resp.json()
-
-        places = data.get("places", [])
-
-        if not places:
-            return {
-                "status": "error",
-                "error_message": f"No activities found for {city}. Try increasing radius_m or broadening interests.",
-            }
-
-        activities = []
-        for place in places:
-            name = place.get("displayName", {}).get("text", "").strip()
-            if not name:
-                continue
-
-            location = place.get("location", {})
-            activities.append({
-                "name": name,
-                "lat": location.get("latitude"),
-                "lon": location.get("longitude"),
-                "types": place.get("types", []),
-                "rating": place.get("rating"),
-                "user_rating_count": place.get("userRatingCount"),
-                "address": place.get("formattedAddress", "Address unavailable"),
-                "google_maps_url": place.get("googleMapsUri", ""),
-            })
 
+def _activity_results(city: str, places: list, lat: float, lon: float) -> dict:
+    """Nearby Search places (live or snapshot) as the search_activities result."""
+    if not places:
         return {
-            "status": "success",
-            "activities": activities,
-            "city_coords": {"lat": lat, "lon": lon},
+            "status": "error",
+            "error_message": f"No activities found for {city}. Try increasing radius_m or broadening interests.",
         }
 
-    except Exception as e:
-        return {"status": "error", "error_message": str(e)}
\ No newline at end of file
+    activities = []
+    for place in places:
+        name = place.get("displayName", {}).get("text", "").strip()
+        if not name:
+            continue
+
+        location = place.get("location", {})
+        activities.append({
+            "name": name,
+            "lat": location.get("latitude"),
+            "lon": location.get("longitude"),
+            "types": place.get("types", []),
+            "rating": place.get("rating"),
+            "user_rating_count": place.get("userRatingCount"),
+            "address": place.get("formattedAddress", "Address unavailable"),
+            "google_maps_url": place.get("googleMapsUri", ""),
+        })
+
+    return {
+        "status": "success",
+        "activities": activities,
+        "city_coords": {"lat": lat, "lon": lon},
+    }
@@ -4,8 +4,20 @@
 # Budget estimation tool for WanderWise travel agent.
 # Uses tiered cost estimates per city/region rather than a live pricing API.
 # Data is based on widely-published travel cost averages (2025-2026).
+#
+# estimate_budget() prices one trip in detail. estimate_budget_scenarios()
+# prices a whole grid of trips (tiers × days × people × hotel price levels)
+# in one vectorized NumPy pass, for "what would it cost if..." comparisons.
 # ---------------------------------------------------------------------------
 
+from functools import lru_cache
+from itertools import product
+
+import numpy as np
+
+from tools.activity_costs import ACTIVITY_COST_ESTIMATES, activity_cost, activity_costs  # noqa: F401
+from tools.gazetteer import canonical_key
+
 # Hotel nightly cost ranges (USD) by Google Places price level
 HOTEL_PRICE_RANGES = {
     "PRICE_LEVEL_INEXPENSIVE": (40, 80),
@@ -16,25 +28,6 @@ HOTEL_PRICE_RANGES = {
     "Price unavailable": (100, 200),
 }
 
-# Activity cost estimates (USD per person) by category keyword
-ACTIVITY_COST_ESTIMATES = {
-    "museum": (10, 25),
-    "art_gallery": (10, 20),
-    "historical_place": (5, 20),
-    "amusement_park": (30, 80),
-    "zoo": (15, 35),
-    "aquarium": (15, 30),
-    "theme_park": (50, 120),
-    "national_park": (5, 35),
-    "park": (0, 5),
-    "tourist_attraction": (10, 30),
-    "landmark": (0, 15),
-    "night_club": (20, 60),
-    "bar": (15, 40),
-    "restaurant": (20, 60),
-    "default": (10, 25),
-}
-
 # Daily food budget estimates (USD per person) by budget tier
 FOOD_DAILY_BUDGET = {
     "budget": (20, 40),
@@ -60,17 +53,39 @@ TRANSPORT_DAILY_BUDGET = {
     "default": (10, 20),
 }
 
+# Hotel price level assumed for a tier when a scenario grid names no hotel levels
+TIER_HOTEL_LEVEL = {
+    "budget": "PRICE_LEVEL_INEXPENSIVE",
+    "mid-range": "PRICE_LEVEL_MODERATE",
+    "luxury": "PRICE_LEVEL_EXPENSIVE",
+}
+
+# Largest grid estimate_budget_scenarios will price in one call
+MAX_SCENARIOS = 500
+
+# Largest values one scenario may use (the activity prefix sum grows with days x activities)
+MAX_DAYS = 60
+MAX_PEOPLE = 50
+MAX_ACTIVITIES_PER_DAY = 10
+
+SCENARIO_COLUMNS = ["budget_tier", "num_days", "num_people", "hotel_price_level",
+                    "total_low", "total_high", "per_person_low", "per_person_high"]
+
+
+@lru_cache(maxsize=1)
+def _transport_index() -> dict:
+    # TRANSPORT_DAILY_BUDGET re-keyed by gazetteer canonical name, so
+    # "NYC", "New York" and "new york city" all find the same row
+    return {canonical_key(city): costs for city, costs in TRANSPORT_DAILY_BUDGET.items()}
+
 
 def _get_transport_estimate(city: str) -> tuple:
-    return TRANSPORT_DAILY_BUDGET.get(city.lower().strip(), TRANSPORT_DAILY_BUDGET["default"])
+    return _transport_index().get(canonical_key(city), TRANSPORT_DAILY_BUDGET["default"])
 
 
 def _get_activity_cost_by_keyword(keyword: str) -> tuple:
-    keyword = keyword.lower().strip()
-    for key in ACTIVITY_COST_ESTIMATES:
-        if key in keyword or keyword in key:
-            return ACTIVITY_COST_ESTIMATES[key]
-    return ACTIVITY_COST_ESTIMATES["default"]
+    # Indexed lookup, see tools/activity_costs.py
+    return activity_cost(keyword)
 
 
 def estimate_budget(
@@ -129,19 +144,14 @@ def estimate_budget(
     name_list = [n.strip() for n in activity_names.split(",") if n.strip()] if activity_names else []
 
     total_activities = num_days * activities_per_day
-    activity_costs_low = 0
-    activity_costs_high = 0
-    activity_breakdown = []
-
-    for i in range(total_activities):
-        # Use type if available, otherwise fall back to default
-        keyword = type_list[i] if i < len(type_list) else "default"
-        low, high = _get_activity_cost_by_keyword(keyword)
-        cost_low = low * num_people
-        cost_high = high * num_people
-        activity_costs_low += cost_low
-        activity_costs_high += cost_high
+    # Use type if available, otherwise fall back to default; all priced in one lookup
+    keywords = type_list[:total_activities] + ["default"] * max(0, total_activities - len(type_list))
+    costs = (activity_costs(keywords) * num_people).tolist()
+    activity_costs_low = sum(low for low, _ in costs)
+    activity_costs_high = sum(high for _, high in costs)
 
+    activity_breakdown = []
+    for i, (cost_low, cost_high) in enumerate(costs):
         name = name_list[i] if i < len(name_list) else f"Activity {i+1}"
         activity_breakdown.append({
             "name": name,
@@ -170,4 +180,136 @@ def estimate_budget(
             "activity_details": activity_breakdown,
         },
         "note": "All estimates are approximate and based on typical travel costs. Actual costs may vary.",
-    }
\ No newline at end of file
+    }
+
+
+def _split(values, cast=str) -> list:
+    """Distinct values, in order, from a comma-separated string or a list."""
+    if values is None or values == "":
+        return []
+    if isinstance(values, (str, int)):
+        values = str(values).split(",")
+    items = [cast(str(v).strip()) for v in values if str(v).strip()]
+    return list(dict.fromkeys(items))
+
+
+def budget_grid(city: str, tiers: list, days: list, people: list, hotel_levels: list,
+                activity_types: list = (), activities_per_day: int = 2) -> np.ndarray:
+    """
+    Low/high trip totals for every scenario as an int64 array of shape
+    (len(tiers), len(days), len(people), len(hotel_levels) or 1, 2).
+    With no hotel levels each tier uses its TIER_HOTEL_LEVEL. Same cost
+    model as estimate_budget.
+    """
+    days_a = np.asarray(days, dtype=np.int64)[None, :, None, None, None]
+    people_a = np.asarray(people, dtype=np.int64)[None, None, :, None, None]
+
+    if hotel_levels:
+        nightly = [HOTEL_PRICE_RANGES.get(h, HOTEL_PRICE_RANGES["Price unavailable"]) for h in hotel_levels]
+        hotel = np.asarray(nightly, dtype=np.int64)[None, None, None, :, :]
+    else:
+        nightly = [HOTEL_PRICE_RANGES[TIER_HOTEL_LEVEL[t]] for t in tiers]
+        hotel = np.asarray(nightly, dtype=np.int64)[:, None, None, None, :]
+    food = np.asarray([FOOD_DAILY_BUDGET[t] for t in tiers], dtype=np.int64)[:, None, None, None, :]
+    transport = np.asarray(_get_transport_estimate(city), dtype=np.int64)
+
+    # Activity i is priced by activity_types[i] (else "default"); the cost of
+    # a trip's first n activities is a prefix sum, looked up per trip length
+    counts = np.asarray(days, dtype=np.int64) * activities_per_day
+    n = int(counts.max(initial=0))
+    keywords = list(activity_types[:n]) + ["default"] * max(0, n - len(activity_types))
+    prefix = np.vstack([np.zeros((1, 2), dtype=np.int64), np.cumsum(activity_costs(keywords), axis=0)])
+    activities = prefix[counts][None, :, None, None, :]
+
+    return hotel * days_a + (food + transport) * days_a * people_a + activities * people_a
+
+
+def estimate_budget_scenarios(
+    city: str,
+    budget_tiers: str = "budget,mid-range,luxury",
+    num_days: str = "",
+    num_people: str = "",
+    hotel_price_levels: str = "",
+    activity_types: str = "",
+    activities_per_day: int = 2,
+) -> dict:
+    """
+    Compare trip budgets across several scenarios in one call, e.g. every budget
+    tier for 5 vs 7 days, or 2 vs 4 travelers.
+
+    Args:
+        city:               Destination city name.
+        budget_tiers:       Comma-separated tiers to compare e.g. 'budget,mid-range,luxury'.
+        num_days:           Comma-separated trip lengths in days e.g. '5,7,10'.
+        num_people:         Comma-separated group sizes e.g. '2,4'.
+        hotel_price_levels: Comma-separated Google Places price levels e.g.
+                            'PRICE_LEVEL_MODERATE,PRICE_LEVEL_EXPENSIVE'. Leave empty
+                            to use each tier's typical hotel level.
+        activity_types:     Comma-separated activity type keywords e.g. 'museum,park'.
+        activities_per_day: How many activities per day to budget for (default 2).
+
+    Returns:
+        {
+            "status": "success",
+            "destination": str,
+            "scenarios": int,
+            "columns": [budget_tier, num_days, num_people, hotel_price_level,
+                        total_low, total_high, per_person_low, per_person_high],
+            "rows": [[...], ...],   # one per scenario, USD
+            "cheapest": {...}, "most_expensive": {...},
+            "note": str
+        }
+    """
+    try:
+        tiers = [t.lower() for t in _split(budget_tiers)] or list(FOOD_DAILY_BUDGET)
+        days = _split(num_days, int)
+        people = _split(num_people, int)
+        hotel_levels = _split(hotel_price_levels)
+        # Order and repeats matter here: activity i is priced by the i-th type
+        if isinstance(activity_types, str):
+            activity_types = activity_types.split(",")
+        types = [str(t).strip() for t in activity_types or [] if str(t).strip()]
+        activities_per_day = int(activities_per_day)
+    except (TypeError, ValueError) as e:
+        return {"status": "error", "error_message": f"Invalid scenario values: {e}"}
+
+    unknown = [t for t in tiers if t not in FOOD_DAILY_BUDGET]
+    if unknown:
+        return {"status": "error", "error_message": f"Unknown budget tier(s): {', '.join(unknown)}"}
+    if not days or not people:
+        return {"status": "error", "error_message": "num_days and num_people each need at least one value."}
+    if min(days) < 1 or min(people) < 1 or activities_per_day < 0:
+        return {"status": "error", "error_message": "Days and travelers must be positive."}
+    if max(days) > MAX_DAYS or max(people) > MAX_PEOPLE or activities_per_day > MAX_ACTIVITIES_PER_DAY:
+        return {
+            "status": "error",
+            "error_message": f"Scenarios are limited to {MAX_DAYS} days, {MAX_PEOPLE} travelers "
+                             f"and {MAX_ACTIVITIES_PER_DAY} activities per day.",
+        }
+    count = len(tiers) * len(days) * len(people) * max(1, len(hotel_levels))
+    if count > MAX_SCENARIOS:
+        return {"status": "error", "error_message": f"{count} scenarios requested; the limit is {MAX_SCENARIOS}."}
+
+    totals = budget_grid(city, tiers, days, people, hotel_levels, types, activities_per_day)
+    per_person = totals // np.asarray(people, dtype=np.int64)[None, None, :, None, None]
+
+    levels = hotel_levels or [None]
+    rows = []
+    for (t, tier), (d, n_days), (p, n_people), (h, level) in product(
+        enumerate(tiers), enumerate(days), enumerate(people), enumerate(levels)
+    ):
+        rows.append([tier, n_days, n_people, level or TIER_HOTEL_LEVEL[tier],
+                     *totals[t, d, p, h].tolist(), *per_person[t, d, p, h].tolist()])
+
+    cheapest = min(rows, key=lambda r: r[4])
+    priciest = max(rows, key=lambda r: r[5])
+    return {
+        "status": "success",
+        "destination": city,
+        "scenarios": len(rows),
+        "columns": SCENARIO_COLUMNS,
+        "rows": rows,
+        "cheapest": dict(zip(SCENARIO_COLUMNS, cheapest)),
+        "most_expensive": dict(zip(SCENARIO_COLUMNS, priciest)),
+        "note": "All estimates are approximate and based on typical travel costs. Actual costs may vary.",
+    }
@@ -0,0 +1,170 @@
+# tools/cache.py
+
+# ---------------------------------------------------------------------------
+# Small in-process caches shared by the tool layer.
+# ---------------------------------------------------------------------------
+
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with a size cap and per-entry time-to-live.
+
+    Entries expire `ttl` seconds after they are set (overridable per entry);
+    when full, the least recently used entry is evicted. Hit / miss /
+    eviction counters are exposed through stats().
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at > self._clock():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl: float = None):
+        expires_at = self._clock() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+            return default if entry is _MISSING else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            return entry is not _MISSING and entry[0] > self._clock()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class SWRCache:
+    """
+    Thread-safe, memory-bounded LRU cache with stale-while-revalidate.
+
+    Each entry is fresh for `ttl` seconds, then stale for a further
+    `stale_ttl` seconds, then gone. lookup() reports which state a hit is
+    in so the caller can serve a stale value immediately and refresh it in
+    the background. The cache is bounded by the summed `size` of its entries
+    (callers pass an estimate, e.g. serialized length in bytes).
+    """
+
+    FRESH = "fresh"
+    STALE = "stale"
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, ttl: float = 3600.0,
+                 stale_ttl: float = 0.0, clock=time.monotonic):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._data = OrderedDict()  # key -> (fresh_until, stale_until, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, key):
+        """Return (value, FRESH | STALE) on a hit, or (None, None) on a miss."""
+        now = self._clock()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                fresh_until, stale_until, size, value = entry
+                if now < fresh_until:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value, self.FRESH
+                if now < stale_until:
+                    self._data.move_to_end(key)
+                    self.stale_hits += 1
+                    return value, self.STALE
+                del self._data[key]
+                self._bytes -= size
+            self.misses += 1
+            return None, None
+
+    def set(self, key, value, size: int):
+        if size > self.max_bytes:
+            return
+        now = self._clock()
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._data[key] = (now + self.ttl, now + self.ttl + self.stale_ttl, size, value)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self._bytes -= evicted[2]
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            self.hits = self.stale_hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._data),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,436 @@
+# tools/gazetteer.py
+
+# ---------------------------------------------------------------------------
+# Compact local gazetteer of world cities, tourist destinations and
+# countries, with a token-index matcher for pulling destinations out of
+# free-text user messages.
+#
+# The data file (tools/data/gazetteer.tsv) has one line per name or alias,
+# sorted by normalized key:
+#
+#   key \t kind \t name \t country \t lat \t lon \t population \t flags
+#
+#   kind  — "city", "region" (islands, coasts, small resort towns) or "country"
+#   flags — "a" when the name is also a common English word ("nice",
+#           "reading", "mobile"); such names only match when capitalized
+#           mid-sentence, right after a travel cue ("to", "in", "visit", ...)
+#           or as the opening "Name." of a message (the trip widget's format)
+#
+# The file is memory-mapped and indexed once per process (key -> byte
+# offset); records are decoded from the map only when they match, so
+# gunicorn workers share the pages through the OS page cache.
+#
+# Rebuild the data file (needs the optional `geonamescache` and
+# `english-words` packages):
+#
+#   python -m tools.gazetteer build [--min-population 100000]
+# ---------------------------------------------------------------------------
+
+import argparse
+import mmap
+import os
+import re
+import threading
+import unicodedata
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "gazetteer.tsv")
+
+# Words that, right before an ambiguous name, mark it as a destination
+CUE_WORDS = {
+    "to", "in", "into", "visit", "visiting", "from", "near", "around", "at",
+    "explore", "exploring", "fly", "flying", "via", "towards", "trip", "through",
+}
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def _fold(token: str) -> str:
+    """Strip accents and case-fold one token: 'Zürich' -> 'zurich'."""
+    decomposed = unicodedata.normalize("NFKD", token)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+
+
+def normalize_name(text: str) -> str:
+    """
+    Normalized lookup key for a place name: unicode-folded, accent-free,
+    lowercase, punctuation dropped and whitespace collapsed.
+    'São Paulo' -> 'sao paulo', "Xi'an" -> 'xi an', ' NEW  york ' -> 'new york'.
+    """
+    text = unicodedata.normalize("NFKC", text or "")
+    return " ".join(_fold(t) for t in _TOKEN_RE.findall(text))
+
+
+class Gazetteer:
+    """Memory-mapped gazetteer with an exact-name index and a phrase matcher."""
+
+    def __init__(self, path: str = DATA_PATH):
+        self.path = path
+        self._offsets = {}      # normalized key -> byte offset of its line
+        self._first_token = {}  # first token of any key -> longest key length in tokens
+        self._records = {}      # byte offset -> decoded place dict (filled lazily)
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._index()
+
+    def _index(self):
+        data = self._map
+        offset = 0
+        end = len(data)
+        while offset < end:
+            newline = data.find(b"\n", offset)
+            if newline == -1:
+                newline = end
+            tab = data.find(b"\t", offset, newline)
+            if tab > offset:
+                key = data[offset:tab].decode("utf-8")
+                self._offsets[key] = offset
+                tokens = key.split(" ")
+                if len(tokens) > self._first_token.get(tokens[0], 0):
+                    self._first_token[tokens[0]] = len(tokens)
+            offset = newline + 1
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def _record(self, offset: int) -> dict:
+        record = self._records.get(offset)
+        if record is None:
+            newline = self._map.find(b"\n", offset)
+            line = self._map[offset:newline if newline != -1 else len(self._map)].decode("utf-8")
+            _, kind, name, country, lat, lon, population, flags = line.split("\t")
+            record = {
+                "name": name,
+                "kind": kind,
+                "country": country,
+                "lat": float(lat),
+                "lon": float(lon),
+                "population": int(population),
+                "ambiguous": "a" in flags,
+            }
+            self._records[offset] = record
+        return record
+
+    def lookup(self, name: str):
+        """Exact (normalized) lookup of a name or alias. Returns a place dict or None."""
+        offset = self._offsets.get(normalize_name(name))
+        return None if offset is None else dict(self._record(offset))
+
+    def find(self, text: str) -> list:
+        """
+        Find every gazetteer name in `text`, longest match first at each
+        position, scanning left to right. Returns place dicts extended with
+        "start" / "end" character offsets and the matched "text".
+        """
+        text = unicodedata.normalize("NFKC", text or "")
+        spans = [(m.start(), m.end()) for m in _TOKEN_RE.finditer(text)]
+        tokens = [_fold(text[s:e]) for s, e in spans]
+
+        matches = []
+        i = 0
+        while i < len(tokens):
+            longest = self._first_token.get(tokens[i], 0)
+            matched = False
+            for n in range(min(longest, len(tokens) - i), 0, -1):
+                offset = self._offsets.get(" ".join(tokens[i:i + n]))
+                if offset is None:
+                    continue
+                record = self._record(offset)
+                start, end = spans[i][0], spans[i + n - 1][1]
+                if record["ambiguous"] and not self._looks_like_place(text, spans, tokens, i, i + n):
+                    continue
+                matches.append({**record, "start": start, "end": end, "text": text[start:end]})
+                i += n
+                matched = True
+                break
+            if not matched:
+                i += 1
+        return matches
+
+    @staticmethod
+    def _looks_like_place(text, spans, tokens, i, j) -> bool:
+        """
+        An ambiguous name tokens[i:j] counts as a place right after a travel
+        cue, when capitalized mid-sentence (a capital at the start of a
+        sentence says nothing: "Reading list for Tokyo"), or when it opens
+        the message as a sentence of its own ("Nice. 2 people. 5 days", the
+        trip widget's format).
+        """
+        if i > 0 and tokens[i - 1] in CUE_WORDS:
+            return True
+        before = text[:spans[i][0]].rstrip()
+        if not before and text[spans[j - 1][1]:].startswith("."):
+            return True
+        if not text[spans[i][0]].isupper():
+            return False
+        return bool(before) and before[-1] not in ".!?\n"
+
+_gazetteer = None
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer() -> Gazetteer:
+    """The process-wide gazetteer, loaded on first use."""
+    global _gazetteer
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                _gazetteer = Gazetteer()
+    return _gazetteer
+
+
+def extract_destinations(text: str) -> list:
+    """
+    Cities and regions mentioned in `text`, in order of first appearance and
+    without duplicates. Countries are recognised (so "Japan" is never taken
+    for a city) but not returned.
+    """
+    destinations = []
+    seen = set()
+    for match in get_gazetteer().find(text):
+        if match["kind"] == "country":
+            continue
+        key = (match["name"], match["country"])
+        if key not in seen:
+            seen.add(key)
+            destinations.append(match)
+    return destinations
+
+
+def canonical_key(name: str) -> str:
+    """
+    Cache / table key for a place name: the normalized canonical name when
+    the gazetteer knows it ('NYC' and 'new york' -> 'new york city'),
+    otherwise the normalized input.
+    """
+    key = normalize_name(name)
+    try:
+        place = get_gazetteer().lookup(key)
+    except OSError:
+        return key
+    return normalize_name(place["name"]) if place else key
+
+
+# ---------------------------------------------------------------------------
+# Data file builder
+# ---------------------------------------------------------------------------
+
+# Destinations that matter for travel but fall under the population cut
+TOURIST_CITIES = [
+    "Venice", "Florence", "Siena", "Pisa", "Verona", "Lucca", "Assisi", "Siem Reap",
+    "Dubrovnik", "Salzburg", "Brugge", "Hoi An", "Luang Prabang", "Queenstown",
+    "Reykjavík", "Cannes", "Colmar", "Galway", "Sintra", "Cascais", "Luzern",
+    "Santa Fe", "Savannah", "Charleston", "Key West", "Tulum", "Playa del Carmen",
+    "Chiang Mai", "Krabi", "Kotor", "Hvar", "Ronda", "Toledo", "Nafplio",
+    "Rhodes", "Chania", "Heraklion", "Taormina", "Bled", "Český Krumlov",
+    "Hallstatt", "Innsbruck", "Kandy", "Galle", "Pokhara", "Zanzibar",
+    "Essaouira", "Chefchaouen", "Ushuaia", "Cartagena", "Antigua Guatemala",
+    "San Miguel de Allende", "Bariloche", "Aspen", "Sedona", "Napa",
+]
+
+# (name, country, lat, lon) for places the city list doesn't cover
+EXTRA_DESTINATIONS = [
+    ("Bali", "ID", -8.4095, 115.1889),
+    ("Ubud", "ID", -8.5069, 115.2625),
+    ("Santorini", "GR", 36.3932, 25.4615),
+    ("Oia", "GR", 36.4618, 25.3753),
+    ("Mykonos", "GR", 37.4467, 25.3289),
+    ("Amalfi", "IT", 40.6340, 14.6027),
+    ("Amalfi Coast", "IT", 40.6333, 14.6029),
+    ("Positano", "IT", 40.6281, 14.4850),
+    ("Sorrento", "IT", 40.6263, 14.3758),
+    ("Cinque Terre", "IT", 44.1461, 9.6439),
+    ("Lake Como", "IT", 46.0160, 9.2572),
+    ("Tuscany", "IT", 43.7711, 11.2486),
+    ("Capri", "IT", 40.5532, 14.2222),
+    ("Zermatt", "CH", 46.0207, 7.7491),
+    ("Interlaken", "CH", 46.6863, 7.8632),
+    ("Hakone", "JP", 35.2324, 139.1069),
+    ("Nikko", "JP", 36.7199, 139.6982),
+    ("Nara", "JP", 34.6851, 135.8048),
+    ("Banff", "CA", 51.1784, -115.5708),
+    ("Whistler", "CA", 50.1163, -122.9574),
+    ("Petra", "JO", 30.3285, 35.4444),
+    ("Cappadocia", "TR", 38.6431, 34.8289),
+    ("Machu Picchu", "PE", -13.1631, -72.5450),
+    ("Maui", "US", 20.7984, -156.3319),
+    ("Hawaii", "US", 19.8968, -155.5828),
+    ("Goa", "IN", 15.2993, 74.1240),
+    ("Phuket", "TH", 7.8804, 98.3923),
+    ("Koh Samui", "TH", 9.5120, 100.0136),
+    ("Maldives", "MV", 3.2028, 73.2207),
+    ("Bora Bora", "PF", -16.5004, -151.7415),
+    ("Yellowstone", "US", 44.4280, -110.5885),
+    ("Grand Canyon", "US", 36.1069, -112.1129),
+    ("Lake Tahoe", "US", 39.0968, -120.0324),
+    ("Scottish Highlands", "GB", 57.1200, -4.7100),
+    ("Cotswolds", "GB", 51.8330, -1.8433),
+    ("Provence", "FR", 43.9352, 6.0679),
+    ("French Riviera", "FR", 43.7102, 7.2620),
+    ("Algarve", "PT", 37.0179, -7.9304),
+    ("Ibiza", "ES", 38.9067, 1.4206),
+    ("Mallorca", "ES", 39.6953, 3.0176),
+    ("Tenerife", "ES", 28.2916, -16.6291),
+    ("Patagonia", "AR", -41.8102, -68.9063),
+    ("Galapagos", "EC", -0.9538, -90.9656),
+]
+
+# alias -> canonical name (must exist among cities / extras)
+ALIASES = {
+    "NYC": "New York City", "New York": "New York City", "Manhattan": "New York City",
+    "SF": "San Francisco", "San Fran": "San Francisco", "LA": "Los Angeles",
+    "Vegas": "Las Vegas", "DC": "Washington", "Washington DC": "Washington",
+    "Washington D.C.": "Washington", "Bombay": "Mumbai", "Calcutta": "Kolkata",
+    "Madras": "Chennai", "Bangalore": "Bengaluru", "Peking": "Beijing",
+    "Canton": "Guangzhou", "Saigon": "Ho Chi Minh City", "HCMC": "Ho Chi Minh City",
+    "Kiev": "Kyiv", "Roma": "Rome", "Firenze": "Florence", "Venezia": "Venice",
+    "Milano": "Milan", "Napoli": "Naples", "Torino": "Turin", "Genova": "Genoa",
+    "München": "Munich", "Cologne": "Köln", "Vienna": "Vienna", "Wien": "Vienna",
+    "Praha": "Prague", "Lisboa": "Lisbon", "Seville": "Sevilla", "Bruges": "Brugge",
+    "Ghent": "Gent", "Lucerne": "Luzern", "Malaga": "Málaga", "Krakow": "Kraków",
+    "Montreal": "Montréal", "Quebec City": "Québec", "Reykjavik": "Reykjavík",
+    "The Hague": "The Hague", "Den Haag": "The Hague", "Bruxelles": "Brussels",
+    "København": "Copenhagen", "Kobenhavn": "Copenhagen", "Athina": "Athens",
+    "Marrakech": "Marrakesh", "Cuzco": "Cusco", "CDMX": "Mexico City",
+    "Rio": "Rio de Janeiro", "Sao Paulo": "São Paulo", "KL": "Kuala Lumpur",
+    "Penang": "George Town", "Hong Kong SAR": "Hong Kong", "Ho Chi Minh": "Ho Chi Minh City",
+    "Okinawa": "Naha", "Santorini Island": "Santorini", "Capri Island": "Capri",
+    "Big Island": "Hawaii", "Oahu": "Honolulu", "Waikiki": "Honolulu",
+}
+
+COUNTRY_ALIASES = {
+    "USA": "United States", "America": "United States", "United States of America": "United States",
+    "UK": "United Kingdom", "Britain": "United Kingdom", "Great Britain": "United Kingdom",
+    "England": "United Kingdom", "Scotland": "United Kingdom", "Wales": "United Kingdom",
+    "Holland": "Netherlands", "UAE": "United Arab Emirates", "South Korea": "South Korea",
+    "Korea": "South Korea", "Czechia": "Czech Republic", "Vietnam": "Vietnam",
+    "Turkiye": "Turkey", "Türkiye": "Turkey",
+}
+
+# When several cities share a name, prefer this country over raw population
+PREFERRED_COUNTRY = {"valencia": "ES", "cordoba": "ES", "granada": "ES", "san jose": "US", "toledo": "ES"}
+
+# Common-word place names at or above this population are never flagged ambiguous
+AMBIGUOUS_MAX_POPULATION = 500_000
+
+
+def build(min_population: int = 100000, output: str = DATA_PATH) -> int:
+    """Regenerate the gazetteer data file from GeoNames (via geonamescache)."""
+    try:
+        import geonamescache
+        from english_words import get_english_words_set
+    except ImportError as e:
+        raise SystemExit(f"Building the gazetteer needs `pip install geonamescache english-words` ({e})")
+
+    geo = geonamescache.GeonamesCache()
+    # Common words are lowercase in both lists: gcide alone (case-folded) also
+    # has proper nouns ("amsterdam"), web2 alone has odd lowercase forms ("bali")
+    words = get_english_words_set(["gcide"], lower=True, alpha=True) \
+        & get_english_words_set(["web2"], lower=False, alpha=True)
+    tourist = {normalize_name(n) for n in TOURIST_CITIES}
+
+    # name key -> best record
+    places = {}
+
+    def _add(key, record):
+        if not key:
+            return
+        current = places.get(key)
+        if current is not None:
+            preferred = PREFERRED_COUNTRY.get(key)
+            if current["kind"] == "region" and record["kind"] != "region":
+                return
+            if preferred and current["country"] == preferred and record["country"] != preferred:
+                return
+            if not (preferred and record["country"] == preferred) and record["kind"] != "region" \
+                    and current["population"] >= record["population"]:
+                return
+        places[key] = record
+
+    for city in geo.get_cities().values():
+        key = normalize_name(city["name"])
+        if city["population"] < min_population and key not in tourist:
+            continue
+        record = {
+            "kind": "city",
+            "name": city["name"],
+            "country": city["countrycode"],
+            "lat": city["latitude"],
+            "lon": city["longitude"],
+            "population": city["population"],
+        }
+        _add(key, record)
+        # "Xi'an" / "Guri-si" are also typed without punctuation
+        squashed = normalize_name(re.sub(r"['’\-]", "", city["name"]))
+        if squashed != key:
+            _add(squashed, record)
+
+    for name, country, lat, lon in EXTRA_DESTINATIONS:
+        _add(normalize_name(name), {
+            "kind": "region", "name": name, "country": country,
+            "lat": lat, "lon": lon, "population": 0,
+        })
+
+    by_name = {normalize_name(r["name"]): r for r in places.values()}
+    for alias, canonical in ALIASES.items():
+        record = by_name.get(normalize_name(canonical))
+        if record is not None and normalize_name(alias) not in places:
+            places[normalize_name(alias)] = record
+
+    countries = {}
+    for country in geo.get_countries().values():
+        record = {
+            "kind": "country", "name": country["name"], "country": country["iso"],
+            "lat": 0.0, "lon": 0.0, "population": country["population"],
+        }
+        countries[normalize_name(country["name"])] = record
+    for alias, canonical in COUNTRY_ALIASES.items():
+        if normalize_name(canonical) in countries:
+            countries.setdefault(normalize_name(alias), countries[normalize_name(canonical)])
+    for key, record in countries.items():
+        # City-states ("Singapore", "Monaco") stay cities
+        places.setdefault(key, record)
+
+    lines = []
+    for key, r in places.items():
+        # Tourist towns and regions are named for travel, whatever their population
+        destination = r["kind"] == "region" or normalize_name(r["name"]) in tourist
+        ambiguous = (
+            r["kind"] != "country"
+            and (len(key) <= 2 or (key in words and not destination
+                                   and r["population"] < AMBIGUOUS_MAX_POPULATION))
+        )
+        lines.append("\t".join([
+            key, r["kind"], r["name"], r["country"],
+            f"{r['lat']:.4f}", f"{r['lon']:.4f}", str(r["population"]),
+            "a" if ambiguous else "",
+        ]))
+    lines.sort()
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8", newline="\n") as f:
+        f.write("\n".join(lines) + "\n")
+    return len(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m tools.gazetteer", description="WanderWise gazetteer tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build_cmd = sub.add_parser("build", help="regenerate the gazetteer data file")
+    build_cmd.add_argument("--min-population", type=int, default=100000)
+    build_cmd.add_argument("--output", default=DATA_PATH)
+
+    find_cmd = sub.add_parser("find", help="show destinations found in a message")
+    find_cmd.add_argument("text")
+
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        count = build(args.min_population, args.output)
+        print(f"Wrote {count} names to {args.output}")
+    elif args.command == "find":
+        for match in get_gazetteer().find(args.text):
+            print(f"{match['text']!r} -> {match['name']} ({match['kind']}, {match['country']})")
+
+
+if __name__ == "__main__":
+    main()
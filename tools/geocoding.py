@@ -0,0 +1,184 @@
+# tools/geocoding.py
+
+# ---------------------------------------------------------------------------
+# Shared, cached Google Geocoding for the hotel, activity and map tools.
+#
+# City coordinates barely change, so successful lookups are kept for a long
+# time; definitive "not found" answers (ZERO_RESULTS, INVALID_REQUEST) are
+# cached briefly so a bad query isn't retried on every turn. Transport
+# errors and quota/auth failures are never cached. Concurrent misses for the
+# same key share one API call (tools/singleflight.py), whether they come
+# from threads (geocode) or coroutines (geocode_async).
+# ---------------------------------------------------------------------------
+
+import os
+import re
+import unicodedata
+
+from dotenv import load_dotenv
+
+from tools import http_client
+from tools.cache import TTLCache
+from tools.gazetteer import canonical_key
+from tools.singleflight import SingleFlight
+
+load_dotenv()
+GOOGLE_PLACES_API_KEY = os.getenv("GOOGLE_PLACES_API_KEY")
+
+GEOCODING_URL = "https://maps.googleapis.com/maps/api/geocode/json"
+
+GEOCODE_CACHE_SIZE = int(os.getenv("GEOCODE_CACHE_SIZE", "4096"))
+GEOCODE_CACHE_TTL = float(os.getenv("GEOCODE_CACHE_TTL", str(7 * 24 * 3600)))
+GEOCODE_NEGATIVE_TTL = float(os.getenv("GEOCODE_NEGATIVE_TTL", "300"))
+
+# Geocoding statuses that mean "this query has no answer", safe to cache
+NEGATIVE_STATUSES = {"ZERO_RESULTS", "INVALID_REQUEST"}
+
+_cache = TTLCache(maxsize=GEOCODE_CACHE_SIZE, ttl=GEOCODE_CACHE_TTL)
+_flight = SingleFlight("geocoding")
+
+
+def normalize_query(text: str) -> str:
+    """
+    Canonical cache key for a free-text location query: unicode NFKC,
+    case-folded, with runs of whitespace collapsed and commas tidied.
+    'Tokyo', ' tokyo ' and 'ＴＯＫＹＯ' all map to 'tokyo'.
+    """
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    text = re.sub(r"\s*,\s*", ", ", text)
+    return re.sub(r"\s+", " ", text).strip(" ,")
+
+
+MISSING_KEY = {"status": "error", "api_status": "", "error_message": "Missing Google Places API key"}
+
+
+def geocode(address: str, cache_key: str = None) -> dict:
+    """
+    Geocode a free-text address with caching. `cache_key` overrides the
+    normalized address as the cache key (e.g. a gazetteer canonical name,
+    so 'NYC' and 'New York' share one entry).
+
+    Returns:
+        {"status": "success", "lat": float, "lon": float, "formatted_address": str,
+         "types": [str], "partial_match": bool}
+        or {"status": "error", "api_status": str, "error_message": str}
+    """
+    if not GOOGLE_PLACES_API_KEY:
+        return dict(MISSING_KEY)
+
+    key = cache_key or normalize_query(address)
+    cached = _cache.get(key)
+    if cached is not None:
+        return dict(cached)
+
+    return dict(_flight.do(key, _lookup, address, key))
+
+
+async def geocode_async(address: str, cache_key: str = None) -> dict:
+    """geocode() for coroutines: same cache and in-flight calls, non-blocking HTTP."""
+    if not GOOGLE_PLACES_API_KEY:
+        return dict(MISSING_KEY)
+
+    key = cache_key or normalize_query(address)
+    cached = _cache.get(key)
+    if cached is not None:
+        return dict(cached)
+
+    return dict(await _flight.do_async(key, _lookup_async, address, key))
+
+
+def _lookup(address: str, key: str) -> dict:
+    try:
+        resp = http_client.get(GEOCODING_URL, params={"address": address, "key": GOOGLE_PLACES_API_KEY})
+        resp.raise_for_status()
+        data = resp.json()
+    except Exception as e:
+        return {"status": "error", "api_status": "", "error_message": str(e)}
+    return _result(data, key)
+
+
+async def _lookup_async(address: str, key: str) -> dict:
+    try:
+        resp = await http_client.async_get(GEOCODING_URL, params={"address": address, "key": GOOGLE_PLACES_API_KEY})
+        resp.raise_for_status()
+        data = resp.json()
+    except Exception as e:
+        return {"status": "error", "api_status": "", "error_message": str(e)}
+    return _result(data, key)
+
+
+def _result(data: dict, key: str) -> dict:
+    """Turn a Geocoding API response into a result, caching it if it is definitive."""
+    api_status = data.get("status", "")
+    if api_status != "OK" or not data.get("results"):
+        result = {
+            "status": "error",
+            "api_status": api_status,
+            "error_message": api_status or "No results",
+        }
+        if api_status in NEGATIVE_STATUSES or (api_status == "OK" and not data.get("results")):
+            _cache.set(key, dict(result), ttl=GEOCODE_NEGATIVE_TTL)
+        return result
+
+    top = data["results"][0]
+    location = top["geometry"]["location"]
+    result = {
+        "status": "success",
+        "lat": location["lat"],
+        "lon": location["lng"],
+        "formatted_address": top.get("formatted_address", ""),
+        # Google falls back to the closest area it knows ("<fragment>, Tokyo" -> Tokyo)
+        "types": list(top.get("types", [])),
+        "partial_match": bool(top.get("partial_match")),
+    }
+    _cache.set(key, dict(result))
+    return result
+
+
+def geocode_city(city: str) -> dict:
+    """
+    Use Google Geocoding API to convert a city name to lat/lon.
+    Returns: {"status": "success", "lat": ..., "lon": ...}
+          or {"status": "error", "error_message": ...}
+    """
+    if not GOOGLE_PLACES_API_KEY:
+        return {"status": "error", "error_message": "Missing Google Places API key"}
+    return _city_result(city, geocode(city, cache_key=city_cache_key(city)))
+
+
+async def geocode_city_async(city: str) -> dict:
+    """geocode_city() for coroutines."""
+    if not GOOGLE_PLACES_API_KEY:
+        return {"status": "error", "error_message": "Missing Google Places API key"}
+    return _city_result(city, await geocode_async(city, cache_key=city_cache_key(city)))
+
+
+def city_cache_key(city: str) -> str:
+    return "city:" + canonical_key(city)
+
+
+def _city_result(city: str, geo: dict) -> dict:
+    if geo["status"] != "success":
+        if not geo["api_status"]:
+            return {"status": "error", "error_message": geo["error_message"]}
+        return {
+            "status": "error",
+            "error_message": f"Could not geocode city: {city} — {geo['api_status']}",
+        }
+
+    return {"status": "success", "lat": geo["lat"], "lon": geo["lon"]}
+
+
+def cache_stats() -> dict:
+    """Hit / miss / size counters for the geocoding cache."""
+    return _cache.stats()
+
+
+def flight_stats() -> dict:
+    """API calls made vs callers that shared an identical in-flight call."""
+    return _flight.stats()
+
+
+def clear_cache():
+    _cache.clear()
+    _flight.reset()
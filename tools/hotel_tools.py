@@ -1,46 +1,18 @@
 # tools/hotel_tools.py
 
+import asyncio
 import os
-import requests
 from dotenv import load_dotenv
 
+from tools import poi_snapshot
+from tools.geocoding import geocode_city, geocode_city_async
+from tools.places import search_nearby, search_nearby_async
+
 load_dotenv()
 GOOGLE_PLACES_API_KEY = os.getenv("GOOGLE_PLACES_API_KEY")
 
-GEOCODING_URL = "https://maps.googleapis.com/maps/api/geocode/json"
-PLACES_URL = "https://places.googleapis.com/v1/places:searchNearby"
-
-
-def geocode_city(city: str) -> dict:
-    """
-    Use Google Geocoding API to convert a city name to lat/lon.
-    Returns: {"status": "success", "lat": ..., "lon": ...}
-          or {"status": "error", "error_message": ...}
-    """
-    if not GOOGLE_PLACES_API_KEY:
-        return {"status": "error", "error_message": "Missing Google Places API key"}
-
-    params = {"address": city, "key": GOOGLE_PLACES_API_KEY}
-
-    try:
-        resp = requests.get(GEOCODING_URL, params=params, timeout=10)
-        resp.raise_for_status()
-        data = resp.json()
-
-        if data.get("status") != "OK" or not data.get("results"):
-            return {
-                "status": "error",
-                "error_message": f"Could not geocode city: {city} — {data.get('status')}",
-            }
-
-        location = data["results"][0]["geometry"]["location"]
-        return {
-            "status": "success",
-            "lat": location["lat"],
-            "lon": location["lng"],
-        }
-    except Exception as e:
-        return {"status": "error", "error_message": str(e)}
+HOTEL_TYPES = ["hotel", "lodging", "motel", "bed_and_breakfast", "resort_hotel"]
+HOTEL_FIELD_MASK = "places.displayName,places.location,places.types,places.rating,places.userRatingCount,places.formattedAddress,places.googleMapsUri,places.priceLevel"
 
 
 def search_hotels(
@@ -63,86 +35,116 @@ def search_hotels(
     Each hotel dict contains:
         name, lat, lon, rating, user_rating_count, address, google_maps_url
     """
-    if not GOOGLE_PLACES_API_KEY:
-        return {"status": "error", "error_message": "Missing Google Places API key"}
+    # Step 0 — a fresh local snapshot answers without any API call
+    answer = _local_answer(city, radius_m, limit)
+    if answer is not None:
+        return answer
 
     # Step 1 — geocode city
     geo = geocode_city(city)
     if geo.get("status") != "success":
-        return {
-            "status": "error",
-            "error_message": "Failed to geocode city: " + geo.get("error_message", ""),
-        }
-
-    lat = geo["lat"]
-    lon = geo["lon"]
+        return _geocode_error(geo)
 
     # Step 2 — call Google Places (New) Nearby Search for hotels
-    headers = {
-        "Content-Type": "application/json",
-        "X-Goog-Api-Key": GOOGLE_PLACES_API_KEY,
-        "X-Goog-FieldMask": "places.displayName,places.location,places.types,places.rating,places.userRatingCount,places.formattedAddress,places.googleMapsUri,places.priceLevel",
-    }
+    try:
+        places = search_nearby(geo["lat"], geo["lon"], **_nearby_query(radius_m, limit))
+        return _hotel_results(city, places, geo["lat"], geo["lon"])
+    except Exception as e:
+        return {"status": "error", "error_message": str(e)}
 
-    body = {
-        "includedTypes": ["hotel", "lodging", "motel", "bed_and_breakfast", "resort_hotel"],
-        "maxResultCount": min(limit, 20),
-        "locationRestriction": {
-            "circle": {
-                "center": {"latitude": lat, "longitude": lon},
-                "radius": float(radius_m),
-            }
-        },
-        "rankPreference": "POPULARITY",
-    }
+
+async def search_hotels_async(
+    city: str,
+    radius_m: int = 10000,
+    limit: int = 10,
+) -> dict:
+    # search_hotels for the agents: the same steps, awaiting the API calls.
+    # The snapshot check (a stat, and on a hit an mmap read and numpy query)
+    # runs in a worker thread so a cold page cache can't stall the agent loop.
+    answer = await asyncio.to_thread(_local_answer, city, radius_m, limit)
+    if answer is not None:
+        return answer
+
+    geo = await geocode_city_async(city)
+    if geo.get("status") != "success":
+        return _geocode_error(geo)
 
     try:
-        resp = requests.post(PLACES_URL, headers=headers, json=body, timeout=10)
-        resp.raise_for_status()
-        data = resp.json()
-
-        places = data.get("places", [])
-
-        if not places:
-            return {
-                "status": "error",
-                "error_message": f"No hotels found for {city}. Try increasing radius_m.",
-            }
-
-        # Map Google price levels to human-readable labels
-        price_map = {
-            "PRICE_LEVEL_FREE": "Free",
-            "PRICE_LEVEL_INEXPENSIVE": "Budget ($)",
-            "PRICE_LEVEL_MODERATE": "Mid-range ($$)",
-            "PRICE_LEVEL_EXPENSIVE": "Upscale ($$$)",
-            "PRICE_LEVEL_VERY_EXPENSIVE": "Luxury ($$$$)",
-        }
+        places = await search_nearby_async(geo["lat"], geo["lon"], **_nearby_query(radius_m, limit))
+        return _hotel_results(city, places, geo["lat"], geo["lon"])
+    except Exception as e:
+        return {"status": "error", "error_message": str(e)}
+
+
+# ADK takes the tool description from the docstring
+search_hotels_async.__doc__ = search_hotels.__doc__
+
+
+def _local_answer(city: str, radius_m: int, limit: int):
+    """The result when no API call is needed (snapshot hit, or no API key), else None."""
+    snapshot = poi_snapshot.search(city, HOTEL_TYPES, float(radius_m), min(limit, 20))
+    if snapshot is not None:
+        return _hotel_results(city, snapshot["places"], snapshot["lat"], snapshot["lon"])
+    if not GOOGLE_PLACES_API_KEY:
+        return {"status": "error", "error_message": "Missing Google Places API key"}
+    return None
 
-        hotels = []
-        for place in places:
-            name = place.get("displayName", {}).get("text", "").strip()
-            if not name:
-                continue
-
-            location = place.get("location", {})
-            price_level = place.get("priceLevel", "")
-
-            hotels.append({
-                "name": name,
-                "lat": location.get("latitude"),
-                "lon": location.get("longitude"),
-                "rating": place.get("rating"),
-                "user_rating_count": place.get("userRatingCount"),
-                "address": place.get("formattedAddress", "Address unavailable"),
-                "price_level": price_map.get(price_level, "Price unavailable"),
-                "google_maps_url": place.get("googleMapsUri", ""),
-            })
 
+def _geocode_error(geo: dict) -> dict:
+    return {
+        "status": "error",
+        "error_message": "Failed to geocode city: " + geo.get("error_message", ""),
+    }
+
+
+def _nearby_query(radius_m: int, limit: int) -> dict:
+    return {
+        "included_types": HOTEL_TYPES,
+        "radius_m": float(radius_m),
+        "max_results": min(limit, 20),
+        "field_mask": HOTEL_FIELD_MASK,
+    }
+
+
+def _hotel_results(city: str, places: list, lat: float, lon: float) -> dict:
+    """Nearby Search places (live or snapshot) as the search_hotels result."""
+    if not places:
         return {
-            "status": "success",
-            "hotels": hotels,
-            "city_coords": {"lat": lat, "lon": lon},
+            "status": "error",
+            "error_message": f"No hotels found for {city}. Try increasing radius_m.",
         }
 
-    except Exception as e:
-        return {"status": "error", "error_message": str(e)}
\ No newline at end of file
+    # Map Google price levels to human-readable labels
+    price_map = {
+        "PRICE_LEVEL_FREE": "Free",
+        "PRICE_LEVEL_INEXPENSIVE": "Budget ($)",
+        "PRICE_LEVEL_MODERATE": "Mid-range ($$)",
+        "PRICE_LEVEL_EXPENSIVE": "Upscale ($$$)",
+        "PRICE_LEVEL_VERY_EXPENSIVE": "Luxury ($$$$)",
+    }
+
+    hotels = []
+    for place in places:
+        name = place.get("displayName", {}).get("text", "").strip()
+        if not name:
+            continue
+
+        location = place.get("location", {})
+        price_level = place.get("priceLevel", "")
+
+        hotels.append({
+            "name": name,
+            "lat": location.get("latitude"),
+            "lon": location.get("longitude"),
+            "rating": place.get("rating"),
+            "user_rating_count": place.get("userRatingCount"),
+            "address": place.get("formattedAddress", "Address unavailable"),
+            "price_level": price_map.get(price_level, "Price unavailable"),
+            "google_maps_url": place.get("googleMapsUri", ""),
+        })
+
+    return {
+        "status": "success",
+        "hotels": hotels,
+        "city_coords": {"lat": lat, "lon": lon},
+    }
@@ -0,0 +1,165 @@
+# tools/http_client.py
+
+# ---------------------------------------------------------------------------
+# Shared, pooled HTTP client for every outbound Google Maps / Places call.
+#
+# The bare requests.get / requests.post helpers open a fresh TCP + TLS
+# connection per call. One module-level Session keeps connections to
+# maps.googleapis.com and places.googleapis.com alive across tool calls,
+# threads and requests. urllib3's connection pool is thread-safe, so the
+# session is shared by all threads in the worker.
+#
+# Coroutines (the async tools the agents call on the agent loop) use
+# async_get / async_post instead: an httpx.AsyncClient per event loop with
+# the same pool limits and timeouts, so a tool waiting on Google never
+# blocks the loop. Both record the same latency histograms and spans.
+# ---------------------------------------------------------------------------
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from tools import tracing
+from tools.metrics import LATENCY_BUCKETS, LatencyHistogram  # noqa: F401  (re-exported)
+
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "8"))   # distinct hosts kept pooled
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "32"))          # keep-alive connections per host
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+
+
+def _new_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        pool_block=False,
+        max_retries=0,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    return session
+
+
+session = _new_session()
+
+_async_clients = weakref.WeakKeyDictionary()  # event loop -> httpx.AsyncClient
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+
+def _endpoint(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.netloc}{parts.path}"
+
+
+def _histogram(endpoint: str) -> LatencyHistogram:
+    hist = _histograms.get(endpoint)
+    if hist is None:
+        with _histograms_lock:
+            hist = _histograms.setdefault(endpoint, LatencyHistogram())
+    return hist
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    """
+    Send a request on the shared pooled session. Applies the default
+    (connect, read) timeout unless one is passed, and records latency
+    per endpoint (host + path, query string excluded). Inside a traced
+    request the call is also recorded as an "http" span.
+    """
+    kwargs.setdefault("timeout", (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT))
+    endpoint = _endpoint(url)
+    start = time.perf_counter()
+    with tracing.span("http", endpoint, method=method) as span:
+        try:
+            response = session.request(method, url, **kwargs)
+            if span is not None:
+                span.attrs["status"] = response.status_code
+            return response
+        finally:
+            _histogram(endpoint).observe(time.perf_counter() - start)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def _new_async_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=HTTP_POOL_CONNECTIONS * HTTP_POOL_MAXSIZE,
+                            max_keepalive_connections=HTTP_POOL_MAXSIZE),
+        timeout=httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        headers={"Connection": "keep-alive"},
+    )
+
+
+def async_client() -> httpx.AsyncClient:
+    """The running event loop's pooled AsyncClient (created on first use)."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = _async_clients[loop] = _new_async_client()
+    return client
+
+
+async def async_request(method: str, url: str, **kwargs) -> httpx.Response:
+    """
+    request() for coroutines: sends on the running loop's pooled
+    httpx.AsyncClient, with the same timeouts, latency histograms and
+    "http" spans.
+    """
+    endpoint = _endpoint(url)
+    start = time.perf_counter()
+    with tracing.span("http", endpoint, method=method) as span:
+        try:
+            response = await async_client().request(method, url, **kwargs)
+            if span is not None:
+                span.attrs["status"] = response.status_code
+            return response
+        finally:
+            _histogram(endpoint).observe(time.perf_counter() - start)
+
+
+async def async_get(url: str, **kwargs) -> httpx.Response:
+    return await async_request("GET", url, **kwargs)
+
+
+async def async_post(url: str, **kwargs) -> httpx.Response:
+    return await async_request("POST", url, **kwargs)
+
+
+async def aclose():
+    """Close the running loop's AsyncClient (before the loop shuts down)."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def latency_stats() -> dict:
+    """Per-endpoint latency histograms: {endpoint: {count, sum, mean, buckets}}."""
+    with _histograms_lock:
+        items = list(_histograms.items())
+    return {endpoint: hist.snapshot() for endpoint, hist in items}
+
+
+def reset():
+    """Drop pooled connections and latency data (tests / benchmarks)."""
+    global session
+    session.close()
+    session = _new_session()
+    with _histograms_lock:
+        _histograms.clear()
@@ -0,0 +1,125 @@
+# tools/itinerary_places.py
+
+# ---------------------------------------------------------------------------
+# Place names from a finished itinerary, without a model call.
+#
+# The root agent writes itineraries in a loose but regular shape: a hotel
+# section, then "Day N" headers with one activity per line, then budget
+# notes. extract_itinerary_places() walks the lines once, tracks which
+# section it is in, and takes the place name from each item line:
+#   - **bold** spans, if the line has any ("Morning: visit **Senso-ji**");
+#   - otherwise the text left after dropping a time-of-day label and a
+#     leading verb, cut at the first separator
+#     ("Afternoon: Explore Tokyo National Museum (Ueno) — 2 hrs").
+# Only short, mostly capitalized fragments are kept, so prose lines
+# ("Take it easy today.") mostly fall out, and anything that still slips
+# through simply fails to geocode.
+# ---------------------------------------------------------------------------
+
+import re
+
+# Longest fragment still treated as a place name
+MAX_NAME_WORDS = 8
+
+_DAY_RE = re.compile(r"^day\s+(\d+)\b", re.IGNORECASE)
+_BOLD_RE = re.compile(r"\*\*(.+?)\*\*|__(.+?)__")
+_MARKUP_RE = re.compile(r"^(?:#{1,6}\s*|[-*•·]\s+|\d+[.)]\s+)+")
+_TIME_LABEL_RE = re.compile(
+    r"^(?:(?:early |late )?(?:morning|afternoon|evening|night|noon|midday|breakfast|brunch|lunch|dinner)"
+    r"|\d{1,2}(?::\d{2})?\s*(?:am|pm)?(?:\s*[-–]\s*\d{1,2}(?::\d{2})?\s*(?:am|pm)?)?)\s*[:–—-]\s*",
+    re.IGNORECASE,
+)
+_VERB_RE = re.compile(
+    r"^(?:(?:visit|explore|tour|see|discover|stroll (?:through|around|along)|walk (?:through|around|along)|"
+    r"wander (?:through|around)|relax (?:at|in)|head to|go to|check in (?:at|to)|stay at|"
+    r"(?:have )?(?:breakfast|brunch|lunch|dinner|drinks|coffee) at|enjoy|experience|shop at)\s+)+(?:the\s+)?",
+    re.IGNORECASE,
+)
+_CUT_RE = re.compile(r"\s+[–—-]\s+|[:(;,|]|\.\s|\s+\$|\.$")
+
+# Section headers that end the place-bearing part of the itinerary
+_OTHER_SECTIONS = ("budget", "cost", "total", "disclaimer", "tip", "note", "summary", "packing", "transport")
+_HOTEL_SECTIONS = ("hotel", "accommodation", "where to stay", "lodging")
+
+
+def _is_header(line: str, raw: str) -> bool:
+    if raw.lstrip().startswith("#"):
+        return True
+    stripped = raw.strip()
+    if _BOLD_RE.fullmatch(stripped.rstrip(":")) or _BOLD_RE.fullmatch(stripped):
+        return True
+    return line.endswith(":") and len(line) < 70 and not _MARKUP_RE.match(raw.strip())
+
+
+def _clean_name(text: str) -> str:
+    text = _TIME_LABEL_RE.sub("", text.strip())
+    text = _VERB_RE.sub("", text)
+    text = _CUT_RE.split(text, maxsplit=1)[0]
+    return text.strip(" .*_\"'“”")
+
+
+def _looks_like_name(name: str) -> bool:
+    words = name.split()
+    if not 0 < len(words) <= MAX_NAME_WORDS or len(name) < 3:
+        return False
+    if _DAY_RE.match(name) or _TIME_LABEL_RE.match(name + ":"):
+        return False
+    # Proper nouns: most significant words carry a capital ("teamLab Planets",
+    # "Museo del Prado"); prose ("Take it easy tonight") doesn't
+    significant = [w for w in words if len(w) > 3] or words
+    return sum(any(c.isupper() for c in w) for w in significant) * 2 >= len(significant)
+
+
+def _names_in(raw: str) -> list:
+    """Place names on one item line."""
+    bold = [(a or b).strip() for a, b in _BOLD_RE.findall(raw)]
+    bold = [_clean_name(b) for b in bold if not b.rstrip().endswith(":")]
+    if bold:
+        return [b for b in bold if _looks_like_name(b)]
+    name = _clean_name(_MARKUP_RE.sub("", raw.strip()))
+    return [name] if _looks_like_name(name) else []
+
+
+def extract_itinerary_places(text: str) -> dict:
+    """
+    Hotel and activity names mentioned in an itinerary, in order of first
+    appearance and without duplicates:
+        {"hotels": [str, ...], "activities": [{"name": str, "day": int}, ...]}
+    An activity is listed once, with the first day it appears on.
+    """
+    hotels, activities = [], []
+    seen = set()
+    section, day = None, None
+
+    for raw in (text or "").splitlines():
+        line = _MARKUP_RE.sub("", raw.strip().replace("**", "").replace("__", "")).strip()
+        if not line:
+            continue
+
+        day_match = _DAY_RE.match(line)
+        if day_match:
+            section, day = "day", int(day_match.group(1))
+            # The title after "Day N:" is a theme ("Historic Tokyo"), not a place
+            continue
+
+        if _is_header(line, raw):
+            lowered = line.lower()
+            if any(word in lowered for word in _HOTEL_SECTIONS):
+                section = "hotels"
+            elif any(word in lowered for word in _OTHER_SECTIONS):
+                section = None
+            continue
+
+        if section is None:
+            continue
+        for name in _names_in(raw):
+            key = name.casefold()
+            if key in seen:
+                continue
+            seen.add(key)
+            if section == "hotels":
+                hotels.append(name)
+            else:
+                activities.append({"name": name, "day": day})
+
+    return {"hotels": hotels, "activities": activities}
@@ -0,0 +1,201 @@
+# tools/log.py
+
+# ---------------------------------------------------------------------------
+# Structured, leveled logging for the server, services and tools.
+#
+# Handlers only put records on a bounded in-memory queue. Formatting and the
+# write to stdout happen on a listener thread, so a request thread never
+# blocks on I/O; if the queue is full, records are dropped and counted
+# rather than stalling the request. Each record carries the request ID of
+# the request that produced it: a ContextVar that follows the request onto
+# the agent loop and the fallback pool, like the trace does. Verbose debug
+# dumps are sampled per request, so one sampled request logs all of its
+# dumps and the others log none.
+#
+#   LOG_LEVEL       = DEBUG | INFO (default) | WARNING | ERROR
+#   LOG_FORMAT      = json (default) | text
+#   LOG_SAMPLE_RATE = fraction of requests whose verbose dumps are logged (default 0.01)
+#   LOG_QUEUE_SIZE  = records buffered before dropping (default 10000)
+# ---------------------------------------------------------------------------
+
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import uuid
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.01"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+ROOT = "wanderwise"
+
+_request_id = contextvars.ContextVar("wanderwise_request_id", default=None)
+_sampled = contextvars.ContextVar("wanderwise_log_sampled", default=None)
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "request_id"}
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger under the "wanderwise" hierarchy (e.g. get_logger(__name__))."""
+    return logging.getLogger(f"{ROOT}.{name}")
+
+
+# ── Request context ──
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def start_request(request_id: str = None, sample_rate: float = None) -> str:
+    """Tag the current context with a request ID and decide whether it is sampled."""
+    request_id = request_id or new_request_id()
+    rate = LOG_SAMPLE_RATE if sample_rate is None else sample_rate
+    _request_id.set(request_id)
+    _sampled.set(random.random() < rate)
+    return request_id
+
+
+def end_request():
+    _request_id.set(None)
+    _sampled.set(None)
+
+
+def request_id():
+    return _request_id.get()
+
+
+def sampled(logger: logging.Logger) -> bool:
+    """
+    Whether to emit a verbose debug dump: DEBUG must be enabled and the
+    current request sampled (outside a request, each call is sampled).
+    Check this before building the dump so unsampled requests pay nothing.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return False
+    decision = _sampled.get()
+    return random.random() < LOG_SAMPLE_RATE if decision is None else decision
+
+
+# ── Formatting ──
+
+class _RequestIdFilter(logging.Filter):
+    """Stamp records with the request ID in the emitting thread's context."""
+
+    def filter(self, record):
+        record.request_id = _request_id.get()
+        return True
+
+
+def _fields(record) -> dict:
+    return {k: v for k, v in vars(record).items() if k not in _RECORD_ATTRS}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, request_id, message, extra fields."""
+
+    def format(self, record) -> str:
+        entry = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", None),
+            "message": record.getMessage(),
+            **_fields(record),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """`[LEVEL] logger [request id] message key=value ...` for local development."""
+
+    def format(self, record) -> str:
+        fields = " ".join(f"{k}={v!r}" for k, v in _fields(record).items())
+        line = f"[{record.levelname}] {record.name} [{getattr(record, 'request_id', None) or '-'}] {record.getMessage()}"
+        line = f"{line} {fields}" if fields else line
+        if record.exc_info:
+            line = f"{line}\n{self.formatException(record.exc_info)}"
+        return line
+
+
+# ── Queued output ──
+
+class QueuedHandler(logging.handlers.QueueHandler):
+    """
+    Enqueue records for a QueueListener writing to `target`. Drops (and
+    counts) records when the queue is full, and restarts the listener
+    thread in a forked child (e.g. gunicorn --preload).
+    """
+
+    def __init__(self, target: logging.Handler, maxsize: int = LOG_QUEUE_SIZE):
+        super().__init__(queue.Queue(maxsize=maxsize))
+        self.target = target
+        self.dropped = 0
+        self._listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_listener(self):
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid != os.getpid():
+                self.queue = queue.Queue(maxsize=self.queue.maxsize)
+                self._listener = logging.handlers.QueueListener(self.queue, self.target)
+                self._listener.start()
+                self._pid = os.getpid()
+
+    def enqueue(self, record):
+        self._ensure_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record):
+        # Keep extra fields and exc_info intact for the formatter (the base
+        # class pre-formats the message and strips them)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        return record
+
+    def flush(self):
+        """Wait until every queued record has been written (tests / shutdown)."""
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()
+            self._pid = None
+
+    def close(self):
+        self.flush()
+        super().close()
+
+
+def configure(level: str = None, fmt: str = None, stream=None) -> QueuedHandler:
+    """
+    Route the "wanderwise" loggers through one queued handler. Idempotent:
+    calling it again replaces the handler (e.g. to change level in tests).
+    """
+    target = logging.StreamHandler(stream or sys.stdout)
+    target.setFormatter(TextFormatter() if (fmt or LOG_FORMAT) == "text" else JsonFormatter())
+
+    handler = QueuedHandler(target)
+    handler.addFilter(_RequestIdFilter())
+
+    logger = logging.getLogger(ROOT)
+    for old in list(logger.handlers):
+        logger.removeHandler(old)
+        old.close()
+    logger.addHandler(handler)
+    logger.setLevel(level or LOG_LEVEL)
+    logger.propagate = False
+    return handler
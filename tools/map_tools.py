@@ -1,13 +1,51 @@
 # tools/map_tools.py
 
+# ---------------------------------------------------------------------------
+# Geocoding for the places an itinerary names (map pins).
+#
+# geocode_place resolves one name; geocode_places resolves a whole list at
+# once: names are de-duplicated, looked up concurrently on a small shared
+# pool (GEOCODE_BATCH_CONCURRENCY threads, so a long itinerary can't flood
+# the Geocoding API) and the batch returns whatever has resolved when
+# GEOCODE_BATCH_DEADLINE runs out. Both go through tools/geocoding, so they
+# share one cache: a place geocoded once is free for every later batch.
+# geocode_place_async / geocode_places_async do the same as coroutines for
+# the agent runner (a batch runs as tasks, at most GEOCODE_BATCH_CONCURRENCY
+# of them in flight). A lookup that Google only matched partially, or to a
+# city / area rather than a place, counts as failed, so a stray fragment
+# never becomes a pin at the city centre.
+#
+#   GEOCODE_BATCH_CONCURRENCY = lookups in flight at once, all batches (default 8)
+#   GEOCODE_BATCH_DEADLINE    = seconds one batch may take overall (default 5)
+#   GEOCODE_BATCH_MAX_PLACES  = names per batch; the rest are skipped (default 60)
+# ---------------------------------------------------------------------------
+
+import asyncio
 import os
-import requests
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
 from dotenv import load_dotenv
 
+from tools import log, tracing
+from tools.geocoding import geocode, geocode_async, normalize_query
+
 load_dotenv()
 GOOGLE_PLACES_API_KEY = os.getenv("GOOGLE_PLACES_API_KEY")
 
-GEOCODING_URL = "https://maps.googleapis.com/maps/api/geocode/json"
+GEOCODE_BATCH_CONCURRENCY = int(os.getenv("GEOCODE_BATCH_CONCURRENCY", "8"))
+GEOCODE_BATCH_DEADLINE = float(os.getenv("GEOCODE_BATCH_DEADLINE", "5"))
+GEOCODE_BATCH_MAX_PLACES = int(os.getenv("GEOCODE_BATCH_MAX_PLACES", "60"))
+
+# Result types that mean Google matched the city or an area, not the place itself
+AREA_TYPES = {
+    "locality", "political", "country", "postal_code", "colloquial_area",
+    "administrative_area_level_1", "administrative_area_level_2", "administrative_area_level_3",
+}
+
+logger = log.get_logger("tools.map_tools")
+
+_pool = ThreadPoolExecutor(max_workers=GEOCODE_BATCH_CONCURRENCY, thread_name_prefix="geocode")
 
 
 def geocode_place(place_name: str, city: str) -> dict:
@@ -33,33 +71,145 @@ def geocode_place(place_name: str, city: str) -> dict:
 
     # Include city in query for better accuracy
     query = f"{place_name}, {city}"
+    return _place_result(place_name, query, geocode(query))
 
-    params = {
-        "address": query,
-        "key": GOOGLE_PLACES_API_KEY,
-    }
 
-    try:
-        resp = requests.get(GEOCODING_URL, params=params, timeout=10)
-        resp.raise_for_status()
-        data = resp.json()
+async def geocode_place_async(place_name: str, city: str) -> dict:
+    """geocode_place() for coroutines."""
+    if not GOOGLE_PLACES_API_KEY:
+        return {"status": "error", "error_message": "Missing Google Places API key"}
 
-        if data.get("status") != "OK" or not data.get("results"):
-            return {
-                "status": "error",
-                "error_message": f"Could not geocode: {query} — {data.get('status')}",
-            }
+    query = f"{place_name}, {city}"
+    return _place_result(place_name, query, await geocode_async(query))
 
-        result = data["results"][0]
-        location = result["geometry"]["location"]
 
+def _place_result(place_name: str, query: str, geo: dict) -> dict:
+    if geo["status"] != "success":
+        if not geo["api_status"]:
+            return {"status": "error", "error_message": geo["error_message"]}
         return {
+            "status": "error",
+            "error_message": f"Could not geocode: {query} — {geo['api_status']}",
+        }
+    # A name that isn't a real place still comes back, as the city it was asked in
+    if geo.get("partial_match") or AREA_TYPES.intersection(geo.get("types", ())):
+        return {"status": "error", "error_message": f"Could not geocode: {query} — matched only an area"}
+
+    return {
+        "status": "success",
+        "name": place_name,
+        "lat": geo["lat"],
+        "lon": geo["lon"],
+        "formatted_address": geo["formatted_address"],
+    }
+
+
+def geocode_places(names: list[str], city: str, deadline: float = None) -> dict:
+    """
+    Geocode many place names within one city in a single call.
+
+    Args:
+        names:    Place names e.g. ["Senso-ji Temple", "Imperial Hotel Tokyo"]
+        city:     The city context e.g. "Tokyo"
+        deadline: Seconds to wait overall (GEOCODE_BATCH_DEADLINE by default)
+
+    Returns:
+        {
             "status": "success",
-            "name": place_name,
-            "lat": location["lat"],
-            "lon": location["lng"],
-            "formatted_address": result.get("formatted_address", ""),
+            "city": str,
+            "places": [{"name", "lat", "lon", "formatted_address"}, ...],  # input order
+            "failed": [str, ...],     # no result for these names
+            "timed_out": [str, ...],  # still pending at the deadline
         }
+        or {"status": "error", "error_message": str}
+    """
+    if not GOOGLE_PLACES_API_KEY:
+        return {"status": "error", "error_message": "Missing Google Places API key"}
+
+    deadline = GEOCODE_BATCH_DEADLINE if deadline is None else deadline
+    batch = _batch(names, city)
+
+    with tracing.span("step", "geocode_places", places=len(batch)):
+        start = time.monotonic()
+        futures = {_pool.submit(tracing.bind(geocode_place), name, city): name for name in batch}
+        done, not_done = wait(futures, timeout=deadline)
+        for future in not_done:
+            future.cancel()
+        results = _collect(futures, done)
+
+    return _batch_result(city, batch, results, deadline, start)
+
+
+async def geocode_places_async(names: list[str], city: str, deadline: float = None) -> dict:
+    # geocode_places for the agents: the batch runs as tasks on the loop
+    if not GOOGLE_PLACES_API_KEY:
+        return {"status": "error", "error_message": "Missing Google Places API key"}
+
+    deadline = GEOCODE_BATCH_DEADLINE if deadline is None else deadline
+    batch = _batch(names, city)
+    if not batch:
+        return _batch_result(city, batch, {}, deadline, time.monotonic())
+
+    slots = asyncio.Semaphore(GEOCODE_BATCH_CONCURRENCY)
+
+    async def lookup(name):
+        async with slots:
+            return await geocode_place_async(name, city)
+
+    with tracing.span("step", "geocode_places", places=len(batch)):
+        start = time.monotonic()
+        tasks = {asyncio.ensure_future(lookup(name)): name for name in batch}
+        done, not_done = await asyncio.wait(tasks, timeout=deadline)
+        for task in not_done:
+            task.cancel()
+        results = _collect(tasks, done)
+
+    return _batch_result(city, batch, results, deadline, start)
+
+
+# ADK takes the tool description from the docstring
+geocode_places_async.__doc__ = geocode_places.__doc__
+
+
+def _batch(names: list, city: str) -> list:
+    """The names one batch looks up: one per distinct place, at most GEOCODE_BATCH_MAX_PLACES."""
+    # Spelling / case variants share a lookup
+    unique = {}
+    for name in names or []:
+        key = normalize_query(name)
+        if key and key not in unique:
+            unique[key] = name.strip()
+    if len(unique) > GEOCODE_BATCH_MAX_PLACES:
+        logger.info("geocode batch truncated", extra={"city": city, "places": len(unique),
+                                                      "max_places": GEOCODE_BATCH_MAX_PLACES})
+    return list(unique.values())[:GEOCODE_BATCH_MAX_PLACES]
+
+
+def _collect(futures: dict, done) -> dict:
+    """name -> geocode_place result for each finished future (or task)."""
+    results = {}
+    for future in done:
+        try:
+            results[futures[future]] = future.result()
+        except Exception as e:
+            results[futures[future]] = {"status": "error", "error_message": str(e)}
+    return results
+
+
+def _batch_result(city: str, batch: list, results: dict, deadline: float, start: float) -> dict:
+    places, failed, timed_out = [], [], []
+    for name in batch:
+        result = results.get(name)
+        if result is None:
+            timed_out.append(name)
+        elif result["status"] == "success":
+            places.append({k: result[k] for k in ("name", "lat", "lon", "formatted_address")})
+        else:
+            failed.append(name)
 
-    except Exception as e:
-        return {"status": "error", "error_message": str(e)}
\ No newline at end of file
+    if timed_out:
+        logger.warning("geocode batch missed deadline", extra={
+            "city": city, "timed_out": len(timed_out), "deadline_s": deadline,
+            "elapsed_ms": round((time.monotonic() - start) * 1000, 1),
+        })
+    return {"status": "success", "city": city, "places": places, "failed": failed, "timed_out": timed_out}
@@ -0,0 +1,199 @@
+# tools/places.py
+
+# ---------------------------------------------------------------------------
+# Cached Google Places (New) Nearby Search shared by the hotel and activity
+# tools.
+#
+# Results are keyed on the rounded search center, the sorted includedTypes,
+# radius, maxResultCount, field mask and rank preference, so the same city
+# searched by another session (or by the server's direct-tool fallback right
+# after a sub-agent did it) costs no API call. Entries past PLACES_CACHE_TTL
+# are still served for PLACES_CACHE_STALE_TTL seconds while a background
+# refresh fetches a new copy.
+#
+# Every live result also goes into a spatial index (tools/poi_index.py), so
+# a search inside one already made (a 5 km radius after 10 km, or a subset
+# of its types) is answered by filtering the wider result instead.
+# Concurrent identical misses, and a background refresh racing them, share
+# one API call (tools/singleflight.py).
+# ---------------------------------------------------------------------------
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+from tools import http_client, log
+from tools.cache import SWRCache
+from tools.poi_index import PoiIndex
+from tools.singleflight import SingleFlight
+
+logger = log.get_logger("tools.places")
+
+load_dotenv()
+GOOGLE_PLACES_API_KEY = os.getenv("GOOGLE_PLACES_API_KEY")
+
+PLACES_URL = "https://places.googleapis.com/v1/places:searchNearby"
+
+PLACES_CACHE_TTL = float(os.getenv("PLACES_CACHE_TTL", str(6 * 3600)))
+PLACES_CACHE_STALE_TTL = float(os.getenv("PLACES_CACHE_STALE_TTL", str(24 * 3600)))
+PLACES_CACHE_MAX_BYTES = int(os.getenv("PLACES_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# Decimal places kept from the search center; 3 ≈ 110 m, well inside any
+# city-scale search radius
+COORD_PRECISION = 3
+
+_cache = SWRCache(max_bytes=PLACES_CACHE_MAX_BYTES, ttl=PLACES_CACHE_TTL, stale_ttl=PLACES_CACHE_STALE_TTL)
+_index = PoiIndex(ttl=PLACES_CACHE_TTL)
+_flight = SingleFlight("places")
+_refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="places-refresh")
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+_refreshes = 0
+
+
+def cache_key(lat: float, lon: float, included_types, radius_m, max_results: int,
+              field_mask: str, rank_preference: str = "POPULARITY") -> tuple:
+    """Normalized cache key for a Nearby Search request."""
+    return (
+        round(float(lat), COORD_PRECISION),
+        round(float(lon), COORD_PRECISION),
+        tuple(sorted(set(included_types))),
+        float(radius_m),
+        int(max_results),
+        ",".join(sorted(field_mask.split(","))),
+        rank_preference,
+    )
+
+
+def _request(key: tuple) -> dict:
+    """Nearby Search request (headers + JSON body) for a cache key."""
+    lat, lon, included_types, radius_m, max_results, field_mask, rank_preference = key
+    return {
+        "headers": {
+            "Content-Type": "application/json",
+            "X-Goog-Api-Key": GOOGLE_PLACES_API_KEY,
+            "X-Goog-FieldMask": field_mask,
+        },
+        "json": {
+            "includedTypes": list(included_types)[:50],  # Google allows max 50 types
+            "maxResultCount": max_results,
+            "locationRestriction": {
+                "circle": {
+                    "center": {"latitude": lat, "longitude": lon},
+                    "radius": radius_m,
+                }
+            },
+            "rankPreference": rank_preference,
+        },
+    }
+
+
+def _store(key: tuple, places: list) -> list:
+    _cache.set(key, places, size=len(json.dumps(places)))
+    _index.add(*key, places)
+    return places
+
+
+def _fetch(key: tuple) -> list:
+    resp = http_client.post(PLACES_URL, **_request(key))
+    resp.raise_for_status()
+    return _store(key, resp.json().get("places", []))
+
+
+async def _fetch_async(key: tuple) -> list:
+    resp = await http_client.async_post(PLACES_URL, **_request(key))
+    resp.raise_for_status()
+    return _store(key, resp.json().get("places", []))
+
+
+def _refresh(key: tuple):
+    global _refreshes
+    try:
+        _flight.do(key, _fetch, key)
+        _refreshes += 1
+    except Exception:
+        logger.warning("places background refresh failed", exc_info=True)
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(key)
+
+
+def _lookup(key: tuple):
+    """Cached or index-derived places for `key`, or None; stale hits start a background refresh."""
+    places, state = _cache.lookup(key)
+    if state == SWRCache.STALE:
+        with _refreshing_lock:
+            start_refresh = key not in _refreshing
+            _refreshing.add(key)
+        if start_refresh:
+            _refresher.submit(_refresh, key)
+    if state is not None:
+        return places
+    return _index.answer(*key)
+
+
+def search_nearby(
+    lat: float,
+    lon: float,
+    included_types: list,
+    radius_m: float,
+    max_results: int,
+    field_mask: str,
+    rank_preference: str = "POPULARITY",
+) -> list:
+    """
+    Google Places (New) Nearby Search, served from cache where possible.
+
+    Returns the raw "places" list from the API response. Raises on HTTP or
+    network errors (callers turn these into tool error dicts). Stale hits
+    are returned immediately and refreshed in the background; misses are
+    answered from an earlier, wider search when that determines the result.
+    """
+    key = cache_key(lat, lon, included_types, radius_m, max_results, field_mask, rank_preference)
+    places = _lookup(key)
+    if places is not None:
+        return places
+    return _flight.do(key, _fetch, key)
+
+
+async def search_nearby_async(
+    lat: float,
+    lon: float,
+    included_types: list,
+    radius_m: float,
+    max_results: int,
+    field_mask: str,
+    rank_preference: str = "POPULARITY",
+) -> list:
+    """search_nearby() for coroutines: same cache, index and in-flight calls, non-blocking HTTP."""
+    key = cache_key(lat, lon, included_types, radius_m, max_results, field_mask, rank_preference)
+    places = _lookup(key)
+    if places is not None:
+        return places
+    return await _flight.do_async(key, _fetch_async, key)
+
+
+def cache_stats() -> dict:
+    """Hit / stale-hit / miss / memory counters for the Nearby Search cache."""
+    return {**_cache.stats(), "refreshes": _refreshes}
+
+
+def flight_stats() -> dict:
+    """API calls made vs callers that shared an identical in-flight call."""
+    return _flight.stats()
+
+
+def index_stats() -> dict:
+    """Cache misses answered from the spatial index (hits) or not (misses), places indexed (size)."""
+    return _index.stats()
+
+
+def clear_cache():
+    global _refreshes
+    _cache.clear()
+    _index.clear()
+    _flight.reset()
+    _refreshes = 0
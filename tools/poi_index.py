@@ -0,0 +1,262 @@
+# tools/poi_index.py
+
+# ---------------------------------------------------------------------------
+# In-memory spatial index over every place Nearby Search has returned, so a
+# search inside an area already searched is answered without a new call.
+#
+# The Places cache (tools/places.py) only hits on an identical request: a
+# 5 km search after a 10 km one for the same city, or "museum" after
+# "museum, art_gallery", each cost a new call. The index keeps
+#   - every place seen, on a uniform lat/lon grid (cells of CELL_DEG) and
+#     by type, with coordinates in numpy arrays for vectorized haversine;
+#   - one record per live search: center, radius, types, field mask and
+#     the places it returned, in Google's order.
+# A query is answered from a record whose circle contains the query's
+# circle, whose types include the query's types and whose field mask
+# includes the query's, by keeping the record's places that fall inside
+# the query circle and match its types. Nearby Search results are a prefix
+# of one global POPULARITY order, so that filtered list is exactly what
+# Google would return for the smaller query as long as it has at least
+# max_results places, or the record held every match (it came back with
+# fewer than its own max_results). Otherwise the query goes live.
+#
+# popularity_order() merges several ranked lists into one order that keeps
+# every pair Google ranked, for snapshots built from many searches.
+#
+#   PLACES_INDEX_MAX_RECORDS = live searches kept (default 2048, oldest dropped)
+# ---------------------------------------------------------------------------
+
+import heapq
+import math
+import os
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+PLACES_INDEX_MAX_RECORDS = int(os.getenv("PLACES_INDEX_MAX_RECORDS", "2048"))
+
+EARTH_RADIUS_M = 6371008.8
+
+# Grid cell size in degrees (~1.1 km of latitude)
+CELL_DEG = 0.01
+
+# Slack when testing circle containment, for the rounded search centers
+CONTAINMENT_SLACK_M = 1.0
+
+Record = namedtuple("Record", "lat lon radius_m types fields rank_preference max_results rows complete created")
+
+
+def haversine_m(lat, lon, lats, lons) -> np.ndarray:
+    """Great-circle distance in metres from (lat, lon) to each (lats[i], lons[i])."""
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def place_key(place: dict):
+    """Identity of a Nearby Search place: its id, or name + position without one."""
+    if place.get("id"):
+        return place["id"]
+    location = place.get("location", {})
+    return (place.get("displayName", {}).get("text", ""),
+            round(location.get("latitude", 0.0), 5), round(location.get("longitude", 0.0), 5))
+
+
+def popularity_key(place: dict) -> tuple:
+    """Sort key approximating POPULARITY where Google gave no order: most reviewed, then best rated."""
+    return (-(place.get("userRatingCount") or 0), -(place.get("rating") or 0.0))
+
+
+def popularity_order(ranked_lists, places: dict) -> list:
+    """
+    One order over every key in `ranked_lists` (lists of place keys, each in
+    Google's POPULARITY order) that keeps each list's order: a topological
+    sort of "ranked above" pairs, ties broken by popularity_key(places[key]).
+    """
+    after = {}
+    indegree = {}
+    for ranked in ranked_lists:
+        for key in ranked:
+            indegree.setdefault(key, 0)
+        for above, below in zip(ranked, ranked[1:]):
+            if below not in after.setdefault(above, set()):
+                after[above].add(below)
+                indegree[below] += 1
+
+    ready = [(popularity_key(places[k]), i, k) for i, k in enumerate(indegree) if indegree[k] == 0]
+    heapq.heapify(ready)
+    order, placed = [], set()
+    tiebreak = {k: (popularity_key(places[k]), i) for i, k in enumerate(indegree)}
+    while len(order) < len(indegree):
+        if not ready:
+            # Conflicting lists (e.g. ratings changed between searches): take the best remaining
+            key = min((k for k in indegree if k not in placed), key=lambda k: (indegree[k], tiebreak[k]))
+        else:
+            key = heapq.heappop(ready)[2]
+            if key in placed:
+                continue
+        placed.add(key)
+        order.append(key)
+        for below in after.get(key, ()):
+            indegree[below] -= 1
+            if indegree[below] == 0 and below not in placed:
+                heapq.heappush(ready, (*tiebreak[below], below))
+    return order
+
+
+class PoiIndex:
+    """Places seen by live searches, and the searches that returned them."""
+
+    def __init__(self, max_records: int = PLACES_INDEX_MAX_RECORDS, ttl: float = None):
+        self.max_records = max_records
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._reset()
+        self.hits = 0
+        self.misses = 0
+
+    def _reset(self):
+        self._rows = {}      # place key -> row
+        self._places = []    # row -> place dict (latest copy)
+        self._lat = np.zeros(0)
+        self._lon = np.zeros(0)
+        self._pending = []   # (lat, lon) not yet appended to the arrays
+        self._cells = {}     # grid cell -> rows
+        self._by_type = {}   # type -> set of rows
+        self._records = []
+
+    # ── Places ──
+
+    @staticmethod
+    def _cell(lat: float, lon: float) -> tuple:
+        return int(math.floor(lat / CELL_DEG)), int(math.floor(lon / CELL_DEG))
+
+    def _add_place(self, place: dict) -> int:
+        key = place_key(place)
+        row = self._rows.get(key)
+        if row is not None:
+            self._places[row] = place
+            return row
+        location = place.get("location", {})
+        lat, lon = location.get("latitude"), location.get("longitude")
+        if lat is None or lon is None:
+            return -1
+        row = self._rows[key] = len(self._places)
+        self._places.append(place)
+        self._pending.append((lat, lon))
+        self._cells.setdefault(self._cell(lat, lon), []).append(row)
+        for place_type in place.get("types", []):
+            self._by_type.setdefault(place_type, set()).add(row)
+        return row
+
+    def _coords(self) -> tuple:
+        if self._pending:
+            pending = np.asarray(self._pending, dtype=np.float64)
+            self._lat = np.concatenate([self._lat, pending[:, 0]])
+            self._lon = np.concatenate([self._lon, pending[:, 1]])
+            self._pending = []
+        return self._lat, self._lon
+
+    def within(self, lat: float, lon: float, radius_m: float, types=None) -> np.ndarray:
+        """Rows within radius_m of (lat, lon), carrying one of `types` if given."""
+        dlat = radius_m / 111320.0
+        dlon = dlat / max(math.cos(math.radians(lat)), 0.01)
+        (i0, j0), (i1, j1) = self._cell(lat - dlat, lon - dlon), self._cell(lat + dlat, lon + dlon)
+        candidates = [row for i in range(i0, i1 + 1) for j in range(j0, j1 + 1) for row in self._cells.get((i, j), ())]
+        if types is not None:
+            typed = set().union(*(self._by_type.get(t, ()) for t in types))
+            candidates = [row for row in candidates if row in typed]
+        if not candidates:
+            return np.zeros(0, dtype=np.int64)
+        rows = np.asarray(candidates, dtype=np.int64)
+        lats, lons = self._coords()
+        return rows[haversine_m(lat, lon, lats[rows], lons[rows]) <= radius_m]
+
+    # ── Searches ──
+
+    def _expire(self, now: float):
+        if self.ttl is not None:
+            live = [r for r in self._records if now - r.created <= self.ttl]
+            if len(live) != len(self._records):
+                self._rebuild(live)
+
+    def _rebuild(self, records):
+        """Keep only the places `records` reference (after expiry or eviction)."""
+        places = self._places
+        self._reset()
+        for record in records:
+            rows = tuple(self._add_place(places[row]) for row in record.rows)
+            self._records.append(record._replace(rows=rows))
+
+    def add(self, lat: float, lon: float, included_types, radius_m: float, max_results: int,
+            field_mask: str, rank_preference: str, places: list):
+        """Index the places one live search returned (in Google's order)."""
+        with self._lock:
+            rows = tuple(self._add_place(p) for p in places)
+            complete = len(places) < max_results
+            if -1 in rows:
+                # A place without coordinates can't be placed in or out of a
+                # smaller circle; keep the places but never answer from this search
+                rows, complete = tuple(row for row in rows if row >= 0), False
+                max_results = len(rows) + 1
+            self._records.append(Record(
+                lat, lon, float(radius_m), frozenset(included_types), frozenset(field_mask.split(",")),
+                rank_preference, int(max_results), rows, complete, time.time(),
+            ))
+            if len(self._records) > self.max_records:
+                self._rebuild(self._records[-(self.max_records // 2 or 1):])
+
+    def answer(self, lat: float, lon: float, included_types, radius_m: float, max_results: int,
+               field_mask: str, rank_preference: str = "POPULARITY"):
+        """
+        The places Nearby Search would return for this request, if an
+        earlier search's results determine them; otherwise None.
+        """
+        types, fields = frozenset(included_types), frozenset(field_mask.split(","))
+        with self._lock:
+            self._expire(time.time())
+            candidates = [r for r in self._records
+                          if r.rank_preference == rank_preference and types <= r.types and fields <= r.fields
+                          and r.radius_m >= radius_m and (types == r.types or "places.types" in r.fields)]
+            if candidates:
+                centers = np.asarray([(r.lat, r.lon) for r in candidates])
+                radii = np.asarray([r.radius_m for r in candidates])
+                contains = haversine_m(lat, lon, centers[:, 0], centers[:, 1]) + radius_m <= radii + CONTAINMENT_SLACK_M
+                candidates = [r for r, ok in zip(candidates, contains) if ok]
+
+            result = None
+            if candidates:
+                # A record searched for exactly these types needs no type filter,
+                # and may not have them to filter on (a mask without places.types)
+                inside = set(self.within(lat, lon, radius_m).tolist())
+                typed = None
+                for record in candidates:
+                    if record.types != types:
+                        if typed is None:
+                            typed = set(self.within(lat, lon, radius_m, types).tolist())
+                        rows = [row for row in record.rows if row in typed]
+                    else:
+                        rows = [row for row in record.rows if row in inside]
+                    if len(rows) >= max_results or record.complete:
+                        result = [self._places[row] for row in rows[:max_results]]
+                        break
+
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._places),
+                    "searches": len(self._records)}
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+            self.hits = 0
+            self.misses = 0
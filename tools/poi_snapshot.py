@@ -0,0 +1,420 @@
+# tools/poi_snapshot.py
+
+# ---------------------------------------------------------------------------
+# Local POI snapshots: hotel and activity search for the busiest
+# destinations without a Google Places call.
+#
+# A snapshot holds every hotel and activity the tools could ask about for one
+# city, gathered ahead of time by the CLI below. search_hotels /
+# search_activities try it first and answer from it when it is fresh and
+# covers the request (types, radius); otherwise they go to the live API as
+# before. The answer has the same shape as a Nearby Search "places" list.
+#
+# One file per city, <POI_SNAPSHOT_DIR>/<city key>.poi, memory-mapped:
+#   magic (8 bytes) | header length (uint32) | JSON header | padding
+#   | column data, each 8-byte aligned
+# The header holds the city, center, radius, build time, the type
+# vocabulary and every column's dtype / offset / length. Columns:
+#   lat, lon (f8) · rating (f4, NaN = none) · rating_count (i4)
+#   price_level (i1, index into PRICE_LEVELS, -1 = none)
+#   types: type_offsets (i4, n + 1) into type_ids (i2, vocabulary index)
+#   name / address / url: *_offsets (i8, n + 1) into UTF-8 *_blob (u1)
+# Rows are stored in POPULARITY order, merged over the build's searches.
+# Files are written to a temp file and renamed into place, so a refresh
+# never exposes a half-written snapshot.
+#
+#   POI_SNAPSHOT_DIR     = snapshot directory (default .cache/poi)
+#   POI_SNAPSHOT_MAX_AGE = seconds a snapshot counts as fresh (default 7 days; 0 = never use)
+#
+# Usage: python -m tools.poi_snapshot build Tokyo Paris ... | build --top 50
+#        python -m tools.poi_snapshot refresh [--max-age 604800]
+#        python -m tools.poi_snapshot list
+# ---------------------------------------------------------------------------
+
+import argparse
+import json
+import math
+import os
+import struct
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from tools import log
+from tools.gazetteer import canonical_key
+from tools.poi_index import haversine_m, place_key, popularity_order
+
+logger = log.get_logger("tools.poi_snapshot")
+
+DEFAULT_SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "poi")
+
+POI_SNAPSHOT_DIR = os.getenv("POI_SNAPSHOT_DIR", DEFAULT_SNAPSHOT_DIR)
+POI_SNAPSHOT_MAX_AGE = float(os.getenv("POI_SNAPSHOT_MAX_AGE", str(7 * 24 * 3600)))
+
+MAGIC = b"WWPOI\x00\x01\x00"
+FORMAT_VERSION = 1
+
+PRICE_LEVELS = [
+    "PRICE_LEVEL_FREE",
+    "PRICE_LEVEL_INEXPENSIVE",
+    "PRICE_LEVEL_MODERATE",
+    "PRICE_LEVEL_EXPENSIVE",
+    "PRICE_LEVEL_VERY_EXPENSIVE",
+]
+
+# Radius a snapshot covers around the city center; the tools search 10 km by default
+SNAPSHOT_RADIUS_M = 15000.0
+
+# The most visited city destinations, busiest first (roughly by international
+# arrivals), for `build --top N`: the cities most trips, and so most
+# searches, are for
+TOP_DESTINATIONS = [
+    "Bangkok", "Paris", "London", "Dubai", "Singapore", "Kuala Lumpur", "New York City", "Istanbul",
+    "Tokyo", "Antalya", "Seoul", "Osaka", "Phuket", "Pattaya", "Milan", "Barcelona",
+    "Palma", "Bali", "Hong Kong", "Prague", "Shanghai", "Amsterdam", "Rome", "Vienna",
+    "Madrid", "Los Angeles", "Taipei", "Berlin", "Lisbon", "Venice", "Florence", "Miami",
+    "Las Vegas", "Kyoto", "Cancún", "Sydney", "Dublin", "Budapest", "Athens", "Munich",
+    "Orlando", "Toronto", "Vancouver", "San Francisco", "Mexico City", "Rio de Janeiro",
+    "Marrakesh", "Cairo", "Ho Chi Minh City", "Hanoi", "Delhi", "Mumbai", "Seville", "Copenhagen",
+    "Edinburgh", "Stockholm", "Nice", "Porto", "Dubrovnik", "Reykjavík",
+]
+
+# Everything a snapshot build asks Nearby Search for
+SNAPSHOT_FIELD_MASK = (
+    "places.id,places.displayName,places.location,places.types,places.rating,"
+    "places.userRatingCount,places.formattedAddress,places.googleMapsUri,places.priceLevel"
+)
+
+_STRING_COLUMNS = ("name", "address", "url")
+
+_hits = 0
+_misses = 0
+_stats_lock = threading.Lock()
+
+
+def snapshot_path(city: str, directory: str = None) -> str:
+    key = canonical_key(city).replace(" ", "_").replace("/", "_")
+    return os.path.join(directory or POI_SNAPSHOT_DIR, f"{key}.poi")
+
+
+# ── Writing ──
+
+def _pack_strings(values) -> tuple:
+    encoded = [(v or "").encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+
+def write_snapshot(path: str, city: str, lat: float, lon: float, places: list,
+                   covered_types, radius_m: float = SNAPSHOT_RADIUS_M, built_at: float = None) -> int:
+    """
+    Write `places` (Nearby Search place dicts, most popular first) as a
+    snapshot file. `covered_types` are the includedTypes the snapshot was
+    gathered for; only requests within them are answered from it.
+    """
+    vocabulary = sorted({t for place in places for t in place.get("types", [])} | set(covered_types))
+    type_index = {t: i for i, t in enumerate(vocabulary)}
+
+    type_lists = [[type_index[t] for t in place.get("types", [])] for place in places]
+    type_offsets = np.zeros(len(places) + 1, dtype=np.int32)
+    np.cumsum([len(ids) for ids in type_lists], out=type_offsets[1:])
+
+    columns = {
+        "lat": np.array([p.get("location", {}).get("latitude", np.nan) for p in places], dtype="<f8"),
+        "lon": np.array([p.get("location", {}).get("longitude", np.nan) for p in places], dtype="<f8"),
+        "rating": np.array([p.get("rating", np.nan) for p in places], dtype="<f4"),
+        "rating_count": np.array([p.get("userRatingCount") or 0 for p in places], dtype="<i4"),
+        "price_level": np.array([PRICE_LEVELS.index(p["priceLevel"]) if p.get("priceLevel") in PRICE_LEVELS
+                                 else -1 for p in places], dtype="i1"),
+        "type_offsets": type_offsets.astype("<i4"),
+        "type_ids": np.array([i for ids in type_lists for i in ids], dtype="<i2"),
+    }
+    for name, field in zip(_STRING_COLUMNS, ("displayName", "formattedAddress", "googleMapsUri")):
+        values = [p.get(field, {}).get("text", "") if field == "displayName" else p.get(field, "") for p in places]
+        columns[f"{name}_offsets"], columns[f"{name}_blob"] = _pack_strings(values)
+
+    layout, offset = {}, 0
+    for name, array in columns.items():
+        layout[name] = {"dtype": array.dtype.str, "offset": offset, "length": len(array)}
+        offset += -(-array.nbytes // 8) * 8
+
+    header = json.dumps({
+        "version": FORMAT_VERSION, "city": city, "lat": lat, "lon": lon, "radius_m": radius_m,
+        "built_at": time.time() if built_at is None else built_at, "count": len(places),
+        "covered_types": sorted(set(covered_types)), "types": vocabulary, "columns": layout,
+    }).encode("utf-8")
+    prefix = len(MAGIC) + 4 + len(header)
+    padding = -prefix % 8
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC + struct.pack("<I", len(header)) + header + b"\0" * padding)
+            for array in columns.values():
+                f.write(array.tobytes())
+                f.write(b"\0" * (-array.nbytes % 8))
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return len(places)
+
+
+# ── Reading ──
+
+class Snapshot:
+    """One city's snapshot, memory-mapped; columns are read-only numpy views."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.mtime = os.stat(path).st_mtime_ns
+        data = np.memmap(path, dtype=np.uint8, mode="r")
+        if bytes(data[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"not a POI snapshot: {path}")
+        (header_len,) = struct.unpack("<I", bytes(data[len(MAGIC):len(MAGIC) + 4]))
+        start = len(MAGIC) + 4
+        self.header = json.loads(bytes(data[start:start + header_len]))
+        if self.header["version"] != FORMAT_VERSION:
+            raise ValueError(f"unsupported POI snapshot version {self.header['version']}: {path}")
+        base = start + header_len + (-(start + header_len) % 8)
+
+        self.columns = {}
+        for name, col in self.header["columns"].items():
+            dtype = np.dtype(col["dtype"])
+            begin = base + col["offset"]
+            self.columns[name] = data[begin:begin + col["length"] * dtype.itemsize].view(dtype)
+
+        self.city = self.header["city"]
+        self.lat, self.lon = self.header["lat"], self.header["lon"]
+        self.radius_m = self.header["radius_m"]
+        self.built_at = self.header["built_at"]
+        self.types = self.header["types"]
+        self.covered_types = set(self.header["covered_types"])
+        self._type_index = {t: i for i, t in enumerate(self.types)}
+
+    def __len__(self):
+        return self.header["count"]
+
+    def age(self) -> float:
+        return time.time() - self.built_at
+
+    def covers(self, included_types, radius_m: float) -> bool:
+        return float(radius_m) <= self.radius_m and set(included_types) <= self.covered_types
+
+    def _string(self, column: str, i: int) -> str:
+        offsets = self.columns[f"{column}_offsets"]
+        return bytes(self.columns[f"{column}_blob"][offsets[i]:offsets[i + 1]]).decode("utf-8")
+
+    def _types_of(self, i: int) -> list:
+        offsets = self.columns["type_offsets"]
+        return [self.types[t] for t in self.columns["type_ids"][offsets[i]:offsets[i + 1]]]
+
+    def type_mask(self, included_types) -> np.ndarray:
+        """Rows carrying at least one of `included_types`."""
+        wanted = [self._type_index[t] for t in included_types if t in self._type_index]
+        offsets = self.columns["type_offsets"]
+        if not wanted or not len(self):
+            return np.zeros(len(self), dtype=bool)
+        hits = np.concatenate([[0], np.cumsum(np.isin(self.columns["type_ids"], wanted))])
+        return hits[offsets[1:]] > hits[offsets[:-1]]
+
+    def place(self, i: int) -> dict:
+        """Row `i` as a Nearby Search place dict."""
+        place = {
+            "displayName": {"text": self._string("name", i)},
+            "location": {"latitude": float(self.columns["lat"][i]), "longitude": float(self.columns["lon"][i])},
+            "types": self._types_of(i),
+            "formattedAddress": self._string("address", i),
+            "googleMapsUri": self._string("url", i),
+        }
+        rating = float(self.columns["rating"][i])
+        if not math.isnan(rating):
+            place["rating"] = round(rating, 1)
+        if self.columns["rating_count"][i]:
+            place["userRatingCount"] = int(self.columns["rating_count"][i])
+        level = int(self.columns["price_level"][i])
+        if level >= 0:
+            place["priceLevel"] = PRICE_LEVELS[level]
+        return place
+
+    def query(self, included_types, radius_m: float, max_results: int) -> list:
+        """Places of the given types within radius_m of the center, most popular first."""
+        mask = self.type_mask(included_types)
+        mask &= haversine_m(self.lat, self.lon, self.columns["lat"], self.columns["lon"]) <= float(radius_m)
+        return [self.place(i) for i in np.flatnonzero(mask)[:max_results]]
+
+
+_loaded = {}  # path -> Snapshot
+_loaded_lock = threading.Lock()
+
+
+def load(city: str, directory: str = None):
+    """The city's snapshot, or None. Re-opened when the file has been refreshed."""
+    path = snapshot_path(city, directory)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    with _loaded_lock:
+        snapshot = _loaded.get(path)
+        if snapshot is not None and snapshot.mtime == mtime:
+            return snapshot
+    try:
+        snapshot = Snapshot(path)
+    except (OSError, ValueError, KeyError):
+        logger.warning("unreadable POI snapshot", exc_info=True, extra={"path": path})
+        return None
+    with _loaded_lock:
+        _loaded[path] = snapshot
+    return snapshot
+
+
+def search(city: str, included_types, radius_m: float, max_results: int):
+    """
+    Answer a hotel / activity search from the city's snapshot:
+    {"places": [...], "lat": float, "lon": float}, or None when there is no
+    fresh snapshot covering the request (the caller goes live).
+    """
+    global _hits, _misses
+    snapshot = load(city) if POI_SNAPSHOT_MAX_AGE > 0 else None
+    places = None
+    if snapshot is not None and snapshot.age() <= POI_SNAPSHOT_MAX_AGE and snapshot.covers(included_types, radius_m):
+        places = snapshot.query(included_types, radius_m, max_results) or None
+    with _stats_lock:
+        if places is None:
+            _misses += 1
+        else:
+            _hits += 1
+    if places is None:
+        return None
+    return {"places": places, "lat": snapshot.lat, "lon": snapshot.lon}
+
+
+def stats() -> dict:
+    """Searches answered from a snapshot (hits) vs sent live (misses)."""
+    with _stats_lock:
+        return {"hits": _hits, "misses": _misses, "size": len(_loaded)}
+
+
+def clear():
+    """Forget loaded snapshots and counters (tests / benchmarks)."""
+    global _hits, _misses
+    with _loaded_lock:
+        _loaded.clear()
+    with _stats_lock:
+        _hits = _misses = 0
+
+
+# ── Building ──
+
+def _search_groups() -> list:
+    """includedTypes lists a build fetches: hotels, default activities, every interest kind."""
+    from tools.activity_tools import DEFAULT_TYPES, KINDS_TO_GOOGLE_TYPES
+    from tools.hotel_tools import HOTEL_TYPES
+
+    groups = [HOTEL_TYPES, DEFAULT_TYPES]
+    groups += [types for types in KINDS_TO_GOOGLE_TYPES.values() if types not in groups]
+    return groups
+
+
+def _search_centers(lat: float, lon: float, radius_m: float) -> list:
+    """The center plus six points around it at half the radius, each searched at half the radius."""
+    centers = [(lat, lon)]
+    dlat = (radius_m / 2) / 111320.0
+    dlon = dlat / max(math.cos(math.radians(lat)), 0.01)
+    for k in range(6):
+        angle = math.radians(60 * k)
+        centers.append((lat + dlat * math.sin(angle), lon + dlon * math.cos(angle)))
+    return centers
+
+
+def build(city: str, directory: str = None, radius_m: float = SNAPSHOT_RADIUS_M) -> int:
+    """Fetch the city's hotels and activities from Google Places and write its snapshot."""
+    from tools.geocoding import geocode_city
+    from tools.places import search_nearby
+
+    geo = geocode_city(city)
+    if geo.get("status") != "success":
+        raise RuntimeError(f"could not geocode {city}: {geo.get('error_message')}")
+
+    groups = _search_groups()
+    places, ranked_lists = {}, []
+    for center_lat, center_lon in _search_centers(geo["lat"], geo["lon"], radius_m):
+        for types in groups:
+            results = search_nearby(center_lat, center_lon, included_types=types, radius_m=radius_m / 2,
+                                    max_results=20, field_mask=SNAPSHOT_FIELD_MASK)
+            keys = [place_key(place) for place in results]
+            places.update(zip(keys, results))
+            ranked_lists.append(keys)
+
+    # One order that keeps every pair any search ranked (see poi_index.popularity_order)
+    places = [places[key] for key in popularity_order(ranked_lists, places)]
+    covered = {t for types in groups for t in types}
+    return write_snapshot(snapshot_path(city, directory), city, geo["lat"], geo["lon"], places, covered, radius_m)
+
+
+def list_snapshots(directory: str = None) -> list:
+    """Every snapshot's header in `directory`."""
+    directory = directory or POI_SNAPSHOT_DIR
+    headers = []
+    if not os.path.isdir(directory):
+        return headers
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".poi"):
+            try:
+                headers.append({**Snapshot(os.path.join(directory, name)).header, "path": name})
+            except (OSError, ValueError, KeyError):
+                logger.warning("unreadable POI snapshot", extra={"path": name})
+    return headers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m tools.poi_snapshot", description="WanderWise POI snapshots")
+    parser.add_argument("--dir", default=None, help=f"snapshot directory (default {POI_SNAPSHOT_DIR})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build_cmd = sub.add_parser("build", help="build snapshots for the given cities")
+    build_cmd.add_argument("cities", nargs="*")
+    build_cmd.add_argument("--top", type=int, default=0, help=f"also build the N most visited destinations (up to {len(TOP_DESTINATIONS)})")
+    build_cmd.add_argument("--radius", type=float, default=SNAPSHOT_RADIUS_M)
+
+    refresh_cmd = sub.add_parser("refresh", help="rebuild snapshots older than --max-age")
+    refresh_cmd.add_argument("--max-age", type=float, default=POI_SNAPSHOT_MAX_AGE / 2)
+
+    sub.add_parser("list", help="show the snapshots on disk")
+
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        cities = list(dict.fromkeys(args.cities + TOP_DESTINATIONS[:args.top]))
+        if not cities:
+            parser.error("name at least one city or pass --top N")
+        todo = [(city, args.radius) for city in cities]
+    elif args.command == "refresh":
+        todo = [(h["city"], h["radius_m"]) for h in list_snapshots(args.dir)
+                if time.time() - h["built_at"] > args.max_age]
+    else:
+        for h in list_snapshots(args.dir):
+            age_h = (time.time() - h["built_at"]) / 3600
+            print(f"{h['city']:<24} {h['count']:>6} places  radius={h['radius_m'] / 1000:.0f} km  "
+                  f"age={age_h:.1f} h  {h['path']}")
+        return
+
+    failed = 0
+    for city, radius_m in todo:
+        try:
+            count = build(city, args.dir, radius_m)
+            print(f"{city}: {count} places -> {snapshot_path(city, args.dir)}")
+        except Exception as e:
+            failed += 1
+            print(f"{city}: failed ({e})")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
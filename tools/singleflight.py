@@ -0,0 +1,121 @@
+# tools/singleflight.py
+
+# ---------------------------------------------------------------------------
+# Single-flight coalescing for outbound API calls.
+#
+# When several sessions plan the same city at once (or hotel_agent and the
+# server's direct-tool fallback search it together), each would miss the
+# cache at the same moment and send its own identical request. A
+# SingleFlight lets the first caller for a key make the call while every
+# caller that arrives before it finishes waits for, and shares, its result
+# (or exception). Keys are the callers' normalized cache keys.
+#
+# The in-flight call is a concurrent.futures.Future, so threads block on it
+# and asyncio tasks await it (asyncio.wrap_future) whichever side started
+# the call: a tool thread and a coroutine on the agent loop coalesce too.
+#
+# An async call runs as its own task, and every caller (the one that started
+# it included) waits through asyncio.shield, so cancelling one caller (a
+# client disconnect, a timeout, a batch deadline) never cancels the call the
+# others are waiting on. If the task itself is cancelled (its loop shutting
+# down), the flight is dropped and its waiters start a new one.
+# ---------------------------------------------------------------------------
+
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class _Abandoned(Exception):
+    """The flight's task was cancelled: waiters retry instead of sharing it."""
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key into one.
+
+        flight = SingleFlight("geocode")
+        result = flight.do(key, fetch, arg)                # threads
+        result = await flight.do_async(key, afetch, arg)   # asyncio tasks
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._in_flight = {}  # key -> Future
+        self._tasks = set()   # running async flights (the loop only holds weak refs)
+        self.calls = 0        # calls made (one per flight)
+        self.coalesced = 0    # callers that shared another caller's call
+
+    def _join(self, key) -> tuple:
+        """(future, is_leader) for `key`."""
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = self._in_flight[key] = Future()
+            self.calls += 1
+            return future, True
+
+    def _settle(self, key, future: Future, result=None, error: BaseException = None):
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key, fn, *args, **kwargs):
+        """Call fn(*args, **kwargs), or wait for the identical call already in flight."""
+        while True:
+            future, leader = self._join(key)
+            if not leader:
+                try:
+                    return future.result()
+                except _Abandoned:
+                    continue
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                self._settle(key, future, error=e)
+                raise
+            self._settle(key, future, result)
+            return result
+
+    async def do_async(self, key, fn, *args, **kwargs):
+        """Await fn(*args, **kwargs) (a coroutine function), or the identical call already in flight."""
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                task = asyncio.ensure_future(self._run(key, future, fn, *args, **kwargs))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            try:
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except _Abandoned:
+                continue
+
+    async def _run(self, key, future: Future, fn, *args, **kwargs):
+        try:
+            result = await fn(*args, **kwargs)
+        except asyncio.CancelledError:
+            self._settle(key, future, error=_Abandoned(key))
+        except BaseException as e:
+            self._settle(key, future, error=e)
+        else:
+            self._settle(key, future, result)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._in_flight)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._in_flight)}
+
+    def reset(self):
+        with self._lock:
+            self.calls = 0
+            self.coalesced = 0
@@ -0,0 +1,151 @@
+# tools/text_match.py
+
+# ---------------------------------------------------------------------------
+# Multi-pattern place-name matching over itinerary text.
+#
+# The direct-tool fallback keeps only the hotels and activities the model
+# actually mentions. Instead of searching the itinerary once per candidate
+# name, PlaceMatcher builds one Aho–Corasick automaton over every candidate's
+# full name and its significant words (word-level: the alphabet is tokens,
+# not characters), then scans the itinerary exactly once.
+# Cost is O(len(text) + matches) however many candidates there are.
+#
+# Matching rules:
+#   - the full name appears in the text                       -> match
+#   - otherwise, a name with 2+ significant words (len > 3)
+#     needs at least 2 of them in the text                    -> match
+#   - a name with 1 significant word needs that word          -> match
+# Names and text are compared as whole, case-folded words.
+#
+# This differs from the old per-name fuzzy_match. That function checked
+# the full name and the words of multi-word names as raw substrings, and
+# only single-word names as whole words. Now every check is whole-word:
+# "museum" no longer matches "museums" or "artmuseum", and "Grand Hotel"
+# no longer matches inside "Grand Hotels". Plurals and run-together words
+# in the itinerary can therefore drop a candidate that used to be kept. In
+# exchange, short words stop matching inside unrelated ones ("park" in
+# "parking").
+# ---------------------------------------------------------------------------
+
+import unicodedata
+from collections import deque
+from functools import lru_cache
+from itertools import compress, count
+
+# Punctuation mapped to spaces before splitting into words. str.translate +
+# str.split run in C, several times faster than a regex tokenizer on long text.
+_SEPARATORS = {
+    **{i: " " for i in range(128) if not chr(i).isalnum()},
+    **{ord(c): " " for c in "\u00a0\u00b7\u2013\u2014\u2018\u2019\u201c\u201d\u2022\u2026"},
+}
+
+# Words shorter than this carry no signal on their own ("the", "inn", "of")
+MIN_SIGNIFICANT_LEN = 4
+
+
+def _tokenize(text: str) -> list:
+    """Case-folded words of `text`, split on whitespace and punctuation."""
+    return unicodedata.normalize("NFKC", text or "").casefold().translate(_SEPARATORS).split()
+
+
+class PlaceMatcher:
+    """
+    Aho–Corasick automaton over a fixed list of place names.
+
+    match(text) scans the text once and returns, for every name (in input
+    order), {"name", "matched", "score", "spans"}: `score` is 1.0 for a
+    full-name hit, else the fraction of significant words found; `spans`
+    are the sorted (first, last + 1) word offsets of every hit in the text.
+    """
+
+    def __init__(self, names):
+        self.names = list(names)
+        self._goto = [{}]   # node -> {token: child node}
+        self._fail = [0]    # node -> failure link
+        self._out = [[]]    # node -> [(name index, word or None for full name, length in tokens)]
+        self._words = []    # name index -> tuple of distinct significant words
+
+        for index, name in enumerate(self.names):
+            tokens = _tokenize(name)
+            words = tuple(dict.fromkeys(t for t in tokens if len(t) >= MIN_SIGNIFICANT_LEN))
+            self._words.append(words)
+            if tokens:
+                self._add(tokens, (index, None, len(tokens)))
+            for word in words:
+                self._add([word], (index, word, 1))
+        self._link()
+        self._alphabet = frozenset(token for edges in self._goto for token in edges)
+
+    def _add(self, tokens, output):
+        node = 0
+        for token in tokens:
+            child = self._goto[node].get(token)
+            if child is None:
+                child = len(self._goto)
+                self._goto[node][token] = child
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = child
+        self._out[node].append(output)
+
+    def _link(self):
+        """Breadth-first failure links; each node also inherits its suffix's outputs."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def match(self, text: str) -> list:
+        full_hits = {}   # name index -> [spans]
+        word_hits = {}   # name index -> {word: [spans]}
+
+        tokens = _tokenize(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        # Only words that occur in some name can move the automaton; pick
+        # their positions out in C and walk just those, resetting across gaps.
+        hits = compress(count(), map(self._alphabet.__contains__, tokens))
+        node, previous = 0, -1
+        for position in hits:
+            token = tokens[position]
+            if position != previous + 1:
+                node = 0
+            previous = position
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            for index, word, length in out[node]:
+                span = (position - length + 1, position + 1)
+                if word is None:
+                    full_hits.setdefault(index, []).append(span)
+                else:
+                    word_hits.setdefault(index, {}).setdefault(word, []).append(span)
+
+        results = []
+        for index, name in enumerate(self.names):
+            words = self._words[index]
+            found = word_hits.get(index, {})
+            if index in full_hits:
+                matched, score = True, 1.0
+            elif len(words) >= 2:
+                matched, score = len(found) >= 2, len(found) / len(words)
+            elif len(words) == 1:
+                matched, score = bool(found), float(bool(found))
+            else:
+                matched, score = False, 0.0
+            spans = full_hits.get(index, []) + [s for hits in found.values() for s in hits]
+            results.append({"name": name, "matched": matched, "score": round(score, 3), "spans": sorted(spans)})
+        return results
+
+
+@lru_cache(maxsize=256)
+def get_matcher(names: tuple) -> PlaceMatcher:
+    """Shared matcher for a candidate list; cached, since a city's search results repeat."""
+    return PlaceMatcher(names)
@@ -0,0 +1,251 @@
+# tools/tracing.py
+
+# ---------------------------------------------------------------------------
+# Per-request timing spans.
+#
+# A slow chat turn used to be a black box: root agent reasoning, the hotel /
+# activity / budget sub-agents and the Places calls under them all ran
+# inside one opaque request. Each API request now carries a Trace, a tree
+# of Spans (kind + name + start/end + attributes) held in a ContextVar:
+#
+#   request:chat
+#     agent:root_travel_agent
+#       llm:root_travel_agent
+#       tool:hotel_agent
+#         agent:hotel_agent
+#           llm:hotel_agent
+#           tool:search_hotels
+#             http:places.googleapis.com/v1/places:searchNearby
+#
+# Agent / model / tool spans come from services/trace_plugin.py, http spans
+# from tools/http_client.py. Outside a trace span() is a no-op, so tools and
+# background work pay nothing. Every finished span is also folded into a
+# per-stage ("kind:name") latency histogram, see stage_stats().
+#
+# Context does not follow work onto other threads or event loops by itself:
+# thread pools should submit bind(fn), and AgentLoop.submit carries the
+# caller's context onto the agent loop.
+# ---------------------------------------------------------------------------
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+from tools.metrics import LatencyHistogram
+
+_current = contextvars.ContextVar("wanderwise_span", default=None)
+
+_stages = {}  # "kind:name" -> LatencyHistogram
+_stages_lock = threading.Lock()
+
+
+class Span:
+    """One timed stage of a request; `end` is None while it is running."""
+
+    __slots__ = ("kind", "name", "attrs", "start", "end", "parent", "children", "trace")
+
+    def __init__(self, kind: str, name: str, parent=None, trace=None, start: float = None, **attrs):
+        self.kind = kind
+        self.name = name
+        self.attrs = attrs
+        self.start = time.perf_counter() if start is None else start
+        self.end = None
+        self.parent = parent
+        self.children = []
+        self.trace = trace
+
+    @property
+    def stage(self) -> str:
+        return f"{self.kind}:{self.name}"
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def to_dict(self, origin: float) -> dict:
+        node = {
+            "kind": self.kind,
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 2),
+            "duration_ms": round(self.duration * 1000, 2),
+        }
+        if self.attrs:
+            node["attrs"] = self.attrs
+        if self.end is None:
+            node["unfinished"] = True
+        if self.children:
+            node["children"] = [child.to_dict(origin) for child in self.children]
+        return node
+
+
+class Trace:
+    """The span tree of one request. Children may be added from several threads."""
+
+    def __init__(self, name: str, **attrs):
+        self.root = Span("request", name, trace=self, **attrs)
+        self._lock = threading.Lock()
+
+    def _attach(self, span: Span):
+        with self._lock:
+            span.parent.children.append(span)
+
+    def spans(self) -> list:
+        """Every span, depth first."""
+        out, stack = [], [self.root]
+        while stack:
+            span = stack.pop()
+            out.append(span)
+            with self._lock:
+                stack.extend(reversed(span.children))
+        return out
+
+    def finish(self):
+        """End the root (and anything still open) and record the request's stage."""
+        now = time.perf_counter()
+        for span in self.spans():
+            if span.end is None:
+                span.end = now
+                if span is self.root:
+                    _observe(span)
+
+    @property
+    def duration(self) -> float:
+        return self.root.duration
+
+    def to_dict(self) -> dict:
+        return self.root.to_dict(self.root.start)
+
+    def summary(self) -> dict:
+        """Total milliseconds spent per stage ("kind:name") across the tree."""
+        totals = {}
+        for span in self.spans():
+            totals[span.stage] = totals.get(span.stage, 0.0) + span.duration * 1000
+        return {stage: round(ms, 2) for stage, ms in totals.items()}
+
+    def server_timing(self) -> str:
+        """The per-stage totals as a Server-Timing header value (shown by browser dev tools)."""
+        return ", ".join(
+            f'{stage.replace(":", "-").replace("/", "_")};dur={ms}'
+            for stage, ms in self.summary().items()
+        )
+
+
+def _observe(span: Span):
+    hist = _stages.get(span.stage)
+    if hist is None:
+        with _stages_lock:
+            hist = _stages.setdefault(span.stage, LatencyHistogram())
+    hist.observe(span.duration)
+
+
+def current_span():
+    """The innermost open span of the current context, or None outside a trace."""
+    return _current.get()
+
+
+def current_trace():
+    span = _current.get()
+    return span.trace if span is not None else None
+
+
+@contextmanager
+def trace(name: str, **attrs):
+    """Run the block as a new request trace; yields the Trace."""
+    t = Trace(name, **attrs)
+    previous = _current.get()
+    _current.set(t.root)
+    try:
+        yield t
+    finally:
+        t.finish()
+        _current.set(previous)
+
+
+def start_trace(name: str, **attrs) -> Trace:
+    """Begin a trace in the current context (for hooks that can't wrap a block); end with end_trace."""
+    t = Trace(name, **attrs)
+    _current.set(t.root)
+    return t
+
+
+def end_trace(t: Trace):
+    t.finish()
+    _current.set(None)
+
+
+def start_span(kind: str, name: str, **attrs):
+    """Open a child of the current span and make it current. None outside a trace."""
+    parent = _current.get()
+    if parent is None:
+        return None
+    span = Span(kind, name, parent=parent, trace=parent.trace, **attrs)
+    parent.trace._attach(span)
+    _current.set(span)
+    return span
+
+
+def end_span(span, **attrs):
+    """Close `span` (and any span left open under it) and make its parent current."""
+    if span is None:
+        return
+    now = time.perf_counter()
+    current = _current.get()
+    while current is not None and current is not span and current.parent is not None:
+        if current.end is None:
+            current.end = now
+        current = current.parent
+    span.attrs.update(attrs)
+    if span.end is None:
+        span.end = now
+        _observe(span)
+    _current.set(span.parent)
+
+
+@contextmanager
+def span(kind: str, name: str, **attrs):
+    """Time the block as a child span; yields the Span (None outside a trace)."""
+    s = start_span(kind, name, **attrs)
+    if s is None:
+        yield None
+        return
+    try:
+        yield s
+    except BaseException as e:
+        s.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        end_span(s)
+
+
+def record_span(kind: str, name: str, start: float, end: float = None, **attrs):
+    """Add an already-finished child span (perf_counter times) under the current span."""
+    parent = _current.get()
+    if parent is None:
+        return None
+    s = Span(kind, name, parent=parent, trace=parent.trace, start=start, **attrs)
+    s.end = time.perf_counter() if end is None else end
+    parent.trace._attach(s)
+    _observe(s)
+    return s
+
+
+def bind(fn):
+    """Wrap `fn` to run in a copy of the current context (e.g. for a thread pool)."""
+    context = contextvars.copy_context()
+
+    def _bound(*args, **kwargs):
+        return context.run(fn, *args, **kwargs)
+    return _bound
+
+
+def stage_stats() -> dict:
+    """Per-stage latency histograms: {"kind:name": {count, sum, mean, buckets}}."""
+    with _stages_lock:
+        items = list(_stages.items())
+    return {stage: hist.snapshot() for stage, hist in sorted(items)}
+
+
+def reset_stats():
+    with _stages_lock:
+        _stages.clear()